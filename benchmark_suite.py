@@ -0,0 +1,270 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import resource  # Unix only; peak RSS is reported as "-" elsewhere
+except ImportError:
+    resource = None
+
+from fake_ollama_server import FakeOllamaServer
+
+STAGES = ["pdf_parse", "pdf_parse_pool", "extraction", "extraction_pipeline", "jd_summarization", "scoring",
+          "report_writing", "end_to_end"]
+SCALED_STAGES = ("scoring", "report_writing")  # Run once per synthetic pool size
+SYNTHETIC_VOCABULARY_SIZE = 2000
+
+
+def list_pdfs(cv_folder):
+    return [os.path.join(cv_folder, filename) for filename in sorted(os.listdir(cv_folder))
+            if filename.lower().endswith(".pdf")]
+
+
+def synthetic_cv_pool(pool_size, seed=42):
+    """
+    Builds {cv_filename: cv_data} for pool_size synthetic candidates with 3 to 25 skills each.
+    """
+    random_generator = random.Random(seed)
+    vocabulary = [f"skill {i}" for i in range(SYNTHETIC_VOCABULARY_SIZE)]
+    return {f"cv_{i}.pdf": {"name": f"Candidate {i}", "email": f"candidate{i}@example.com", "phone_number": "+1-555-0100",
+                            "skills": ", ".join(random_generator.sample(vocabulary, random_generator.randint(3, 25)))}
+            for i in range(pool_size)}
+
+
+def synthetic_jobs(job_count=20, seed=7):
+    random_generator = random.Random(seed)
+    vocabulary = [f"skill {i}" for i in range(300)]
+    return {f"Job {j}": {"required_skills": ", ".join(random_generator.sample(vocabulary, random_generator.randint(3, 12)))}
+            for j in range(job_count)}
+
+
+def timed_each(function, items):
+    """
+    Calls function on every item and returns the per-item latencies in seconds.
+    """
+    latencies = []
+    for item in items:
+        started_at = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - started_at)
+    return latencies
+
+
+# --- Stages: each returns (items processed, unit, per-item latencies or None) and is timed as a whole ---
+
+def stage_pdf_parse(options):
+    import cv_agent
+    reader = cv_agent.CVAgent(max_pages=options["max_pages"])
+    cv_file_paths = list_pdfs(options["cv_folder"]) * options["multiply"]
+    return len(cv_file_paths), "files", timed_each(reader.read_cv_from_file, cv_file_paths)
+
+
+def stage_pdf_parse_pool(options):
+    import cv_pipeline
+    cv_file_paths = list_pdfs(options["cv_folder"]) * options["multiply"]
+    cv_pipeline.read_cv_texts(cv_file_paths, parse_workers=options["parse_workers"], max_pages=options["max_pages"])
+    return len(cv_file_paths), "files", None
+
+
+def stage_extraction(options):
+    import cv_agent
+    agent = cv_agent.CVAgent(max_pages=options["max_pages"])
+    cv_texts = [agent.read_cv_from_file(path) for path in list_pdfs(options["cv_folder"])]
+    started_at = time.perf_counter()
+    latencies = timed_each(agent.extract_cv_data, cv_texts)
+    return len(cv_texts), "files", latencies, time.perf_counter() - started_at
+
+
+def stage_extraction_pipeline(options):
+    import cv_agent
+    import cv_pipeline
+    agent = cv_agent.CVAgent(max_pages=options["max_pages"], batch_size=options["cv_batch_size"])
+    pipeline = cv_pipeline.CVExtractionPipeline(agent, parse_workers=options["parse_workers"],
+                                                llm_workers=options["llm_workers"])
+    cv_file_paths = list_pdfs(options["cv_folder"])
+    pipeline.run(cv_file_paths)
+    return len(cv_file_paths), "files", None
+
+
+def stage_jd_summarization(options):
+    import jd_summarizer_agent
+    agent = jd_summarizer_agent.JDSummarizerAgent()
+    job_data_frame = agent.load_job_descriptions_from_csv(options["jd_csv"])
+    jd_texts = job_data_frame["Job Description"].tolist()
+    return len(jd_texts), "JDs", timed_each(agent.summarize_jd, jd_texts)
+
+
+def stage_scoring(options):
+    import score_matrix
+    import shortlisting_agent
+    from skill_index import SkillIndex
+    all_cv_data = synthetic_cv_pool(options["pool_size"])
+    jd_data_by_title = synthetic_jobs()
+    started_at = time.perf_counter()
+    cv_skill_index = SkillIndex.from_cv_data(all_cv_data)
+    job_cv_scores = score_matrix.compute_score_matrix(jd_data_by_title, cv_skill_index)
+    for job_title in jd_data_by_title:
+        job_cv_scores.top_k(job_title, 10, threshold=70)
+    elapsed = time.perf_counter() - started_at
+    # Per-job latency of the inverted-index path used for incremental re-scoring
+    agent = shortlisting_agent.ShortlistingAgent(threshold=70)
+    latencies = timed_each(lambda jd_data: agent.score_cvs(jd_data, cv_skill_index), jd_data_by_title.values())
+    return len(all_cv_data), "CVs", latencies, elapsed
+
+
+def stage_report_writing(options):
+    import report_writer
+    rows = [{"job_title": "Job 0", "cv_filename": cv_filename, "candidate_name": cv_data["name"], "match_score": 50.0,
+             "email": cv_data["email"], "phone_number": cv_data["phone_number"], "shortlisted": False}
+            for cv_filename, cv_data in synthetic_cv_pool(options["pool_size"]).items()]
+    with tempfile.TemporaryDirectory() as output_dir:
+        started_at = time.perf_counter()
+        with report_writer.open_results_sink(os.path.join(output_dir, "results.csv")) as results_sink:
+            for row in rows:
+                results_sink.write(row)
+        elapsed = time.perf_counter() - started_at
+    return len(rows), "rows", None, elapsed
+
+
+def stage_end_to_end(options):
+    import report_writer
+    from screening_pipeline import ScreeningPipeline
+    pipeline = ScreeningPipeline(llm_workers=options["llm_workers"], parse_workers=options["parse_workers"],
+                                 max_pages=options["max_pages"], cv_batch_size=options["cv_batch_size"],
+                                 cv_cache=None, jd_summary_store=None, log=lambda message: None)
+    with tempfile.TemporaryDirectory() as output_dir:
+        with report_writer.open_results_sink(os.path.join(output_dir, "results.csv")) as results_sink:
+            pipeline.run(options["jd_csv"], options["cv_folder"], on_result=results_sink.write)
+    return len(list_pdfs(options["cv_folder"])), "files", None
+
+
+def run_stage(stage, options):
+    """
+    Runs one stage (in a fresh process, see main) and returns its measurements.
+    """
+    started_at = time.perf_counter()
+    outcome = globals()["stage_" + stage](options)
+    elapsed = time.perf_counter() - started_at
+    items, unit, latencies = outcome[:3]
+    if len(outcome) > 3:
+        elapsed = outcome[3]  # The stage timed only its measured section, without setup
+    peak_rss_mb = None
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    result = {"stage": stage, "items": items, "unit": unit, "seconds": round(elapsed, 4),
+              "items_per_sec": round(items / elapsed, 2) if elapsed else None,
+              "p50_ms": None, "p99_ms": None, "peak_rss_mb": round(peak_rss_mb, 1) if peak_rss_mb is not None else None}
+    if "pool_size" in options:
+        result["stage"] = f"{stage}[{options['pool_size']}]"
+    if latencies:
+        result["p50_ms"] = round(float(np.percentile(latencies, 50)) * 1000, 3)
+        result["p99_ms"] = round(float(np.percentile(latencies, 99)) * 1000, 3)
+    return result
+
+
+def _format_optional(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def print_header():
+    print(f"{'stage':<28} {'items':>8} {'seconds':>9} {'items/sec':>12} {'p50 ms':>9} {'p99 ms':>9} {'peak RSS MB':>12}")
+
+
+def print_result(result):
+    print(f"{result['stage']:<28} {result['items']:>8} {result['seconds']:>9.3f} "
+          f"{_format_optional(result['items_per_sec'], ',.1f'):>12} {_format_optional(result['p50_ms'], '.2f'):>9} "
+          f"{_format_optional(result['p99_ms'], '.2f'):>9} {_format_optional(result['peak_rss_mb'], '.1f'):>12}")
+
+
+def find_regressions(results, baseline_results, tolerance):
+    """
+    Compares throughput with a baseline run.
+
+    Returns:
+        list: (stage, baseline items/sec, current items/sec) for stages slower than the baseline by more
+              than the tolerance (a fraction, e.g. 0.2 for 20%).
+    """
+    baseline_by_stage = {result["stage"]: result for result in baseline_results}
+    regressions = []
+    for result in results:
+        baseline = baseline_by_stage.get(result["stage"])
+        if baseline and baseline.get("items_per_sec") and result["items_per_sec"] is not None:
+            if result["items_per_sec"] < baseline["items_per_sec"] * (1 - tolerance):
+                regressions.append((result["stage"], baseline["items_per_sec"], result["items_per_sec"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark each screening stage and the whole pipeline against a local fake Ollama server.")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of: {', '.join(STAGES)}.")
+    parser.add_argument("--cv-folder", default="data/CVs1")
+    parser.add_argument("--jd-csv", default="data/job_description.csv")
+    parser.add_argument("--pool-sizes", default="1000,10000,100000",
+                        help="Synthetic CV pool sizes for the scoring and report writing stages.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the fake server waits per LLM request.")
+    parser.add_argument("--llm-workers", type=int, default=4)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--cv-batch-size", type=int, default=1)
+    parser.add_argument("--max-pages", type=int, default=None)
+    parser.add_argument("--multiply", type=int, default=3, help="Read every PDF this many times in the PDF stages.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare throughput with.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed throughput drop against the baseline before a stage counts as a regression.")
+    args = parser.parse_args(argv)
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown_stages = [stage for stage in stages if stage not in STAGES]
+    if unknown_stages:
+        parser.error(f"Unknown stages: {', '.join(unknown_stages)}")
+    options = {"cv_folder": args.cv_folder, "jd_csv": args.jd_csv, "llm_workers": args.llm_workers,
+               "parse_workers": args.parse_workers, "cv_batch_size": args.cv_batch_size, "max_pages": args.max_pages,
+               "multiply": args.multiply}
+    runs = []
+    for stage in stages:
+        if stage in SCALED_STAGES:
+            runs.extend((stage, dict(options, pool_size=int(pool_size))) for pool_size in args.pool_sizes.split(","))
+        else:
+            runs.append((stage, options))
+
+    results = []
+    with FakeOllamaServer(latency=args.latency) as fake_server:
+        # The stage processes (and the agents' default LLM client) talk to the fake server
+        os.environ["OLLAMA_HOST"] = fake_server.host
+        print(f"Fake Ollama server at {fake_server.host}, {args.latency * 1000:.0f} ms per request\n")
+        spawn_context = multiprocessing.get_context("spawn")
+        print_header()
+        for stage, stage_options in runs:
+            # A fresh process per stage, so peak RSS belongs to that stage alone
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn_context) as stage_process:
+                results.append(stage_process.submit(run_stage, stage, stage_options).result())
+            print_result(results[-1])
+        llm_requests = fake_server.request_count
+    print(f"\n{llm_requests} LLM requests served")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump({"options": vars(args), "results": results}, json_file, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file)["results"], args.tolerance)
+        for stage, baseline_rate, current_rate in regressions:
+            print(f"REGRESSION {stage}: {current_rate:,.1f}/sec vs {baseline_rate:,.1f}/sec in the baseline")
+        if regressions:
+            return 1
+        print(f"No stage is more than {args.tolerance:.0%} slower than the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from instrumentation import get_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+DEFAULT_CV_CACHE_DIR = os.path.join(DEFAULT_CACHE_ROOT, "cv_extractions")
+DEFAULT_JD_CACHE_DIR = os.path.join(DEFAULT_CACHE_ROOT, "jd_summaries")
+
+
+class DiskCache:
+    EVICT_EVERY_N_PUTS = 100  # Eviction scans the whole directory, so don't run it on every put
+    METRICS_NAME = "disk"  # cache label of this cache's hits and misses in the shared metrics
+
+    def __init__(self, cache_dir, max_entries=None, max_bytes=None, max_age_seconds=None):
+        """
+        Initializes a JSON-on-disk cache stored under cache_dir.
+
+        Args:
+            cache_dir (str): Directory holding the cache entries (created if missing).
+            max_entries (int): Maximum number of entries kept after eviction (None = unlimited).
+            max_bytes (int): Maximum total size of the entries in bytes (None = unlimited).
+            max_age_seconds (float): Entries older than this are treated as missing (None = never expire).
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_evict = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_path(self, key):
+        # Shard by the first two hex characters so no single directory gets huge
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _iter_entry_paths(self):
+        for shard in os.listdir(self.cache_dir):
+            shard_path = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for filename in os.listdir(shard_path):
+                if filename.endswith(".json"):
+                    yield os.path.join(shard_path, filename)
+
+    def _created_at(self, entry_path):
+        try:
+            with open(entry_path, "r", encoding="utf-8") as entry_file:
+                return json.load(entry_file).get("created_at", 0)
+        except (OSError, ValueError):
+            return 0
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None if it is missing or expired.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except FileNotFoundError:
+            self._record_lookup(hit=False)
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable cache entry %s: %s", entry_path, e)
+            self._record_lookup(hit=False)
+            return None
+
+        if self.max_age_seconds is not None and time.time() - entry.get("created_at", 0) > self.max_age_seconds:
+            self.invalidate(key)
+            self._record_lookup(hit=False)
+            return None
+
+        try:
+            os.utime(entry_path)  # Record the access so eviction drops least recently used entries first
+        except OSError:
+            pass
+        self._record_lookup(hit=True)
+        return entry.get("value")
+
+    def _record_lookup(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        get_metrics().increment("cache_lookups", cache=self.METRICS_NAME, result="hit" if hit else "miss")
+
+    def put(self, key, value):
+        """
+        Stores a JSON-serializable value under key. The write is atomic, so readers never see partial entries.
+        """
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        # A unique temporary file per write: worker threads may store the same key (identical CVs) at once
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), prefix=key, suffix=".tmp")
+        try:
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as entry_file:
+                json.dump({"created_at": time.time(), "value": value}, entry_file)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._puts_since_evict += 1
+        if self._puts_since_evict >= self.EVICT_EVERY_N_PUTS:
+            self.evict()
+
+    def invalidate(self, key):
+        """
+        Removes a single entry. Returns True if an entry was removed.
+        """
+        try:
+            os.remove(self._entry_path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self):
+        """
+        Removes every entry in the cache. Returns the number of entries removed.
+        """
+        removed = 0
+        for entry_path in list(self._iter_entry_paths()):
+            try:
+                os.remove(entry_path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def evict(self):
+        """
+        Drops expired entries, then least recently used entries until the size limits are met.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        self._puts_since_evict = 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for entry_path in self._iter_entry_paths():
+            try:
+                stat = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            # mtime is bumped on every hit, so age has to come from the creation time stored in the entry
+            if self.max_age_seconds is not None and now - self._created_at(entry_path) > self.max_age_seconds:
+                os.remove(entry_path)
+                removed += 1
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        entries.sort()  # Least recently used first
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and ((self.max_entries is not None and len(entries) > self.max_entries)
+                           or (self.max_bytes is not None and total_bytes > self.max_bytes)):
+            _, size, entry_path = entries.pop(0)
+            try:
+                os.remove(entry_path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+        return removed
+
+    def stats(self):
+        """
+        Returns a dictionary with the entry count, total size and hit/miss counters of this cache.
+        """
+        entry_count = 0
+        total_bytes = 0
+        for entry_path in self._iter_entry_paths():
+            try:
+                total_bytes += os.path.getsize(entry_path)
+                entry_count += 1
+            except FileNotFoundError:
+                pass
+        return {"cache_dir": self.cache_dir, "entries": entry_count, "bytes": total_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+class CVExtractionCache(DiskCache):
+    METRICS_NAME = "cv"
+
+    def __init__(self, cache_dir=DEFAULT_CV_CACHE_DIR, max_entries=None, max_bytes=None, max_age_seconds=None):
+        """
+        Cache of CVAgent.extract_cv_data results, addressed by the PDF content rather than its filename.
+        """
+        super().__init__(cache_dir, max_entries=max_entries, max_bytes=max_bytes, max_age_seconds=max_age_seconds)
+
+    @staticmethod
+    def make_key(pdf_bytes, model_name, prompt_version):
+        """
+        Builds the cache key from the PDF bytes, the model name and the prompt version, so a change to any
+        of them produces a fresh extraction.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(pdf_bytes)
+        hasher.update(b"\0" + model_name.encode("utf-8"))
+        hasher.update(b"\0" + str(prompt_version).encode("utf-8"))
+        return hasher.hexdigest()
+
+    def key_for_file(self, file_path, model_name, prompt_version):
+        with open(file_path, "rb") as pdf_file:
+            return self.make_key(pdf_file.read(), model_name, prompt_version)
+
+
+class JDSummaryStore:
+    def __init__(self, cache_dir=DEFAULT_JD_CACHE_DIR, memory_entries=256, max_entries=None, max_age_seconds=None):
+        """
+        Two-tier store of JDSummarizerAgent.summarize_jd results: an in-memory LRU in front of a DiskCache.
+
+        Args:
+            cache_dir (str): Directory of the disk tier (None keeps summaries in memory only).
+            memory_entries (int): Number of summaries kept in the in-memory LRU tier.
+            max_entries (int): Entry limit of the disk tier (None = unlimited).
+            max_age_seconds (float): Age limit of the disk tier (None = never expire).
+        """
+        self.memory_entries = memory_entries
+        self.disk_cache = DiskCache(cache_dir, max_entries=max_entries, max_age_seconds=max_age_seconds) if cache_dir else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(jd_text, model_name, prompt_version):
+        """
+        Builds the key from the whitespace-normalized JD text, the model name and the prompt version, so
+        re-exported CSVs with different line breaks or spacing still hit the store.
+        """
+        normalized_text = " ".join(str(jd_text).split())
+        payload = "\0".join([normalized_text, model_name, str(prompt_version)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, summary):
+        self._memory[key] = summary
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Returns the stored summary for key, or None. Disk hits are promoted to the memory tier.
+        """
+        with self._lock:
+            summary = self._memory.get(key)
+            if summary is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                get_metrics().increment("cache_lookups", cache="jd", result="memory_hit")
+                return summary
+
+        summary = self.disk_cache.get(key) if self.disk_cache is not None else None
+        with self._lock:
+            if summary is None:
+                self.misses += 1
+                get_metrics().increment("cache_lookups", cache="jd", result="miss")
+                return None
+            self.disk_hits += 1
+            get_metrics().increment("cache_lookups", cache="jd", result="disk_hit")
+            self._remember(key, summary)
+            return summary
+
+    def put(self, key, summary):
+        with self._lock:
+            self._remember(key, summary)
+        if self.disk_cache is not None:
+            self.disk_cache.put(key, summary)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        return self.disk_cache.clear() if self.disk_cache is not None else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the CV extraction cache.")
+    parser.add_argument("command", choices=["stats", "evict", "clear", "invalidate", "clear-jd"])
+    parser.add_argument("pdf_files", nargs="*", help="PDF files whose entries should be invalidated (for 'invalidate').")
+    parser.add_argument("--cache-dir", default=DEFAULT_CV_CACHE_DIR)
+    parser.add_argument("--model", default="mistral", help="Model name the entries were extracted with (for 'invalidate').")
+    parser.add_argument("--prompt-version", default=None, help="Prompt version of the entries (for 'invalidate'). Defaults to CVAgent.PROMPT_VERSION.")
+    parser.add_argument("--max-entries", type=int, default=None)
+    parser.add_argument("--max-bytes", type=int, default=None)
+    parser.add_argument("--max-age-days", type=float, default=None)
+    args = parser.parse_args()
+
+    max_age_seconds = args.max_age_days * 86400 if args.max_age_days is not None else None
+    cache = CVExtractionCache(args.cache_dir, max_entries=args.max_entries, max_bytes=args.max_bytes,
+                              max_age_seconds=max_age_seconds)
+
+    if args.command == "stats":
+        print(cache.stats())
+    elif args.command == "evict":
+        print(f"Evicted {cache.evict()} entries from {args.cache_dir}")
+    elif args.command == "clear":
+        print(f"Removed {cache.clear()} entries from {args.cache_dir}")
+    elif args.command == "clear-jd":
+        print(f"Removed {JDSummaryStore().clear()} JD summaries from {DEFAULT_JD_CACHE_DIR}")
+    elif args.command == "invalidate":
+        prompt_version = args.prompt_version
+        if prompt_version is None:
+            from cv_agent import CVAgent
+            prompt_version = CVAgent.PROMPT_VERSION
+        for pdf_file in args.pdf_files:
+            removed = cache.invalidate(cache.key_for_file(pdf_file, args.model, prompt_version))
+            print(f"{pdf_file}: {'invalidated' if removed else 'not cached'}")
@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from cache_store import DEFAULT_CACHE_ROOT
+from skill_index import tokenize_skills
+
+DEFAULT_CANDIDATE_DB = os.path.join(DEFAULT_CACHE_ROOT, "candidates.sqlite3")
+BULK_INSERT_ROWS = 5000  # Score rows buffered by ResultRecorder before they are written in one transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    candidate_id INTEGER PRIMARY KEY,
+    cv_folder TEXT NOT NULL,
+    cv_filename TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    email_key TEXT,
+    phone_number TEXT,
+    skills TEXT,
+    record TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (cv_folder, cv_filename)
+);
+CREATE INDEX IF NOT EXISTS candidates_email_key ON candidates (email_key);
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    skill TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    PRIMARY KEY (skill, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS candidate_skills_candidate ON candidate_skills (candidate_id);
+CREATE TABLE IF NOT EXISTS jd_summaries (
+    job_title TEXT PRIMARY KEY,
+    required_skills TEXT,
+    summary TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    job_title TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    match_score REAL NOT NULL,
+    shortlisted INTEGER NOT NULL,
+    scored_at REAL NOT NULL,
+    PRIMARY KEY (job_title, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_job_score ON scores (job_title, match_score DESC);
+CREATE INDEX IF NOT EXISTS scores_candidate ON scores (candidate_id);
+"""
+
+
+def email_key(email):
+    """
+    Normalizes an email address for duplicate detection (None when there is no usable address).
+    """
+    email = str(email or "").strip().lower()
+    return email if "@" in email else None
+
+
+class CandidateStore:
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path=DEFAULT_CANDIDATE_DB):
+        """
+        Embedded SQLite store of extracted CV records, JD summaries and match scores, so candidates and their
+        scores survive between sessions and can be queried without re-screening. CVs are identified by their
+        folder and filename; skills are stored one row per skill, indexed for lookups.
+
+        Args:
+            db_path (str): SQLite database file (created if missing), or ":memory:".
+        """
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # The GUI creates the store on the Tk thread and writes to it from the screening thread
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            # Bulk inserts into the skill index touch pages all over the B-tree; a bigger page cache keeps them in memory
+            self._connection.execute("PRAGMA cache_size=-65536")
+            schema_version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            if schema_version not in (0, self.SCHEMA_VERSION):
+                raise ValueError(f"Candidate store {db_path} has schema version {schema_version}, "
+                                 f"expected {self.SCHEMA_VERSION}")
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _folder_key(cv_folder):
+        return os.path.abspath(cv_folder)
+
+    def _candidate_ids(self, cv_folder):
+        # Called with the lock held
+        return dict(self._connection.execute("SELECT cv_filename, candidate_id FROM candidates WHERE cv_folder = ?",
+                                             (cv_folder,)))
+
+    def upsert_candidates(self, cv_folder, cv_data_by_filename):
+        """
+        Inserts or updates the records of many CVs from one folder in a single transaction. An updated CV keeps
+        its candidate ID, so its stored scores stay attached to it.
+
+        Returns:
+            int: Number of CVs written.
+        """
+        cv_folder = self._folder_key(cv_folder)
+        now = time.time()
+        candidate_rows = []
+        skills_by_filename = {}
+        for cv_filename, cv_data in cv_data_by_filename.items():
+            skills = tokenize_skills(cv_data.get("skills", ""))
+            skills_by_filename[cv_filename] = set(skills)
+            candidate_rows.append((cv_folder, cv_filename, cv_data.get("name"), cv_data.get("email"),
+                                   email_key(cv_data.get("email")), cv_data.get("phone_number"), ", ".join(skills),
+                                   json.dumps(cv_data, default=str), now))
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO candidates (cv_folder, cv_filename, name, email, email_key, phone_number, skills, record, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (cv_folder, cv_filename) DO UPDATE SET "
+                "name = excluded.name, email = excluded.email, email_key = excluded.email_key, "
+                "phone_number = excluded.phone_number, skills = excluded.skills, record = excluded.record, "
+                "updated_at = excluded.updated_at", candidate_rows)
+            candidate_ids = self._candidate_ids(cv_folder)
+            updated_ids = [(candidate_ids[cv_filename],) for cv_filename in cv_data_by_filename]
+            self._connection.executemany("DELETE FROM candidate_skills WHERE candidate_id = ?", updated_ids)
+            self._connection.executemany(
+                "INSERT INTO candidate_skills VALUES (?, ?)",
+                [(skill, candidate_ids[cv_filename]) for cv_filename, skills in skills_by_filename.items() for skill in skills])
+        return len(candidate_rows)
+
+    def remove_candidates(self, cv_folder, cv_filenames):
+        """
+        Deletes CVs (with their skills and scores), e.g. files removed from the folder.
+        """
+        with self._lock, self._connection:
+            candidate_ids = self._candidate_ids(self._folder_key(cv_folder))
+            removed_ids = [(candidate_ids[cv_filename],) for cv_filename in cv_filenames if cv_filename in candidate_ids]
+            for table in ("candidate_skills", "scores", "candidates"):
+                self._connection.executemany(f"DELETE FROM {table} WHERE candidate_id = ?", removed_ids)
+
+    def upsert_jd(self, job_title, jd_data):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO jd_summaries VALUES (?, ?, ?, ?)",
+                                     (job_title, ", ".join(tokenize_skills(jd_data.get("required_skills", ""))),
+                                      json.dumps(jd_data, default=str), time.time()))
+
+    def record_scores(self, cv_folder, result_rows):
+        """
+        Inserts or replaces many result rows (as emitted by ScreeningPipeline) in a single transaction.
+        Rows of CVs that aren't in the store are skipped.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            candidate_ids = self._candidate_ids(self._folder_key(cv_folder))
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+                [(row["job_title"], candidate_ids[row["cv_filename"]], row["match_score"],
+                  int(bool(row.get("shortlisted"))), now) for row in result_rows if row["cv_filename"] in candidate_ids])
+
+    def get_candidate(self, cv_folder, cv_filename):
+        """
+        Returns the stored CV record, or None.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT record FROM candidates WHERE cv_folder = ? AND cv_filename = ?",
+                                           (self._folder_key(cv_folder), cv_filename)).fetchone()
+        return json.loads(row["record"]) if row is not None else None
+
+    def get_jd_summary(self, job_title):
+        with self._lock:
+            row = self._connection.execute("SELECT summary FROM jd_summaries WHERE job_title = ?", (job_title,)).fetchone()
+        return json.loads(row["summary"]) if row is not None else None
+
+    def candidates_for_job(self, job_title, min_score=None, shortlisted_only=False, limit=None):
+        """
+        Returns the stored results of one job, best first, e.g. every candidate scoring at least 70 for
+        "Data Scientist". Served from the (job_title, match_score) index without re-screening.
+
+        Returns:
+            list: Dictionaries with the result row fields plus "cv_folder" and "scored_at".
+        """
+        query = ("SELECT s.job_title, c.cv_folder, c.cv_filename, c.name AS candidate_name, s.match_score, "
+                 "c.email, c.phone_number, s.shortlisted, s.scored_at "
+                 "FROM scores s JOIN candidates c ON c.candidate_id = s.candidate_id WHERE s.job_title = ?")
+        parameters = [job_title]
+        if min_score is not None:
+            query += " AND s.match_score >= ?"
+            parameters.append(min_score)
+        if shortlisted_only:
+            query += " AND s.shortlisted = 1"
+        query += " ORDER BY s.match_score DESC, c.cv_filename"
+        if limit:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(query, parameters)]
+
+    def candidates_with_skills(self, skills, match_all=True):
+        """
+        Returns (cv_folder, cv_filename) of the CVs having all (or, with match_all=False, any) of the skills.
+        """
+        skills = list(dict.fromkeys(tokenize_skills(skills)))
+        if not skills:
+            return []
+        placeholders = ", ".join("?" * len(skills))
+        query = (f"SELECT candidate_id FROM candidate_skills WHERE skill IN ({placeholders}) GROUP BY candidate_id")
+        parameters = list(skills)
+        if match_all:
+            query += " HAVING COUNT(*) = ?"
+            parameters.append(len(skills))
+        query = (f"SELECT cv_folder, cv_filename FROM candidates WHERE candidate_id IN ({query}) "
+                 f"ORDER BY cv_folder, cv_filename")
+        with self._lock:
+            return [tuple(row) for row in self._connection.execute(query, parameters)]
+
+    def duplicate_emails(self, cv_folder=None):
+        """
+        Finds CVs sharing an email address (case-insensitive), e.g. the same candidate applying twice.
+
+        Args:
+            cv_folder (str): Only report duplicates involving at least one CV from this folder.
+
+        Returns:
+            dict: Maps each shared email to the list of (cv_folder, cv_filename) having it.
+        """
+        query = ("SELECT email_key, cv_folder, cv_filename FROM candidates WHERE email_key IN "
+                 "(SELECT email_key FROM candidates WHERE email_key IS NOT NULL GROUP BY email_key HAVING COUNT(*) > 1)")
+        parameters = []
+        if cv_folder is not None:
+            query += " AND email_key IN (SELECT email_key FROM candidates WHERE cv_folder = ?)"
+            parameters.append(self._folder_key(cv_folder))
+        duplicates = {}
+        with self._lock:
+            for row in self._connection.execute(query + " ORDER BY email_key, cv_folder, cv_filename", parameters):
+                duplicates.setdefault(row["email_key"], []).append((row["cv_folder"], row["cv_filename"]))
+        return duplicates
+
+    def stats(self):
+        with self._lock:
+            counts = {table: self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("candidates", "candidate_skills", "jd_summaries", "scores")}
+        return dict(counts, db_path=self.db_path)
+
+
+class ResultRecorder:
+    def __init__(self, candidate_store, cv_folder, on_result=None, chunk_size=BULK_INSERT_ROWS):
+        """
+        Result callback that writes the rows to a CandidateStore in chunked transactions and passes them on
+        to on_result. Call flush() when the run is over.
+        """
+        self.candidate_store = candidate_store
+        self.cv_folder = cv_folder
+        self.on_result = on_result
+        self.chunk_size = chunk_size
+        self._pending_rows = []
+
+    def __call__(self, result_row):
+        self._pending_rows.append(dict(result_row))
+        if len(self._pending_rows) >= self.chunk_size:
+            self.flush()
+        if self.on_result is not None:
+            self.on_result(result_row)
+
+    def flush(self):
+        if self._pending_rows:
+            self.candidate_store.record_scores(self.cv_folder, self._pending_rows)
+            self._pending_rows = []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the candidate store without re-screening.")
+    parser.add_argument("command", choices=["stats", "job", "skills", "duplicates"])
+    parser.add_argument("values", nargs="*", help="Job title (for 'job') or skills (for 'skills').")
+    parser.add_argument("--db", default=DEFAULT_CANDIDATE_DB)
+    parser.add_argument("--min-score", type=float, default=None, help="Minimum match score (for 'job').")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--any", action="store_true", help="Match any of the skills instead of all (for 'skills').")
+    args = parser.parse_args()
+
+    with CandidateStore(args.db) as store:
+        if args.command == "stats":
+            print(store.stats())
+        elif args.command == "job":
+            started_at = time.perf_counter()
+            rows = store.candidates_for_job(" ".join(args.values), min_score=args.min_score, limit=args.limit)
+            elapsed = time.perf_counter() - started_at
+            for row in rows:
+                print(f"  {row['match_score']:6.2f}%  {row['cv_filename']}  {row['candidate_name']}  {row['email']}")
+            print(f"{len(rows)} candidates in {elapsed * 1000:.1f} ms")
+        elif args.command == "skills":
+            matches = store.candidates_with_skills(args.values, match_all=not args.any)
+            for cv_folder, cv_filename in matches[:args.limit]:
+                print(f"  {os.path.join(cv_folder, cv_filename)}")
+            print(f"{len(matches)} candidates")
+        elif args.command == "duplicates":
+            for email, cvs in store.duplicate_emails().items():
+                print(f"  {email}: {', '.join(os.path.join(cv_folder, cv_filename) for cv_folder, cv_filename in cvs)}")
@@ -1,105 +1,484 @@
-import ollama
+import logging
+import mmap
+import threading
+import time
 import fitz  # PyMuPDF
 
+import cv_compactor
+import llm_client
+import llm_json
+import model_cascade
+import rule_extractor
+from instrumentation import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Short CVs that fit together in one request; with the instructions and the JSON answers this stays inside
+# Ollama's default 2048-token context
+DEFAULT_BATCH_TOKEN_BUDGET = 1000
+
+
 class CVAgent:
-    def __init__(self, model_name='mistral'):
+    PROMPT_VERSION = "4"  # Bump whenever the extraction prompt changes so cached extractions are invalidated
+    # "llm" asks the LLM for every field and overrides email/phone with the rule-based values; the other modes
+    # never call the LLM and fill only the fields the rules can find
+    EXTRACTION_MODES = ("llm", "rules", "contact-only", "skills-only")
+    EXTRACTION_FIELDS = """"name": full name,
+"education": list of degrees with institution and years, most recent or relevant first,
+"work_experience": list of the 2-3 most recent or relevant roles with job title, company, years and key responsibilities,
+"skills": technical and soft skills as one comma-separated string,
+"email": primary personal email address,
+"phone_number": primary phone number.
+Use "" or [] for anything not found."""
+    EXTRACTION_SCHEMA = llm_json.object_schema({
+        "name": {"type": "string"},
+        "education": {"type": "array", "items": {"type": "string"}},
+        "work_experience": {"type": "array", "items": {"type": "string"}},
+        "skills": {"type": "string"},
+        "email": {"type": "string"},
+        "phone_number": {"type": "string"},
+    })
+    BATCH_EXTRACTION_SCHEMA = llm_json.object_schema({
+        "documents": {"type": "array", "items": llm_json.object_schema(
+            dict({"doc_id": {"type": "string"}}, **EXTRACTION_SCHEMA["properties"]))},
+    })
+
+    def __init__(self, model_name='mistral', cache=None, llm_client_instance=None, max_pages=None, max_chars=None,
+                 use_mmap=False, compact_text=True, token_budget=cv_compactor.DEFAULT_TOKEN_BUDGET,
+                 extraction_mode="llm", skills_lexicon=None, structured_output=True, batch_size=1,
+                 batch_token_budget=DEFAULT_BATCH_TOKEN_BUDGET, cascade=None,
+                 cascade_min_skills=model_cascade.DEFAULT_MIN_SKILLS):
         """
-        Initializes the CVAgent with a specified Ollama model.
+        Initializes the CVAgent with a specified Ollama model, an optional CVExtractionCache and an optional
+        LLMClient (the shared default client is used when none is given).
+
+        Args:
+            max_pages (int): Only read the first max_pages pages of each CV (all pages when None).
+            max_chars (int): Truncate the CV text to max_chars characters (no limit when None).
+            use_mmap (bool): Memory-map the PDF file instead of reading it into memory.
+            compact_text (bool): Compact the CV text (see cv_compactor.CVTextCompactor) before prompting.
+            token_budget (int): Maximum estimated tokens of compacted CV text per prompt (no limit when None).
+            extraction_mode (str): One of EXTRACTION_MODES.
+            skills_lexicon (list): Known skills for rule-based skill extraction (defaults to the built-in lexicon).
+            structured_output (bool): Ask Ollama to constrain the answer to EXTRACTION_SCHEMA. Turn it off for
+                                      servers older than Ollama 0.5, which only accept format="json".
+            batch_size (int): Maximum number of CVs packed into one LLM request by extract_cv_data_batch.
+            batch_token_budget (int): Maximum estimated tokens of CV text in one batched request.
+            cascade (list): Cheaper tiers tried before model_name in "llm" mode: "rules" (the rule-based
+                            extractor) and/or smaller model names. A CV only goes on to the next tier when its
+                            extraction fails model_cascade.cv_extraction_problems; model_name has the last word.
+            cascade_min_skills (int): Fewest skills an extraction from a cheaper tier may have to be accepted.
+
+        Raises:
+            ValueError: If extraction_mode is unknown.
         """
+        if extraction_mode not in self.EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode} (expected one of {', '.join(self.EXTRACTION_MODES)})")
         self.model_name = model_name
+        self.cache = cache
+        self.llm_client = llm_client_instance or llm_client.get_default_client()
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.use_mmap = use_mmap
+        self.compactor = cv_compactor.CVTextCompactor(token_budget) if compact_text else None
+        self.extraction_mode = extraction_mode
+        self.rule_extractor = rule_extractor.RuleBasedExtractor(skills_lexicon)
+        self.structured_output = structured_output
+        self.parse_stats = llm_json.ParseStats("cv")
+        self.batch_size = max(1, batch_size)
+        self.batch_token_budget = batch_token_budget
+        self.batch_requests = 0
+        self.batched_documents = 0
+        self.batch_fallbacks = 0  # Documents re-sent on their own because the batched answer didn't cover them
+        self._batch_stats_lock = threading.Lock()
+        self.cascade = list(cascade or [])
+        self.cascade_tiers = model_cascade.cascade_tiers(self.cascade, model_name)
+        self.cascade_min_skills = cascade_min_skills
+        self.cascade_stats = model_cascade.CascadeStats("cv")
+
+    def cache_version(self):
+        """
+        Version string used in cache keys. Compaction and the page, character and token caps change the text
+        the LLM sees, so they are part of it; with the default settings it is just PROMPT_VERSION.
+        """
+        cache_version = self.PROMPT_VERSION
+        if self.compactor is None:
+            cache_version += ":uncompacted"
+        elif self.compactor.token_budget != cv_compactor.DEFAULT_TOKEN_BUDGET:
+            cache_version += f":budget={self.compactor.token_budget}"
+        if self.max_pages is not None or self.max_chars is not None:
+            cache_version += f":pages={self.max_pages}:chars={self.max_chars}"
+        if self.extraction_mode != "llm":
+            cache_version += f":mode={self.extraction_mode}"
+        elif self.cascade:
+            cache_version += f":cascade={'>'.join(self.cascade)}:min_skills={self.cascade_min_skills}"
+        return cache_version
+
+    @staticmethod
+    def empty_cv_data():
+        return {
+            "name": "",
+            "education": [],
+            "work_experience": [],
+            "skills": "",
+            "email": "",
+            "phone_number": ""
+        }
+
+    def extract_cv_data_with_rules(self, cv_text):
+        """
+        Extracts the CV data without the LLM: contact fields in "rules" and "contact-only" mode, lexicon skills
+        in "rules" and "skills-only" mode. Education and work experience stay empty.
+        """
+        cv_data = self.empty_cv_data()
+        if self.extraction_mode in ("rules", "contact-only"):
+            cv_data.update(self.rule_extractor.extract_contacts(cv_text))
+        if self.extraction_mode in ("rules", "skills-only"):
+            cv_data["skills"] = self.rule_extractor.extract_skills(cv_text)
+        return cv_data
+
+    def merge_rule_fields(self, cv_text, cv_data):
+        """
+        Fills contact fields from the rule-based extractor: a regex match for email or phone number is exact,
+        so it replaces the LLM's answer; name and skills only fall back to the rules when the LLM gave none.
+        """
+        contacts = self.rule_extractor.extract_contacts(cv_text)
+        for field in ("email", "phone_number"):
+            if contacts[field]:
+                cv_data[field] = contacts[field]
+        if not cv_data.get("name"):
+            cv_data["name"] = contacts["name"]
+        if not cv_data.get("skills"):
+            cv_data["skills"] = self.rule_extractor.extract_skills(cv_text)
+        return cv_data
 
     def extract_cv_data(self, cv_text):
         """
         Extracts key data from a CV text using Ollama, including contact info, and structures output in JSON.
         """
-        prompt = f"""
-        Please analyze the following CV text and extract the following information.
-        Organize the extracted information into a JSON-like format (Python dictionary) with keys:
-        "name", "education", "work_experience", "skills", "email", "phone_number". <--- Added email and phone_number
+        if self.extraction_mode != "llm":
+            return self.extract_cv_data_with_rules(cv_text)
+        return self._extract_compacted(cv_text, self.compact_cv_text(cv_text))
 
-        For each section, extract the relevant details as concisely as possible. If a section is not found, leave the corresponding key's value empty.
+    def _extract_compacted(self, cv_text, compacted_text):
+        if self.cascade:
+            return self._extract_with_cascade(cv_text, compacted_text)
+        extracted_data_text = self.llm_client.chat(self.model_name, self._extraction_prompt(compacted_text),
+                                                   format=self.response_format())
+        return self.merge_rule_fields(cv_text, self.parse_extraction_response(extracted_data_text))
 
-        Specifically for "email" and "phone_number", try to find the candidate's primary email address and phone number from the CV. If multiple are listed, choose the most likely personal contact information. If not found, leave them empty.
+    def _extract_with_cascade(self, cv_text, compacted_text):
+        for tier in self.cascade_tiers:
+            start_time = time.perf_counter()
+            if tier == model_cascade.RULES_TIER:
+                cv_data, parsed = self._extract_all_with_rules(cv_text), True
+            else:
+                extracted_data_text = self.llm_client.chat(tier, self._extraction_prompt(compacted_text),
+                                                           format=self.response_format())
+                cv_data, parsed = self._parse_extraction(extracted_data_text)
+                cv_data = self.merge_rule_fields(cv_text, cv_data)
+            if self._accept_tier(tier, cv_data, parsed, time.perf_counter() - start_time):
+                return cv_data
 
-        CV Text:
-        {cv_text}
+    async def _extract_with_cascade_async(self, cv_text):
+        compacted_text = self.compact_cv_text(cv_text)
+        for tier in self.cascade_tiers:
+            start_time = time.perf_counter()
+            if tier == model_cascade.RULES_TIER:
+                cv_data, parsed = self._extract_all_with_rules(cv_text), True
+            else:
+                extracted_data_text = await self.llm_client.achat(tier, self._extraction_prompt(compacted_text),
+                                                                  format=self.response_format())
+                cv_data, parsed = self._parse_extraction(extracted_data_text)
+                cv_data = self.merge_rule_fields(cv_text, cv_data)
+            if self._accept_tier(tier, cv_data, parsed, time.perf_counter() - start_time):
+                return cv_data
 
-        ---
+    def _extract_all_with_rules(self, cv_text):
+        cv_data = self.empty_cv_data()
+        cv_data.update(self.rule_extractor.extract_contacts(cv_text))
+        cv_data["skills"] = self.rule_extractor.extract_skills(cv_text)
+        return cv_data
 
-        Extract the following:
+    def _accept_tier(self, tier, cv_data, parsed, seconds):
+        # The last tier is always accepted; a cheaper one only when its extraction passes the checks
+        problems = model_cascade.cv_extraction_problems(cv_data, parsed, self.cascade_min_skills)
+        accepted = not problems or tier == self.cascade_tiers[-1]
+        self.cascade_stats.record(tier, seconds, accepted, problems)
+        if not accepted:
+            logger.debug("Escalating CV extraction from %s: %s", tier, ", ".join(problems))
+        return accepted
 
-        1.  Full Name of the candidate:
-        2.  Education: (List degrees, institutions, years - if available. Focus on the most recent or relevant education)
-        3.  Work Experience: (Summarize 2-3 most recent or most relevant work experiences, including job titles, companies, and years. Briefly mention key responsibilities for each role)
-        4.  Skills: (List key technical and soft skills mentioned in the CV. Be concise, list skills as comma-separated values)
-        5.  Email Address: (Primary email address for contact) <--- Added instructions for email
-        6.  Phone Number: (Primary phone number for contact) <--- Added instructions for phone
+    def plan_batches(self, compacted_texts):
         """
+        Groups consecutive CV texts into batches of at most batch_size CVs and batch_token_budget estimated tokens.
+        A CV too long to share a request gets a batch of its own.
 
-        response = ollama.chat(
-            model=self.model_name,
-            messages=[
-                {
-                    'role': 'user',
-                    'content': prompt
-                }
-            ]
-        )
-        extracted_data_text = response['message']['content']
+        Returns:
+            list: Lists of positions into compacted_texts.
+        """
+        batches = []
+        batch_tokens = 0
+        for position, compacted_text in enumerate(compacted_texts):
+            text_tokens = cv_compactor.estimate_tokens(compacted_text)
+            if (batches and len(batches[-1]) < self.batch_size
+                    and batch_tokens + text_tokens <= self.batch_token_budget):
+                batches[-1].append(position)
+                batch_tokens += text_tokens
+            else:
+                batches.append([position])
+                batch_tokens = text_tokens
+        return batches
 
-        print("\n--- Raw LLM Response (CV Agent - Contact Info) ---") # Updated print statement
-        print(extracted_data_text)
+    def extract_cv_data_batch(self, cv_texts):
+        """
+        Extracts many CVs with as few LLM requests as possible: short CVs are packed into one prompt that asks
+        for a JSON array of records keyed by document ID. CVs the answer doesn't cover (missing, duplicated or
+        unknown IDs, or an unparseable response) are re-sent one by one.
 
-        # ---  Attempt to parse LLM output as JSON ---
-        extracted_data = {
-            "name": "",
-            "education": [],
-            "work_experience": [],
-            "skills": "",
-            "email": "",       # Added email key
-            "phone_number": ""  # Added phone_number key
-        }
-        try:
-            import json
+        Returns:
+            list: The extracted CV data for each text, in input order.
+        """
+        if self.extraction_mode != "llm":
+            return [self.extract_cv_data_with_rules(cv_text) for cv_text in cv_texts]
+        if self.cascade:
+            # Each CV escalates through the tiers on its own, so a cascade doesn't pack CVs together
+            return [self.extract_cv_data(cv_text) for cv_text in cv_texts]
+        compacted_texts = [self.compact_cv_text(cv_text) for cv_text in cv_texts]
+        results = [None] * len(cv_texts)
+        for batch in self.plan_batches(compacted_texts):
+            if len(batch) == 1:
+                results[batch[0]] = self._extract_compacted(cv_texts[batch[0]], compacted_texts[batch[0]])
+                continue
+            doc_ids = [f"cv{batch_position + 1}" for batch_position in range(len(batch))]
+            extracted_data_text = self.llm_client.chat(
+                self.model_name,
+                self._batch_extraction_prompt(zip(doc_ids, (compacted_texts[position] for position in batch))),
+                format=self.BATCH_EXTRACTION_SCHEMA if self.structured_output else "json")
+            records = self.parse_batch_response(extracted_data_text, doc_ids)
+            fallback_count = 0
+            for doc_id, position in zip(doc_ids, batch):
+                if doc_id in records:
+                    results[position] = self.merge_rule_fields(cv_texts[position], records[doc_id])
+                else:
+                    fallback_count += 1
+                    results[position] = self._extract_compacted(cv_texts[position], compacted_texts[position])
+            with self._batch_stats_lock:
+                self.batch_requests += 1
+                self.batched_documents += len(batch)
+                self.batch_fallbacks += fallback_count
+        return results
 
-            llm_response_json = json.loads(extracted_data_text)
+    async def extract_cv_data_async(self, cv_text):
+        """
+        Async variant of extract_cv_data, for running many CVs through one event loop.
+        """
+        if self.extraction_mode != "llm":
+            return self.extract_cv_data_with_rules(cv_text)
+        if self.cascade:
+            return await self._extract_with_cascade_async(cv_text)
+        extracted_data_text = await self.llm_client.achat(self.model_name, self.build_extraction_prompt(cv_text),
+                                                          format=self.response_format())
+        return self.merge_rule_fields(cv_text, self.parse_extraction_response(extracted_data_text))
+
+    def response_format(self):
+        return self.EXTRACTION_SCHEMA if self.structured_output else "json"
 
-            extracted_data["name"] = llm_response_json.get("name", "")
-            extracted_data["education"] = llm_response_json.get("education", [])
-            extracted_data["work_experience"] = llm_response_json.get("work_experience", [])
-            extracted_data["skills"] = llm_response_json.get("skills", "")
-            extracted_data["email"] = llm_response_json.get("email", "")         # Parse email
-            extracted_data["phone_number"] = llm_response_json.get("phone_number", "") # Parse phone_number
+    def compact_cv_text(self, cv_text):
+        if self.compactor is None:
+            return cv_text
+        with get_metrics().span("prompt_build"):
+            return self.compactor.compact(cv_text)
 
-        except json.JSONDecodeError as json_error:
-            print(f"Warning: Error parsing LLM output as JSON: {json_error}")
-            print(f"Raw LLM Output:\n{extracted_data_text}")
-        except Exception as parse_error:
-            print(f"Warning: General error during JSON parsing: {parse_error}")
-            print(f"Raw LLM Output:\n{extracted_data_text}")
+    def build_extraction_prompt(self, cv_text):
+        """
+        Builds the extraction prompt sent to the LLM for one CV.
+        """
+        return self._extraction_prompt(self.compact_cv_text(cv_text))
 
+    def _extraction_prompt(self, compacted_text):
+        prompt = f"""Extract the candidate's details from the CV below. Answer with one JSON object with the keys:
+{self.EXTRACTION_FIELDS}
+
+CV:
+{compacted_text}
+"""
+        return prompt
+
+    def _batch_extraction_prompt(self, doc_ids_and_texts):
+        documents = "\n\n".join(f"CV id={doc_id}:\n{compacted_text}" for doc_id, compacted_text in doc_ids_and_texts)
+        prompt = f"""Extract the candidate's details from each CV below. Answer with one JSON object {{"documents": [...]}}
+holding one record per CV, in the same order, each with "doc_id" set to the CV's id and the keys:
+{self.EXTRACTION_FIELDS}
+
+{documents}
+"""
+        return prompt
+
+    def parse_extraction_response(self, extracted_data_text):
+        """
+        Parses the raw LLM response into the CV data dictionary, recovering JSON wrapped in fences or prose
+        (see llm_json.parse_json_object) and falling back to empty fields when none can be found.
+        """
+        return self._parse_extraction(extracted_data_text)[0]
+
+    def _parse_extraction(self, extracted_data_text):
+        # Returns (cv_data, parsed); parsed is False when no JSON object could be recovered
+        logger.debug("Raw LLM response (CV Agent):\n%s", extracted_data_text)
+        try:
+            with get_metrics().span("json_parse"):
+                llm_response_json, recovered = llm_json.parse_json_object(extracted_data_text)
+        except ValueError as parse_error:
+            self.parse_stats.record("failed")
+            logger.warning("Error parsing LLM output as JSON: %s", parse_error)
+            logger.debug("Unparseable LLM output:\n%s", extracted_data_text)
+            return self.empty_cv_data(), False
+
+        self.parse_stats.record("recovered" if recovered else "clean")
+        return self._cv_data_from_json(llm_response_json), True
+
+    def _cv_data_from_json(self, llm_response_json):
+        extracted_data = self.empty_cv_data()
+        for field in extracted_data:
+            value = llm_response_json.get(field)
+            if value is not None:
+                extracted_data[field] = value if isinstance(value, (str, list)) else str(value)
         return extracted_data
 
+    def parse_batch_response(self, extracted_data_text, doc_ids):
+        """
+        Splits a batched LLM response into per-CV records.
+
+        Returns:
+            dict: {doc_id: cv_data} for each expected doc_id answered exactly once. IDs that are missing or
+                  answered more than once are left out, so the caller re-sends those CVs on their own.
+        """
+        logger.debug("Raw batched LLM response (CV Agent):\n%s", extracted_data_text)
+        try:
+            with get_metrics().span("json_parse"):
+                llm_response_json, recovered = llm_json.parse_json_object(extracted_data_text)
+        except ValueError as parse_error:
+            self.parse_stats.record("failed")
+            logger.warning("Error parsing batched LLM output as JSON: %s", parse_error)
+            return {}
+        documents = llm_response_json.get("documents")
+        if not isinstance(documents, list):
+            self.parse_stats.record("failed")
+            logger.warning("Batched LLM output has no \"documents\" array")
+            return {}
+        self.parse_stats.record("recovered" if recovered else "clean")
+
+        records = {}
+        answered_doc_ids = [str(document.get("doc_id", "")) for document in documents if isinstance(document, dict)]
+        for document in documents:
+            if not isinstance(document, dict):
+                continue
+            doc_id = str(document.get("doc_id", ""))
+            if doc_id in doc_ids and answered_doc_ids.count(doc_id) == 1:
+                records[doc_id] = self._cv_data_from_json(document)
+        return records
+
+    def lookup_cached_cv(self, file_path, pdf_bytes=None):
+        """
+        Looks up a previous extraction of the CV PDF in the agent's cache.
+
+        Args:
+            file_path (str): Path to the CV PDF.
+            pdf_bytes (bytes): The PDF content, when the caller already read it (saves reading the file again).
+
+        Returns:
+            tuple: (cache_key, cached_cv_data). cache_key is None when no cache is configured,
+                   cached_cv_data is None on a cache miss.
+        """
+        if self.cache is None or self.extraction_mode != "llm":
+            return None, None  # Rule-based extraction is faster than a cache lookup
+        if pdf_bytes is None:
+            cache_key = self.cache.key_for_file(file_path, self.model_name, self.cache_version())
+        else:
+            cache_key = self.cache.make_key(pdf_bytes, self.model_name, self.cache_version())
+        return cache_key, self.cache.get(cache_key)
+
+    def store_cached_cv(self, cache_key, cv_data):
+        """
+        Stores an extraction under cache_key. Failed parses (all fields empty) are not cached so they are retried.
+        """
+        if cache_key is not None and any(cv_data.values()):
+            self.cache.put(cache_key, cv_data)
+
+    def process_cv_file(self, file_path):
+        """
+        Reads a CV PDF and extracts its data, reusing the cached extraction when the same PDF bytes were
+        already extracted with this model and prompt version.
+
+        Args:
+            file_path (str): Path to the CV PDF.
+
+        Returns:
+            dict: The extracted CV data, or None if the CV could not be read.
+        """
+        if self.cache is None or self.extraction_mode != "llm":
+            cv_text = self.read_cv_from_file(file_path)
+            cache_key = None
+        else:
+            # Read the bytes once and use them for both the cache key and the parse
+            try:
+                with open(file_path, 'rb') as pdf_file:
+                    pdf_bytes = pdf_file.read()
+            except OSError as e:
+                logger.error("Could not read CV file for caching at %s: %s", file_path, e)
+                return None
+            cache_key, cached_data = self.lookup_cached_cv(file_path, pdf_bytes)
+            if cached_data is not None:
+                return cached_data
+            cv_text = self.read_cv_from_bytes(pdf_bytes)
+        if not cv_text:
+            return None
+
+        cv_data = self.extract_cv_data(cv_text)
+        self.store_cached_cv(cache_key, cv_data)
+        return cv_data
 
     def read_cv_from_file(self, file_path):
         """
-        Reads CV text from a PDF file.
+        Reads CV text from a PDF file. The file is read into memory in one go (or memory-mapped when use_mmap
+        is set) and parsed from there.
         """
         try:
-            text = ""
-            pdf_document = fitz.open(file_path)
-            for page_number in range(pdf_document.page_count):
-                page = pdf_document.load_page(page_number)
-                text += page.get_text()
-            pdf_document.close()
-            return text
+            with open(file_path, 'rb') as pdf_file:
+                if not self.use_mmap:
+                    return self.read_cv_from_bytes(pdf_file.read())
+                with mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf_map, memoryview(pdf_map) as pdf_view:
+                    return self.read_cv_from_bytes(pdf_view)
         except FileNotFoundError:
-            print(f"Error: CV PDF file not found at {file_path}")
+            logger.error("CV PDF file not found at %s", file_path)
             return None
         except Exception as e:
-            print(f"An error occurred while reading the CV PDF: {e}")
+            logger.error("An error occurred while reading the CV PDF %s: %s", file_path, e)
             return None
 
+    def read_cv_from_bytes(self, pdf_bytes):
+        """
+        Reads CV text from PDF content, keeping at most max_pages pages and max_chars characters.
+        Pages past the character cap are never parsed.
+        """
+        try:
+            with get_metrics().span("pdf_read"), fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+                page_count = pdf_document.page_count
+                if self.max_pages is not None:
+                    page_count = min(page_count, self.max_pages)
+                page_texts = []
+                char_count = 0
+                for page_number in range(page_count):
+                    page_text = pdf_document.load_page(page_number).get_text()
+                    page_texts.append(page_text)
+                    char_count += len(page_text)
+                    if self.max_chars is not None and char_count >= self.max_chars:
+                        break
+            text = "".join(page_texts)
+            return text if self.max_chars is None else text[:self.max_chars]
+        except Exception as e:
+            logger.error("An error occurred while reading the CV PDF: %s", e)
+            return None
 
 if __name__ == "__main__":
     CV_FILE_PATH_DEMO = "data/CVs1/C1061.pdf" # Example CV with likely contact info
@@ -0,0 +1,215 @@
+import math
+import re
+import threading
+
+# Ollama runs Mistral with a 2048-token context by default and silently drops whatever doesn't fit, so the CV
+# text gets what's left after the instructions and the JSON answer.
+DEFAULT_TOKEN_BUDGET = 1500
+CHARS_PER_TOKEN = 4  # Rough average for English text with Mistral-family tokenizers
+
+# Section headings, mapped to their priority when a CV has to be cut down to the token budget
+# (lower is kept first). Sections with priority None are irrelevant to the extracted fields and always dropped.
+SECTION_PRIORITIES = {
+    "contact": 0, "contact details": 0, "contact information": 0, "personal details": 0,
+    "personal information": 0, "personal info": 0,
+    "skills": 1, "key skills": 1, "technical skills": 1, "core skills": 1, "core competencies": 1,
+    "tech stack": 1, "technologies": 1, "tools": 1, "soft skills": 1,
+    "work experience": 2, "experience": 2, "professional experience": 2, "employment history": 2,
+    "employment": 2, "work history": 2, "career history": 2,
+    "education": 3, "academic background": 3, "qualifications": 3, "education and training": 3,
+    "certifications": 4, "certificates": 4, "licenses and certifications": 4,
+    "summary": 5, "profile": 5, "professional summary": 5, "objective": 5, "career objective": 5,
+    "about me": 5, "projects": 5, "languages": 5,
+    "references": None, "referees": None, "hobbies": None, "interests": None, "hobbies and interests": None,
+    "personal interests": None, "declaration": None, "achievements": None, "awards": None,
+    "honors": None, "honours": None, "awards and achievements": None, "publications": None,
+    "extracurricular activities": None, "volunteering": None,
+}
+PREAMBLE_PRIORITY = 0  # The lines before the first heading hold the name and contact details
+
+_HORIZONTAL_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_BULLET_RE = re.compile(r"^[\u2022\u25cf\u25aa\u25a0\u2023\u2043\u2219\u25e6\u27a2\u2013\u2014*>-]+\s*")
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$|^-\s*\d+\s*-$", re.IGNORECASE)
+_TITLE_RE = re.compile(r"^(candidate\s+)?(r[e\u00e9]sum[e\u00e9]|cv|curriculum vitae)(\s*\(id:?[^)]*\))?$", re.IGNORECASE)
+_BOILERPLATE_RE = re.compile(r"^(references (are )?available (up)?on request\.?|i hereby declare\b.*)$", re.IGNORECASE)
+_MIN_REPEATED_LINE_CHARS = 20  # Long lines repeated verbatim are running headers/footers; short ones may be dates
+
+
+def estimate_tokens(text):
+    """
+    Estimates the number of LLM tokens in text from its length (no tokenizer needed).
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+class CVTextCompactor:
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET):
+        """
+        Shrinks CV text before it goes into the extraction prompt: normalizes whitespace, drops page numbers,
+        repeated headers/footers, title and boilerplate lines and sections irrelevant to the extracted fields,
+        and then cuts the lowest-priority sections until the text fits the token budget.
+
+        Args:
+            token_budget (int): Maximum estimated tokens of CV text per prompt (no limit when None).
+        """
+        self.token_budget = token_budget
+        self.documents = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.budget_truncations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _heading_key(line):
+        return line.rstrip(":").strip().lower().replace("&", "and") if len(line) <= 40 else None
+
+    def _clean_lines(self, cv_text):
+        lines = []
+        seen_long_lines = set()
+        for line in cv_text.splitlines():
+            line = _BULLET_RE.sub("- ", _HORIZONTAL_SPACE_RE.sub(" ", line).strip())
+            if line in ("", "-") or _PAGE_NUMBER_RE.match(line) or _TITLE_RE.match(line) or _BOILERPLATE_RE.match(line):
+                continue
+            if len(line) >= _MIN_REPEATED_LINE_CHARS:
+                if line in seen_long_lines:
+                    continue
+                seen_long_lines.add(line)
+            lines.append(line)
+        return lines
+
+    def _split_sections(self, lines):
+        """
+        Returns a list of [priority, lines] in document order; the first entry is the preamble.
+        """
+        sections = [[PREAMBLE_PRIORITY, []]]
+        for line in lines:
+            heading_key = self._heading_key(line)
+            if heading_key in SECTION_PRIORITIES:
+                sections.append([SECTION_PRIORITIES[heading_key], [line]])
+            else:
+                sections[-1][1].append(line)
+        return [section for section in sections if section[0] is not None and section[1]]
+
+    def _fit_budget(self, sections):
+        max_chars = self.token_budget * CHARS_PER_TOKEN
+        kept_lines = [[] for _ in sections]
+        used_chars = 0
+        # Fill the budget in priority order (ties in document order), line by line, then restore document order
+        for section_position in sorted(range(len(sections)), key=lambda position: sections[position][0]):
+            for line in sections[section_position][1]:
+                if used_chars + len(line) + 1 > max_chars:
+                    return [line for section_lines in kept_lines for line in section_lines], True
+                kept_lines[section_position].append(line)
+                used_chars += len(line) + 1
+        return [line for section_lines in kept_lines for line in section_lines], False
+
+    def compact(self, cv_text):
+        """
+        Returns the compacted CV text and updates the token statistics.
+        """
+        sections = self._split_sections(self._clean_lines(cv_text or ""))
+        truncated = False
+        if self.token_budget is None:
+            lines = [line for _, section_lines in sections for line in section_lines]
+        else:
+            lines, truncated = self._fit_budget(sections)
+        compacted_text = "\n".join(lines)
+        with self._lock:
+            self.documents += 1
+            self.tokens_before += estimate_tokens(cv_text)
+            self.tokens_after += estimate_tokens(compacted_text)
+            self.budget_truncations += truncated
+        return compacted_text
+
+    def stats(self):
+        with self._lock:
+            tokens_saved = self.tokens_before - self.tokens_after
+            return {
+                "documents": self.documents,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": tokens_saved,
+                "percent_saved": round(100.0 * tokens_saved / self.tokens_before, 1) if self.tokens_before else 0.0,
+                "budget_truncations": self.budget_truncations,
+            }
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
+    import cv_agent
+    from rule_extractor import RuleBasedExtractor
+    from skill_index import tokenize_skills
+
+    EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+    PHONE_RE = re.compile(r"^\s*(?:phone|mobile|tel)\w*\s*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+    NAME_RE = re.compile(r"^\s*name\s*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+
+    def expected_skills(raw_text, skill_extractor):
+        # Lexicon skills of the raw text, found independently of the compactor's section split. Only skills
+        # mentioned nowhere but under headings that are dropped by design (references, hobbies, ...) are exempt.
+        kept_lines, dropping = [], False
+        for line in raw_text.splitlines():
+            heading = line.strip().rstrip(":").strip().lower()
+            if heading in SECTION_PRIORITIES:
+                dropping = SECTION_PRIORITIES[heading] is None
+            if not dropping:
+                kept_lines.append(line)
+        return set(tokenize_skills(skill_extractor.extract_skills("\n".join(kept_lines))))
+
+    parser = argparse.ArgumentParser(
+        description="Regression check for CV compaction: reports tokens saved and verifies that the name, email, "
+                    "phone number and skills found in each raw CV are still in the compacted text "
+                    "(and, with --llm, that the LLM extracts the same fields from both).")
+    parser.add_argument("--cv-folder", default="data/CVs1")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET)
+    parser.add_argument("--llm", action="store_true", help="Also extract every CV from raw and compacted text and compare.")
+    parser.add_argument("--model", default="mistral")
+    args = parser.parse_args()
+
+    reader = cv_agent.CVAgent(compact_text=False)
+    compactor = CVTextCompactor(token_budget=args.token_budget)
+    skill_extractor = RuleBasedExtractor()
+    failures = []
+    cv_file_names = sorted(filename for filename in os.listdir(args.cv_folder) if filename.lower().endswith(".pdf"))
+    for cv_filename in cv_file_names:
+        raw_text = reader.read_cv_from_file(os.path.join(args.cv_folder, cv_filename)) or ""
+        compacted_text = compactor.compact(raw_text)
+        expected_values = [match.group(0) for match in EMAIL_RE.finditer(raw_text)]
+        expected_values += [match.group(1).strip() for match in PHONE_RE.finditer(raw_text)]
+        expected_values += [match.group(1).strip() for match in NAME_RE.finditer(raw_text)]
+        missing_values = [value for value in expected_values if value not in compacted_text]
+        compacted_skills = set(tokenize_skills(skill_extractor.extract_skills(compacted_text)))
+        missing_values += sorted(expected_skills(raw_text, skill_extractor) - compacted_skills)
+        if missing_values:
+            failures.append((cv_filename, missing_values))
+
+    stats = compactor.stats()
+    print(f"{stats['documents']} CVs: {stats['tokens_before']:,} -> {stats['tokens_after']:,} estimated tokens "
+          f"({stats['tokens_saved']:,} saved, {stats['percent_saved']}%), "
+          f"{stats['budget_truncations']} cut to the {args.token_budget}-token budget")
+    for cv_filename, missing_values in failures:
+        print(f"  {cv_filename}: lost {missing_values}")
+    print(f"Text check: {len(cv_file_names) - len(failures)}/{len(cv_file_names)} CVs keep their name, email, phone and skills.")
+
+    degraded = 0
+    if args.llm:
+        raw_agent = cv_agent.CVAgent(model_name=args.model, compact_text=False)
+        compact_agent = cv_agent.CVAgent(model_name=args.model, token_budget=args.token_budget)
+        for cv_filename in cv_file_names:
+            cv_text = reader.read_cv_from_file(os.path.join(args.cv_folder, cv_filename)) or ""
+            raw_data = raw_agent.extract_cv_data(cv_text)
+            compact_data = compact_agent.extract_cv_data(cv_text)
+            changed_fields = [field for field in ("name", "email", "phone_number")
+                              if str(raw_data.get(field, "")).strip().lower() != str(compact_data.get(field, "")).strip().lower()]
+            raw_skills = set(tokenize_skills(raw_data.get("skills")))
+            if raw_skills and len(raw_skills & set(tokenize_skills(compact_data.get("skills")))) < 0.8 * len(raw_skills):
+                changed_fields.append("skills")
+            if changed_fields:
+                degraded += 1
+                print(f"  {cv_filename}: degraded {changed_fields}")
+        print(f"LLM check: {len(cv_file_names) - degraded}/{len(cv_file_names)} CVs extract the same fields from compacted text.")
+    if failures or degraded:
+        sys.exit(1)  # Fail CI, like benchmark_suite.py --baseline on a regression
@@ -0,0 +1,233 @@
+import hashlib
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from candidate_store import email_key
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.85  # Estimated Jaccard similarity of two CVs' shingles to count as near-duplicates
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 similarity become LSH candidates
+DEFAULT_SHINGLE_SIZE = 5  # Words per shingle
+
+_HASH_SHIFT = np.uint64(32)
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_cv_text(cv_text):
+    """
+    Lower-cases the text and collapses whitespace, so re-exports of the same CV with different line breaks match.
+    """
+    return " ".join(str(cv_text).lower().split())
+
+
+def text_shingles(cv_text, shingle_size=DEFAULT_SHINGLE_SIZE):
+    """
+    Returns the set of word shingles (runs of shingle_size consecutive words) of the text. A text shorter
+    than one shingle is a single shingle.
+    """
+    words = _WORD_RE.findall(str(cv_text).lower())
+    if len(words) <= shingle_size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[position:position + shingle_size]) for position in range(len(words) - shingle_size + 1)}
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=DEFAULT_SIMILARITY_THRESHOLD, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS,
+                 shingle_size=DEFAULT_SHINGLE_SIZE, seed=1):
+        """
+        Initializes an empty, thread-safe index that clusters CV texts as they are added: exact duplicates by
+        a hash of the normalized text, near-duplicates (re-submissions with small edits) by MinHash signatures
+        looked up through locality-sensitive hashing, and clusters through union-find.
+
+        Args:
+            threshold (float): Minimum estimated Jaccard similarity of two texts' shingles to link them.
+            num_perm (int): Number of MinHash permutations per signature.
+            bands (int): Number of LSH bands; num_perm must be a multiple of it.
+            shingle_size (int): Words per shingle.
+            seed (int): Seed of the MinHash permutations.
+
+        Raises:
+            ValueError: If num_perm isn't a multiple of bands.
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        random_state = np.random.RandomState(seed)
+        # Multiply-shift hashing: an odd 64-bit multiplier and a 64-bit offset per permutation
+        self._perm_a = random_state.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._perm_b = random_state.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2)
+
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self._exact = {}  # hash of the normalized text -> first doc ID with it
+        self._signatures = {}  # doc ID -> MinHash signature (uint32 array)
+        self._buckets = [{} for _ in range(bands)]  # per band: band bytes -> list of doc IDs
+        self._parent = {}  # union-find parent of each doc ID
+        self._order = {}  # doc ID -> insertion number; the earliest doc is always its cluster's representative
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._parent)
+
+    def signature(self, cv_text):
+        """
+        Returns the MinHash signature of the text's shingles, or None when the text has no words.
+        """
+        shingles = text_shingles(cv_text, self.shingle_size)
+        if not shingles:
+            return None
+        shingle_hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                                     dtype=np.uint64, count=len(shingles))
+        # The high 32 bits of (a * x + b) mod 2**64; numpy's uint64 arithmetic wraps around, which is the "mod"
+        permuted = (np.outer(shingle_hashes, self._perm_a) + self._perm_b) >> _HASH_SHIFT
+        return permuted.min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(signature, other_signature):
+        """
+        Estimates the Jaccard similarity of two texts' shingle sets from their MinHash signatures.
+        """
+        return float(np.count_nonzero(signature == other_signature)) / len(signature)
+
+    def _find(self, doc_id):
+        root = doc_id
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[doc_id] != root:  # Path compression
+            self._parent[doc_id], doc_id = root, self._parent[doc_id]
+        return root
+
+    def _union(self, doc_id, other_doc_id):
+        root, other_root = self._find(doc_id), self._find(other_doc_id)
+        if root != other_root:
+            if self._order[other_root] < self._order[root]:
+                root, other_root = other_root, root
+            self._parent[other_root] = root
+        return root
+
+    def add(self, doc_id, cv_text):
+        """
+        Adds a CV text and links it to every earlier text it duplicates.
+
+        Returns:
+            The doc ID of the CV's cluster representative: doc_id itself when it duplicates nothing added before,
+            otherwise the earliest CV of its cluster, whose extraction can be reused.
+        """
+        exact_key = hashlib.sha256(normalize_cv_text(cv_text).encode("utf-8")).hexdigest()
+        with self._lock:
+            if doc_id in self._parent:
+                return self._find(doc_id)
+            self._parent[doc_id] = doc_id
+            self._order[doc_id] = len(self._order)
+            first_doc_id = self._exact.get(exact_key)
+            if first_doc_id is not None:
+                # An exact copy matches exactly what its original matches, so it needs no signature of its own
+                self.exact_duplicates += 1
+                return self._union(first_doc_id, doc_id)
+            self._exact[exact_key] = doc_id
+
+        signature = self.signature(cv_text)  # The expensive part runs outside the lock
+        if signature is None:
+            return doc_id
+        band_keys = [signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes()
+                     for band in range(self.bands)]
+        with self._lock:
+            candidates = set()
+            for band_buckets, band_key in zip(self._buckets, band_keys):
+                candidates.update(band_buckets.get(band_key, ()))
+            matches = [candidate for candidate in candidates
+                       if self.similarity(signature, self._signatures[candidate]) >= self.threshold]
+            self._signatures[doc_id] = signature
+            for band_buckets, band_key in zip(self._buckets, band_keys):
+                band_buckets.setdefault(band_key, []).append(doc_id)
+            if matches:
+                self.near_duplicates += 1
+            for candidate in matches:
+                self._union(candidate, doc_id)
+            return self._find(doc_id)
+
+    def clusters(self):
+        """
+        Returns the clusters with more than one CV, each as a list of doc IDs in the order they were added
+        (representative first).
+        """
+        with self._lock:
+            members_by_root = {}
+            for doc_id in sorted(self._parent, key=self._order.get):
+                members_by_root.setdefault(self._find(doc_id), []).append(doc_id)
+        return [members for members in members_by_root.values() if len(members) > 1]
+
+
+def find_duplicate_applicants(cv_data_by_filename, linked_filenames=None):
+    """
+    Flags CVs from an applicant seen earlier (in filename order): same email address, normalized by
+    candidate_store.email_key so the report and CandidateStore.duplicate_emails agree, or text linked to an
+    earlier CV by a NearDuplicateIndex.
+
+    Args:
+        cv_data_by_filename (dict): {cv_filename: cv_data} with an "email" field.
+        linked_filenames (dict): Optional {cv_filename: representative cv_filename} from near-duplicate detection.
+
+    Returns:
+        dict: Maps each duplicate CV's filename to the filename of the first CV of the same applicant.
+    """
+    duplicate_of = {}
+    first_by_email = {}
+    for cv_filename in sorted(cv_data_by_filename):
+        key = email_key(cv_data_by_filename[cv_filename].get("email"))
+        if key is None:
+            continue
+        first_filename = first_by_email.setdefault(key, cv_filename)
+        if first_filename != cv_filename:
+            duplicate_of[cv_filename] = first_filename
+    for cv_filename, representative in (linked_filenames or {}).items():
+        if cv_filename != representative and cv_filename in cv_data_by_filename:
+            duplicate_of.setdefault(cv_filename, duplicate_of.get(representative, representative))
+    return duplicate_of
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import time
+
+    import cv_agent
+
+    # --- Detection on the sample CVs plus synthetic re-submissions: exact copies and copies with a few edits ---
+    random.seed(3)
+    CV_FOLDER_DEMO = "data/CVs1"
+    reader = cv_agent.CVAgent()
+    cv_texts = {filename: reader.read_cv_from_file(os.path.join(CV_FOLDER_DEMO, filename))
+                for filename in sorted(os.listdir(CV_FOLDER_DEMO)) if filename.lower().endswith(".pdf")}
+    originals = list(cv_texts)
+    expected = {}
+    for copy_number, filename in enumerate(random.sample(originals, 30)):
+        words = cv_texts[filename].split()
+        if copy_number % 2:
+            copy_text = cv_texts[filename].replace("\n", " \n")  # Same text, different layout
+        else:
+            # One word changed, one line added
+            words[random.randrange(len(words))] = random.choice(["updated", "2024", "remote", "senior"])
+            copy_text = " ".join(words) + "\nAvailable from next month."
+        copy_name = f"resubmitted_{copy_number}_{filename}"
+        cv_texts[copy_name] = copy_text
+        expected[copy_name] = filename
+
+    index = NearDuplicateIndex()
+    start_time = time.perf_counter()
+    representatives = {filename: index.add(filename, cv_text) for filename, cv_text in cv_texts.items()}
+    elapsed = time.perf_counter() - start_time
+    found = {filename: representative for filename, representative in representatives.items() if representative != filename}
+    correct = sum(1 for filename, original in expected.items() if found.get(filename) == original)
+    false_links = sum(1 for filename in found if filename not in expected)
+    print(f"{len(cv_texts)} CVs indexed in {elapsed * 1000:.1f} ms ({elapsed / len(cv_texts) * 1000:.2f} ms per CV)")
+    print(f"{index.exact_duplicates} exact and {index.near_duplicates} near duplicates in {len(index.clusters())} clusters; "
+          f"{correct}/{len(expected)} re-submissions linked to their original, {false_links} false links")
+    print(f"LLM extractions needed: {len(cv_texts) - len(found)} instead of {len(cv_texts)}")
@@ -0,0 +1,230 @@
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import cv_agent
+from instrumentation import get_metrics
+
+
+@functools.lru_cache(maxsize=8)
+def _cv_reader(max_pages, max_chars, use_mmap):
+    # One agent per worker process and settings, rather than one per file
+    return cv_agent.CVAgent(max_pages=max_pages, max_chars=max_chars, use_mmap=use_mmap)
+
+
+def read_cv_text(file_path, max_pages=None, max_chars=None, use_mmap=False):
+    """
+    Reads the text of one CV PDF. Lives at module level so it can run inside a process pool.
+    """
+    return _cv_reader(max_pages, max_chars, use_mmap).read_cv_from_file(file_path)
+
+
+def read_cv_text_timed(file_path, max_pages=None, max_chars=None, use_mmap=False):
+    """
+    Like read_cv_text, but also returns the seconds the read took. Spans recorded inside a worker process stay
+    in that process, so the parent records the returned duration instead.
+
+    Returns:
+        tuple: (cv_text, seconds)
+    """
+    start_time = time.perf_counter()
+    cv_text = read_cv_text(file_path, max_pages, max_chars, use_mmap)
+    return cv_text, time.perf_counter() - start_time
+
+
+def read_cv_texts(cv_file_paths, parse_workers=None, max_pages=None, max_chars=None, use_mmap=False):
+    """
+    Reads the text of many CV PDFs in a process pool, without any LLM calls.
+
+    Returns:
+        list: The text of each CV in input order (None for a CV that couldn't be read).
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    if parse_workers == 1:
+        return [read_cv_text(file_path, max_pages, max_chars, use_mmap) for file_path in cv_file_paths]
+    # Small PDFs parse in a few milliseconds, so hand them to the workers in chunks to keep IPC overhead down
+    chunk_size = max(1, min(32, len(cv_file_paths) // (parse_workers * 4)))
+    with ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+        return list(parse_pool.map(read_cv_text, cv_file_paths, [max_pages] * len(cv_file_paths),
+                                   [max_chars] * len(cv_file_paths), [use_mmap] * len(cv_file_paths),
+                                   chunksize=chunk_size))
+
+
+async def extract_cv_texts_async(cv_agent_instance, cv_texts):
+    """
+    Extracts many CV texts on one event loop. Concurrency is bounded by the agent's LLMClient.
+
+    Returns:
+        list: The extracted CV data for each text in input order, or the exception raised for that text.
+    """
+    return await asyncio.gather(*(cv_agent_instance.extract_cv_data_async(cv_text) for cv_text in cv_texts),
+                                return_exceptions=True)
+
+
+class CVExtractionPipeline:
+    def __init__(self, cv_agent_instance, parse_workers=None, llm_workers=4, max_pending=None, dedup_index=None):
+        """
+        Initializes a pipeline that parses PDFs in a process pool while several LLM extractions are in flight.
+
+        Args:
+            cv_agent_instance (CVAgent): Agent used for cache lookups and LLM extraction.
+            parse_workers (int): Processes used for PDF parsing (defaults to the CPU count).
+            llm_workers (int): Maximum number of concurrent requests sent to the Ollama server.
+            max_pending (int): Maximum number of CVs parsed or waiting on the LLM at once. Parsing pauses
+                               when this many are outstanding, so fast parsing can't pile up CV texts in memory.
+                               Defaults to twice llm_workers times the agent's batch_size.
+            dedup_index (NearDuplicateIndex): When given, every parsed CV text is added to it, and a CV that
+                                              duplicates an earlier one (exactly or nearly, see cv_dedup.py) reuses
+                                              that CV's extraction instead of going to the LLM. Its email and phone
+                                              number still come from its own text.
+
+        Parsed CVs are sent to the LLM in groups of the agent's batch_size (see CVAgent.extract_cv_data_batch).
+        """
+        self.cv_agent = cv_agent_instance
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.llm_workers = max(1, llm_workers)
+        self.batch_size = cv_agent_instance.batch_size
+        self.max_pending = max_pending or self.llm_workers * 2 * self.batch_size
+        self.dedup_index = dedup_index
+        self.linked_paths = {}  # duplicate file path -> file path whose extraction it reused
+
+    def run(self, cv_file_paths, on_result=None, cancel_event=None):
+        """
+        Extracts data from all CV files. A failure in one file is recorded and never stops the others.
+
+        Args:
+            cv_file_paths (list): Paths of the CV PDFs to process.
+            on_result (callable): Optional callback on_result(file_path, cv_data, error), called from the calling
+                                  thread as each CV finishes. Exactly one of cv_data and error is None.
+            cancel_event (threading.Event): Optional event; once set, no new CVs are started and the run returns
+                                            after the in-flight ones finish.
+
+        Returns:
+            tuple: (results, errors) where results maps file path to extracted CV data and errors maps
+                   file path to an error message.
+        """
+        results = {}
+        errors = {}
+
+        def finish(file_path, cv_data=None, error=None):
+            if error is None:
+                results[file_path] = cv_data
+            else:
+                errors[file_path] = error
+            if on_result is not None:
+                on_result(file_path, cv_data, error)
+
+        remaining_paths = iter(cv_file_paths)
+        parse_futures = {}  # future -> (file_path, cache_key)
+        llm_futures = {}  # future -> [(file_path, cache_key), ...] of the CVs in the batch
+        ready_texts = []  # (file_path, cache_key, cv_text) parsed and waiting for a batch
+        # With a dedup_index: representative file path -> [(file_path, cache_key, cv_text), ...] of the duplicates
+        # waiting for its extraction, and the finished extractions later duplicates can reuse
+        waiting_duplicates = {}
+        representative_data = {}
+
+        def finish_duplicate(file_path, cache_key, cv_text, representative_path):
+            # Contact fields come from the duplicate's own text, the rest from the representative's extraction
+            cv_data = self.cv_agent.merge_rule_fields(cv_text, dict(representative_data[representative_path]))
+            self.cv_agent.store_cached_cv(cache_key, cv_data)
+            self.linked_paths[file_path] = representative_path
+            get_metrics().increment("cv_duplicates_reused")
+            finish(file_path, cv_data=cv_data)
+
+        def route_parsed(file_path, cache_key, cv_text):
+            if self.dedup_index is not None:
+                representative_path = self.dedup_index.add(file_path, cv_text)
+                if representative_path in representative_data:
+                    finish_duplicate(file_path, cache_key, cv_text, representative_path)
+                    return
+                if representative_path in waiting_duplicates:
+                    waiting_duplicates[representative_path].append((file_path, cache_key, cv_text))
+                    return
+                if representative_path == file_path:
+                    waiting_duplicates[file_path] = []
+                # Otherwise the representative's extraction failed: extract this CV on its own
+            ready_texts.append((file_path, cache_key, cv_text))
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as parse_pool, \
+                ThreadPoolExecutor(max_workers=self.llm_workers) as llm_pool:
+
+            def submit_more():
+                # Cache hits complete immediately and don't take a pending slot
+                while (len(parse_futures) + sum(len(batch) for batch in llm_futures.values()) + len(ready_texts)
+                       + sum(len(duplicates) for duplicates in waiting_duplicates.values()) < self.max_pending):
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    file_path = next(remaining_paths, None)
+                    if file_path is None:
+                        return
+                    try:
+                        cache_key, cached_data = self.cv_agent.lookup_cached_cv(file_path)
+                    except OSError as e:
+                        finish(file_path, error=f"Could not read CV file: {e}")
+                        continue
+                    if cached_data is not None:
+                        finish(file_path, cv_data=cached_data)
+                        continue
+                    parse_futures[parse_pool.submit(read_cv_text_timed, file_path, self.cv_agent.max_pages,
+                                                    self.cv_agent.max_chars, self.cv_agent.use_mmap)] = (file_path, cache_key)
+
+            def submit_ready(flush):
+                # A partial batch waits for more parsed CVs unless no parsing is in progress
+                while ready_texts and (flush or len(ready_texts) >= self.batch_size):
+                    batch = ready_texts[:self.batch_size]
+                    del ready_texts[:self.batch_size]
+                    future = llm_pool.submit(self.cv_agent.extract_cv_data_batch, [cv_text for _, _, cv_text in batch])
+                    llm_futures[future] = [(file_path, cache_key) for file_path, cache_key, _ in batch]
+
+            submit_more()
+            while parse_futures or llm_futures:
+                done, _ = wait(list(parse_futures) + list(llm_futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in parse_futures:
+                        file_path, cache_key = parse_futures.pop(future)
+                        try:
+                            cv_text, read_seconds = future.result()
+                        except Exception as e:
+                            finish(file_path, error=f"Could not read CV file: {e}")
+                            continue
+                        get_metrics().observe("pdf_read", read_seconds)
+                        if not cv_text:
+                            finish(file_path, error="Could not read CV file")
+                            continue
+                        route_parsed(file_path, cache_key, cv_text)
+                    else:
+                        batch = llm_futures.pop(future)
+                        try:
+                            batch_cv_data = future.result()
+                        except Exception as e:
+                            for file_path, _ in batch:
+                                finish(file_path, error=f"LLM extraction failed: {e}")
+                                # Its duplicates are extracted on their own instead
+                                ready_texts.extend(waiting_duplicates.pop(file_path, []))
+                            continue
+                        for (file_path, cache_key), cv_data in zip(batch, batch_cv_data):
+                            self.cv_agent.store_cached_cv(cache_key, cv_data)
+                            finish(file_path, cv_data=cv_data)
+                            if file_path in waiting_duplicates:
+                                representative_data[file_path] = cv_data
+                                for duplicate in waiting_duplicates.pop(file_path):
+                                    finish_duplicate(*duplicate, file_path)
+                submit_more()
+                submit_ready(flush=not parse_futures)
+
+        return results, errors
+
+
+if __name__ == "__main__":
+    CV_FOLDER_DEMO = "data/CVs1"
+    cv_file_paths = [os.path.join(CV_FOLDER_DEMO, filename) for filename in sorted(os.listdir(CV_FOLDER_DEMO))
+                     if filename.lower().endswith(".pdf")]
+
+    pipeline = CVExtractionPipeline(cv_agent.CVAgent(), llm_workers=4)
+    results, errors = pipeline.run(
+        cv_file_paths,
+        on_result=lambda path, data, error: print(f"  - {os.path.basename(path)}: {'OK' if error is None else error}")
+    )
+    print(f"\nExtracted {len(results)} CVs, {len(errors)} errors.")
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+
+from instrumentation import get_metrics
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("least-outstanding", "round-robin")
+DEFAULT_ENDPOINT_CONCURRENCY = 4
+
+
+class Endpoint:
+    def __init__(self, host, weight=1, max_concurrency=DEFAULT_ENDPOINT_CONCURRENCY):
+        """
+        One Ollama server in an EndpointPool.
+
+        Args:
+            host (str): Ollama host URL, e.g. "http://gpu1:11434".
+            weight (float): Relative share of the requests (a box with twice the GPUs gets weight 2).
+            max_concurrency (int): Maximum number of requests in flight on this endpoint at once.
+        """
+        if weight <= 0:
+            raise ValueError(f"Endpoint weight must be positive: {host}")
+        self.host = host
+        self.weight = weight
+        self.max_concurrency = max(1, max_concurrency)
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0  # time.monotonic() until which no new requests are sent here
+        self.ejection_streak = 0  # Ejections since the last successful request, for the exponential backoff
+        self.ejections = 0
+        self.requests = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.current_weight = 0.0  # Running counter of the smooth weighted round-robin
+
+    def is_ejected(self, now):
+        return now < self.ejected_until
+
+    def stats(self):
+        return {"host": self.host, "weight": self.weight, "max_concurrency": self.max_concurrency,
+                "requests": self.requests, "failures": self.failures, "ejections": self.ejections,
+                "mean_latency_ms": round(self.total_latency / self.requests * 1000, 1) if self.requests else 0.0}
+
+    @classmethod
+    def from_spec(cls, spec, default_max_concurrency=DEFAULT_ENDPOINT_CONCURRENCY):
+        """
+        Parses an endpoint spec "HOST[,weight=W][,max_concurrency=N]", e.g. "http://gpu1:11434,weight=2".
+
+        Raises:
+            ValueError: If an option is unknown or not a number.
+        """
+        host, *options = [part.strip() for part in spec.split(",")]
+        settings = {"weight": 1.0, "max_concurrency": default_max_concurrency}
+        for option in options:
+            name, _, value = option.partition("=")
+            if name not in settings:
+                raise ValueError(f"Unknown endpoint option {name!r} in {spec!r} (expected weight or max_concurrency)")
+            try:
+                settings[name] = float(value) if name == "weight" else int(value)
+            except ValueError:
+                raise ValueError(f"Invalid value for {name} in {spec!r}") from None
+        return cls(host, **settings)
+
+
+class EndpointPool:
+    def __init__(self, endpoints, policy="least-outstanding", max_failures=3, eject_seconds=10.0,
+                 max_eject_seconds=300.0, health_check_interval=None, health_check_timeout=2.0):
+        """
+        Spreads LLM requests over several Ollama servers. LLMClient acquires an endpoint for every request
+        attempt and releases it with the outcome, so retries move away from a failing server.
+
+        Args:
+            endpoints (list): Endpoint objects (or host URLs, which get weight 1 and the default concurrency).
+            policy (str): "least-outstanding" sends each request to the endpoint with the fewest requests in flight
+                          relative to its weight; "round-robin" uses smooth weighted round-robin.
+            max_failures (int): Consecutive connection errors, timeouts or 5xx responses before an endpoint is
+                                ejected.
+            eject_seconds (float): How long the first ejection lasts. It doubles with every ejection in a row, up
+                                   to max_eject_seconds. After it ends one trial request decides whether the
+                                   endpoint stays.
+            max_eject_seconds (float): Upper bound of the ejection time.
+            health_check_interval (float): When set, a background thread checks every endpoint's /api/tags this
+                                           often, ejecting unreachable ones and readmitting those that answer.
+            health_check_timeout (float): Seconds before a health check counts as failed.
+
+        Raises:
+            ValueError: If there are no endpoints or the policy is unknown.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown endpoint policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.endpoints = [endpoint if isinstance(endpoint, Endpoint) else Endpoint(endpoint) for endpoint in endpoints]
+        if not self.endpoints:
+            raise ValueError("An endpoint pool needs at least one endpoint")
+        self.policy = policy
+        self.max_failures = max(1, max_failures)
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.health_check_timeout = health_check_timeout
+        self._condition = threading.Condition()
+        self._health_thread = None
+        self._stop_health_checks = threading.Event()
+        if health_check_interval:
+            self.start_health_checks(health_check_interval)
+
+    @classmethod
+    def from_specs(cls, specs, default_max_concurrency=DEFAULT_ENDPOINT_CONCURRENCY, **pool_options):
+        """
+        Builds a pool from endpoint specs (see Endpoint.from_spec), e.g. the values of screen_cli's --ollama-endpoint.
+        """
+        return cls([Endpoint.from_spec(spec, default_max_concurrency) for spec in specs], **pool_options)
+
+    @property
+    def total_capacity(self):
+        return sum(endpoint.max_concurrency for endpoint in self.endpoints)
+
+    def _select(self):
+        # Called with the condition held. Returns None when every usable endpoint is at its concurrency limit.
+        now = time.monotonic()
+        available = [endpoint for endpoint in self.endpoints if not endpoint.is_ejected(now)]
+        if not available:
+            # Every endpoint is ejected: rather than failing the run, keep using the one that comes back first
+            available = [min(self.endpoints, key=lambda endpoint: endpoint.ejected_until)]
+        available = [endpoint for endpoint in available if endpoint.outstanding < endpoint.max_concurrency]
+        if not available:
+            return None
+        if self.policy == "least-outstanding":
+            return min(available, key=lambda endpoint: ((endpoint.outstanding + 1) / endpoint.weight,
+                                                        endpoint.consecutive_failures))
+        # Smooth weighted round-robin (as in nginx): spreads the heavier endpoints' turns out instead of bunching them
+        total_weight = sum(endpoint.weight for endpoint in available)
+        for endpoint in available:
+            endpoint.current_weight += endpoint.weight
+        selected = max(available, key=lambda endpoint: endpoint.current_weight)
+        selected.current_weight -= total_weight
+        return selected
+
+    def _try_acquire(self):
+        endpoint = self._select()
+        if endpoint is not None:
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+        return endpoint
+
+    def acquire(self):
+        """
+        Picks an endpoint for one request attempt, blocking while every endpoint is at its concurrency limit.
+        Every acquire must be followed by exactly one release.
+        """
+        with self._condition:
+            while True:
+                endpoint = self._try_acquire()
+                if endpoint is not None:
+                    return endpoint
+                # Time out now and then: an ejection ending frees an endpoint without any release() notifying us
+                self._condition.wait(timeout=0.1)
+
+    async def acquire_async(self, poll_interval=0.01):
+        """
+        Async variant of acquire(). Waits without blocking the event loop while every endpoint is busy.
+        """
+        while True:
+            with self._condition:
+                endpoint = self._try_acquire()
+            if endpoint is not None:
+                return endpoint
+            await asyncio.sleep(poll_interval)
+
+    def release(self, endpoint, latency, failed=False):
+        """
+        Returns an endpoint acquired for one request attempt.
+
+        Args:
+            endpoint (Endpoint): The endpoint from acquire().
+            latency (float): Seconds the attempt took.
+            failed (bool): Whether the attempt failed in a way that points at the server (connection error,
+                           timeout, 5xx), as opposed to a bad request.
+        """
+        with self._condition:
+            endpoint.outstanding -= 1
+            endpoint.total_latency += latency
+            if failed:
+                endpoint.failures += 1
+                # Requests already in flight when the endpoint was ejected don't extend the ejection
+                if not endpoint.is_ejected(time.monotonic()):
+                    endpoint.consecutive_failures += 1
+                    if endpoint.consecutive_failures >= self.max_failures:
+                        self._eject(endpoint)
+            else:
+                endpoint.consecutive_failures = 0
+                endpoint.ejection_streak = 0
+            self._condition.notify_all()
+        get_metrics().increment("llm_endpoint_requests", endpoint=endpoint.host, outcome="error" if failed else "ok")
+
+    def _eject(self, endpoint):
+        # Called with the condition held. Ejections in a row back off exponentially.
+        eject_seconds = min(self.max_eject_seconds, self.eject_seconds * (2 ** endpoint.ejection_streak))
+        endpoint.ejection_streak += 1
+        endpoint.ejections += 1
+        endpoint.ejected_until = time.monotonic() + eject_seconds
+        # One more failure after the ejection ends ejects it again, without waiting for max_failures failures
+        endpoint.consecutive_failures = self.max_failures - 1
+        get_metrics().increment("llm_endpoint_ejections", endpoint=endpoint.host)
+        logger.warning("Ejecting Ollama endpoint %s for %.0fs after repeated failures", endpoint.host, eject_seconds)
+
+    def check_health(self):
+        """
+        Checks every endpoint once by listing its models (GET /api/tags). An endpoint that doesn't answer is
+        ejected; an ejected endpoint that answers again is readmitted at once.
+
+        Returns:
+            dict: Maps each host to True (healthy) or False.
+        """
+        results = {}
+        for endpoint in self.endpoints:
+            try:
+                response = httpx.get(endpoint.host.rstrip("/") + "/api/tags", timeout=self.health_check_timeout)
+                healthy = response.status_code == 200
+            except httpx.HTTPError:
+                healthy = False
+            with self._condition:
+                if healthy and endpoint.is_ejected(time.monotonic()):
+                    logger.info("Readmitting Ollama endpoint %s after a successful health check", endpoint.host)
+                    endpoint.ejected_until = 0.0
+                    endpoint.consecutive_failures = 0
+                    self._condition.notify_all()
+                elif not healthy and not endpoint.is_ejected(time.monotonic()):
+                    self._eject(endpoint)
+            results[endpoint.host] = healthy
+        return results
+
+    def start_health_checks(self, interval):
+        """
+        Starts a daemon thread that runs check_health() every interval seconds until stop_health_checks().
+        """
+        if self._health_thread is not None:
+            return
+
+        def run():
+            while not self._stop_health_checks.wait(interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=run, name="ollama-health-checks", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        self._stop_health_checks.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+
+    def stats(self):
+        """
+        Returns one dictionary of request, failure and latency figures per endpoint.
+        """
+        with self._condition:
+            return [endpoint.stats() for endpoint in self.endpoints]
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    from fake_ollama_server import FakeOllamaServer
+    from llm_client import LLMClient
+
+    # --- Throughput against 1, 2 and 3 fake servers with different latencies, 4 requests in flight per server ---
+    server_latencies = (0.05, 0.08, 0.12)
+    request_count = 240
+    fake_servers = [FakeOllamaServer(latency=latency).start() for latency in server_latencies]
+    try:
+        for pool_size in (1, 2, 3):
+            for policy in POLICIES:
+                pool = EndpointPool([Endpoint(fake_server.host, max_concurrency=4) for fake_server in fake_servers[:pool_size]],
+                                    policy=policy)
+                client = LLMClient(endpoint_pool=pool)
+                start_time = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=pool.total_capacity) as workers:
+                    list(workers.map(lambda number: client.chat("mistral", f"Prompt {number}"), range(request_count)))
+                elapsed = time.perf_counter() - start_time
+                requests_by_host = ", ".join(f"{endpoint['requests']}" for endpoint in pool.stats())
+                print(f"{pool_size} endpoint(s), {policy:>17}: {request_count / elapsed:6.1f} requests/sec "
+                      f"(requests per endpoint: {requests_by_host})")
+
+        # --- Ejection: the first server goes away, requests move to the others ---
+        pool = EndpointPool([fake_server.host for fake_server in fake_servers], max_failures=2, eject_seconds=30)
+        client = LLMClient(endpoint_pool=pool, max_retries=3, backoff_base=0.01)
+        fake_servers[0].stop()
+        with ThreadPoolExecutor(max_workers=8) as workers:
+            list(workers.map(lambda number: client.chat("mistral", f"Prompt {number}"), range(60)))
+        print(f"After stopping {fake_servers[0].host}: {pool.stats()}")
+        print(f"Health check: {pool.check_health()}")
+    finally:
+        for fake_server in fake_servers[1:]:
+            fake_server.stop()
@@ -0,0 +1,147 @@
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def default_responder(model, messages):
+    """
+    Returns a canned, valid JSON answer for the CV (single or batched) and JD prompts used by the agents.
+    """
+    prompt = messages[-1].get("content", "") if messages else ""
+    batch_doc_ids = re.findall(r"^CV id=(\S+):$", prompt, re.MULTILINE)
+    if batch_doc_ids:
+        return json.dumps({"documents": [dict(json.loads(default_responder(model, [])), doc_id=doc_id)
+                                         for doc_id in batch_doc_ids]})
+    if "job description" in prompt.lower():
+        return json.dumps({
+            "job_title": "Software Engineer",
+            "responsibilities": ["Develop software"],
+            "required_skills": "python, java, sql",
+            "required_experience": "2+ years",
+            "educational_qualifications": ["Bachelor's degree in Computer Science"]
+        })
+    return json.dumps({
+        "name": "Fake Candidate",
+        "education": ["BSc Computer Science"],
+        "work_experience": ["Software Engineer at Example Corp"],
+        "skills": "python, sql, communication",
+        "email": "fake.candidate@example.com",
+        "phone_number": "+1-555-0100"
+    })
+
+
+class FakeOllamaServer:
+    def __init__(self, latency=0.0, responder=default_responder, host="127.0.0.1", port=0, fail_first_n=0):
+        """
+        Initializes a minimal stand-in for the Ollama HTTP API (/api/chat and /api/tags), for local testing
+        without a model server.
+
+        Args:
+            latency (float): Seconds to sleep before answering each chat request.
+            responder (callable): responder(model, messages) -> str, the assistant message content.
+            host (str): Interface to bind.
+            port (int): Port to bind (0 picks a free port).
+            fail_first_n (int): Answer the first n chat requests with HTTP 503, to exercise retries.
+        """
+        self.latency = latency
+        self.responder = responder
+        self.fail_first_n = fail_first_n
+        self.request_count = 0
+        self.request_prompts = []
+        self.request_formats = []  # The "format" of each chat request ("json", a JSON schema or None)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        server_host, server_port = self._server.server_address[:2]
+        return f"http://{server_host}:{server_port}"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Keep test and benchmark output clean
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": []})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path != "/api/chat":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                messages = request.get("messages", [])
+                with server._lock:
+                    server.request_count += 1
+                    request_number = server.request_count
+                    server.request_prompts.append(messages[-1].get("content", "") if messages else "")
+                    server.request_formats.append(request.get("format"))
+
+                if server.latency:
+                    time.sleep(server.latency)
+                if request_number <= server.fail_first_n:
+                    self._send_json(503, {"error": "server busy"})
+                    return
+
+                content = server.responder(request.get("model", ""), messages)
+                # Rough token counts (about 4 characters per token), like the ones Ollama reports
+                prompt_chars = sum(len(message.get("content", "")) for message in messages)
+                self._send_json(200, {
+                    "model": request.get("model", ""),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                    "prompt_eval_count": max(1, prompt_chars // 4),
+                    "eval_count": max(1, len(content) // 4)
+                })
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server with canned responses.")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake_server = FakeOllamaServer(latency=args.latency, port=args.port)
+    print(f"Fake Ollama server listening on {fake_server.host} (Ctrl+C to stop)")
+    try:
+        fake_server._server.serve_forever()
+    except KeyboardInterrupt:
+        fake_server._server.server_close()
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import os
+
+from cache_store import DEFAULT_CACHE_ROOT
+from skill_index import SkillIndex
+
+DEFAULT_STATE_ROOT = os.path.join(DEFAULT_CACHE_ROOT, "incremental")
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(file_path):
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def hash_text(text):
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+def scan_files(file_paths, previous_manifest=None):
+    """
+    Builds a manifest {path: {"mtime", "size", "sha256"}} for the given files. Files whose mtime and size match
+    the previous manifest keep their previous hash instead of being re-read.
+    """
+    previous_manifest = previous_manifest or {}
+    manifest = {}
+    for file_path in file_paths:
+        stat = os.stat(file_path)
+        previous_entry = previous_manifest.get(file_path)
+        if previous_entry and previous_entry["mtime"] == stat.st_mtime and previous_entry["size"] == stat.st_size:
+            manifest[file_path] = previous_entry
+        else:
+            manifest[file_path] = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": hash_file(file_path)}
+    return manifest
+
+
+def diff_manifests(previous_manifest, current_manifest):
+    """
+    Compares two manifests by content hash.
+
+    Returns:
+        dict: Lists of paths under "added", "removed", "modified" and "unchanged".
+    """
+    changes = {"added": [], "removed": [], "modified": [], "unchanged": []}
+    for file_path, entry in current_manifest.items():
+        previous_entry = previous_manifest.get(file_path)
+        if previous_entry is None:
+            changes["added"].append(file_path)
+        elif previous_entry["sha256"] != entry["sha256"]:
+            changes["modified"].append(file_path)
+        else:
+            changes["unchanged"].append(file_path)
+    changes["removed"] = [file_path for file_path in previous_manifest if file_path not in current_manifest]
+    return changes
+
+
+class IncrementalScreeningState:
+    STATE_VERSION = 1
+
+    def __init__(self, cv_folder, jd_csv_file, config, state_root=DEFAULT_STATE_ROOT):
+        """
+        Loads (or starts) the persisted screening state for one CV folder and JD CSV pair.
+
+        Args:
+            cv_folder (str): The CV folder being screened.
+            jd_csv_file (str): The JD CSV file being screened.
+            config (dict): Settings that invalidate the whole state when changed (model names, prompt version).
+            state_root (str): Directory holding one state file per folder/CSV pair.
+        """
+        pair_key = hash_text(os.path.abspath(cv_folder) + "\0" + os.path.abspath(jd_csv_file))
+        self.state_path = os.path.join(state_root, pair_key + ".json")
+        self.skill_index_path = os.path.join(state_root, pair_key + ".skills.json")
+        self.config = config
+
+        state = {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable incremental state %s: %s", self.state_path, e)
+
+        if state.get("version") != self.STATE_VERSION or state.get("config") != config:
+            state = {}  # Different models or prompts: nothing from the previous run can be reused
+        self.cv_manifest = state.get("cv_manifest", {})  # filename -> manifest entry
+        self.jd_csv_manifest = state.get("jd_csv_manifest", {})
+        self.jd_text_hashes = state.get("jd_text_hashes", {})  # job title -> hash of the JD text
+        self.cv_data = state.get("cv_data", {})  # filename -> extracted CV data
+        self.jd_data = state.get("jd_data", {})  # job title -> summarized JD data
+        self.results = state.get("results", {})  # job title -> {filename: result row}
+        # job title -> filenames already sent an interview request, so re-runs don't invite them again
+        self.scheduled = {job_title: set(filenames) for job_title, filenames in state.get("scheduled", {}).items()}
+        self._skill_index = None  # Loaded on first use, see cv_skill_index()
+
+    def diff_cv_folder(self, cv_folder, cv_file_names):
+        """
+        Compares the CV files in the folder with the previous run.
+
+        Returns:
+            tuple: (changes, current_manifest). changes lists filenames under "added", "removed", "modified"
+                   and "unchanged".
+        """
+        previous_by_path = {os.path.join(cv_folder, filename): entry for filename, entry in self.cv_manifest.items()}
+        current_by_path = scan_files([os.path.join(cv_folder, filename) for filename in cv_file_names], previous_by_path)
+        current_manifest = {os.path.basename(path): entry for path, entry in current_by_path.items()}
+        return diff_manifests(self.cv_manifest, current_manifest), current_manifest
+
+    def cv_skill_index(self):
+        """
+        Returns the inverted skill index of every CV in the state. It is persisted next to the state file and
+        kept up to date by update_cvs, so it is only rebuilt from the CV data when missing or out of sync.
+        """
+        if self._skill_index is None:
+            skill_index = SkillIndex.load(self.skill_index_path)
+            if skill_index is None or skill_index.cv_skill_ids.keys() != self.cv_data.keys():
+                skill_index = SkillIndex.from_cv_data(self.cv_data)
+            self._skill_index = skill_index
+        return self._skill_index
+
+    def jd_csv_changed(self, jd_csv_file):
+        """
+        Records the JD CSV in the manifest and returns True if its content changed since the previous run.
+        """
+        previous_manifest = self.jd_csv_manifest
+        self.jd_csv_manifest = scan_files([jd_csv_file], previous_manifest)
+        return diff_manifests(previous_manifest, self.jd_csv_manifest)["unchanged"] != [jd_csv_file]
+
+    def jd_changed(self, job_title, job_description_text):
+        """
+        Returns True if the job needs to be summarized again (new title or changed description text).
+        """
+        return self.jd_text_hashes.get(job_title) != hash_text(job_description_text) or job_title not in self.jd_data
+
+    def update_cvs(self, new_cv_data, removed_filenames, current_manifest):
+        """
+        Merges freshly extracted CVs into the state and drops removed ones. CVs that failed to extract are left
+        out of the manifest so the next run retries them; pass modified CVs that failed as removed, so nothing
+        is scored from content that is no longer in the file.
+        """
+        skill_index = self.cv_skill_index()
+        for filename in removed_filenames:
+            self.cv_data.pop(filename, None)
+            skill_index.remove_cv(filename)
+            self.cv_manifest.pop(filename, None)
+            for job_results in self.results.values():
+                job_results.pop(filename, None)
+            for scheduled_filenames in self.scheduled.values():
+                scheduled_filenames.discard(filename)
+        for filename, cv_data in new_cv_data.items():
+            self.cv_data[filename] = cv_data
+            self.cv_manifest[filename] = current_manifest[filename]
+            skill_index.add_cv(filename, cv_data)
+
+    def update_jd(self, job_title, job_description_text, jd_data):
+        self.jd_data[job_title] = jd_data
+        self.jd_text_hashes[job_title] = hash_text(job_description_text)
+        self.results.pop(job_title, None)  # Every CV has to be re-scored against a changed JD
+
+    def rescore(self, job_title, changed_cv_filenames, shortlisting_agent_instance):
+        """
+        Scores the job against the CVs that need it: every CV if the job has no stored results (only the
+        candidates found in the persisted skill index are actually scored), otherwise only the changed ones.
+        Results are merged into the stored ones.
+
+        Returns:
+            list: Filenames of the CVs scored.
+        """
+        job_results = self.results.get(job_title)
+        if job_results is None:
+            job_results = self.results[job_title] = {}
+            filenames_to_score = list(self.cv_data)
+            cv_skill_index = self.cv_skill_index()
+        else:
+            filenames_to_score = [filename for filename in changed_cv_filenames if filename in self.cv_data]
+            cv_skill_index = SkillIndex.from_cv_data({filename: self.cv_data[filename] for filename in filenames_to_score})
+        match_scores = shortlisting_agent_instance.score_cvs(self.jd_data[job_title], cv_skill_index)
+        for filename in filenames_to_score:
+            cv_data = self.cv_data[filename]
+            job_results[filename] = {
+                "cv_filename": filename,
+                "candidate_name": cv_data.get('name', 'N/A'),
+                "match_score": match_scores.get(filename, 0.0),  # score_cvs leaves out CVs that score 0
+                "email": cv_data.get('email', 'N/A'),
+                "phone_number": cv_data.get('phone_number', 'N/A'),
+                "job_title": job_title
+            }
+        return filenames_to_score
+
+    def results_for(self, job_title):
+        """
+        Returns the merged result rows of one job, in CV filename order.
+        """
+        job_results = self.results.get(job_title, {})
+        return [job_results[filename] for filename in sorted(job_results)]
+
+    def already_invited(self, job_title, rescored_filenames):
+        """
+        Returns the CVs sent an interview request for the job in an earlier run whose result wasn't re-scored
+        since; they don't need another one.
+        """
+        return self.scheduled.get(job_title, set()) - set(rescored_filenames)
+
+    def record_scheduled(self, job_title, filenames):
+        self.scheduled.setdefault(job_title, set()).update(filenames)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        state = {
+            "version": self.STATE_VERSION,
+            "config": self.config,
+            "cv_manifest": self.cv_manifest,
+            "jd_csv_manifest": self.jd_csv_manifest,
+            "jd_text_hashes": self.jd_text_hashes,
+            "cv_data": self.cv_data,
+            "jd_data": self.jd_data,
+            "results": self.results,
+            "scheduled": {job_title: sorted(filenames) for job_title, filenames in self.scheduled.items()}
+        }
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as state_file:
+            json.dump(state, state_file)
+        os.replace(tmp_path, self.state_path)
+        if self._skill_index is not None:
+            self._skill_index.save(self.skill_index_path)
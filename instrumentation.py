@@ -0,0 +1,222 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+MAX_SAMPLES_PER_SPAN = 10_000  # Durations kept per span for the percentiles; older ones are sampled out
+METRIC_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _percentile(sorted_samples, fraction):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, int(round(fraction * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[rank]
+
+
+class Metrics:
+    def __init__(self, max_samples=MAX_SAMPLES_PER_SPAN):
+        """
+        Initializes an empty, thread-safe registry of per-stage timings (spans) and event counters.
+
+        Each span keeps its count, total and maximum duration exactly, and a reservoir sample of at most
+        max_samples durations for the p50/p99 percentiles, so memory stays bounded however many CVs are screened.
+        """
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets every recorded span and counter.
+        """
+        with self._lock:
+            self._spans = {}  # span name -> {"count", "total", "max", "samples"}
+            self._counters = {}  # (counter name, sorted label items) -> value
+            self.started_at = time.time()
+
+    @contextmanager
+    def span(self, name):
+        """
+        Times the enclosed block as one occurrence of the named stage, including when it raises.
+
+        Example:
+            with get_metrics().span("llm_call"):
+                response = client.chat(...)
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time)
+
+    def observe(self, name, seconds):
+        """
+        Records one occurrence of the named stage that took the given number of seconds, e.g. a duration
+        measured in a worker process and sent back to the parent.
+        """
+        with self._lock:
+            entry = self._spans.get(name)
+            if entry is None:
+                entry = self._spans[name] = {"count": 0, "total": 0.0, "max": 0.0, "samples": []}
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            samples = entry["samples"]
+            if len(samples) < self.max_samples:
+                samples.append(seconds)
+            else:
+                sample_index = self._random.randrange(entry["count"])
+                if sample_index < self.max_samples:
+                    samples[sample_index] = seconds
+
+    def increment(self, name, value=1, **labels):
+        """
+        Adds value to the named counter. Keyword arguments become labels, e.g.
+        increment("cache_lookups", cache="cv", result="hit") counts separately from result="miss".
+        """
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counter(self, name, **labels):
+        """
+        Returns the current value of a counter (0 if it was never incremented).
+        """
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def summary(self):
+        """
+        Returns a JSON-serializable summary of the run so far.
+
+        Returns:
+            dict: {"started_at", "elapsed_seconds", "spans", "counters"} where spans maps each stage to its count,
+                  total seconds and mean/p50/p99/max milliseconds, and counters maps "name{label=value,...}" to
+                  its value.
+        """
+        with self._lock:
+            spans = {name: (entry["count"], entry["total"], entry["max"], sorted(entry["samples"]))
+                     for name, entry in self._spans.items()}
+            counters = dict(self._counters)
+            started_at = self.started_at
+        span_summaries = {}
+        for name, (count, total, maximum, samples) in sorted(spans.items()):
+            span_summaries[name] = {
+                "count": count,
+                "total_seconds": round(total, 6),
+                "mean_ms": round(total / count * 1000, 3),
+                "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+                "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+                "max_ms": round(maximum * 1000, 3),
+            }
+        counter_values = {}
+        for (name, labels), value in sorted(counters.items()):
+            label_text = ",".join(f"{label}={label_value}" for label, label_value in labels)
+            counter_values[f"{name}{{{label_text}}}" if labels else name] = value
+        return {"started_at": started_at, "elapsed_seconds": round(time.time() - started_at, 3),
+                "spans": span_summaries, "counters": counter_values}
+
+    def summary_lines(self):
+        """
+        Returns one human-readable line per stage, slowest total first, followed by one line per counter.
+        """
+        summary = self.summary()
+        lines = [f"{name}: {span['count']} x, {span['total_seconds']:.3f}s total, "
+                 f"p50 {span['p50_ms']:.1f} ms, p99 {span['p99_ms']:.1f} ms, max {span['max_ms']:.1f} ms"
+                 for name, span in sorted(summary["spans"].items(), key=lambda item: -item[1]["total_seconds"])]
+        lines.extend(f"{name}: {value}" for name, value in summary["counters"].items())
+        return lines
+
+    def to_prometheus(self, prefix="screening"):
+        """
+        Renders the metrics in the Prometheus text exposition format: one summary per span, labelled by stage,
+        with 0.5 and 0.99 quantiles in seconds, and one counter per counter name.
+        """
+        with self._lock:
+            spans = {name: (entry["count"], entry["total"], sorted(entry["samples"]))
+                     for name, entry in self._spans.items()}
+            counters = dict(self._counters)
+
+        def escape(label_value):
+            return str(label_value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+        lines = []
+        if spans:
+            metric = f"{prefix}_stage_duration_seconds"
+            lines.append(f"# HELP {metric} Time spent in each pipeline stage.")
+            lines.append(f"# TYPE {metric} summary")
+            for name, (count, total, samples) in sorted(spans.items()):
+                stage = escape(name)
+                for quantile in (0.5, 0.99):
+                    lines.append(f'{metric}{{stage="{stage}",quantile="{quantile}"}} {_percentile(samples, quantile):.6f}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {total:.6f}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {count}')
+        counter_names = sorted({name for name, _ in counters})
+        for counter_name in counter_names:
+            metric = f"{prefix}_{METRIC_NAME_RE.sub('_', counter_name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (name, labels), value in sorted(counters.items()):
+                if name != counter_name:
+                    continue
+                label_text = ",".join(f'{METRIC_NAME_RE.sub("_", label)}="{escape(label_value)}"'
+                                      for label, label_value in labels)
+                lines.append(f"{metric}{{{label_text}}} {value}" if labels else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, metrics_path):
+        """
+        Writes summary() to a JSON file (atomically, through a temporary file).
+        """
+        self._write_atomically(metrics_path, json.dumps(self.summary(), indent=2) + "\n")
+
+    def write_prometheus(self, metrics_path, prefix="screening"):
+        """
+        Writes to_prometheus() to a file (atomically, so a node_exporter textfile collector never reads a
+        partial file).
+        """
+        self._write_atomically(metrics_path, self.to_prometheus(prefix))
+
+    @staticmethod
+    def _write_atomically(output_path, text):
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as output_file:
+            output_file.write(text)
+        os.replace(tmp_path, output_path)
+
+
+_default_metrics = Metrics()
+
+
+def get_metrics():
+    """
+    Returns the process-wide Metrics registry the agents and pipelines record into.
+    """
+    return _default_metrics
+
+
+if __name__ == "__main__":
+    # --- Overhead of one span, and what the exporters produce ---
+    metrics = Metrics()
+    span_count = 200_000
+    start_time = time.perf_counter()
+    for _ in range(span_count):
+        with metrics.span("noop"):
+            pass
+    elapsed = time.perf_counter() - start_time
+    print(f"{span_count:,} spans in {elapsed:.2f}s ({elapsed / span_count * 1e6:.2f} us per span)")
+
+    metrics.reset()
+    for latency in (0.01, 0.02, 0.05):
+        metrics.observe("llm_call", latency)
+    metrics.increment("cache_lookups", cache="cv", result="hit")
+    metrics.increment("llm_retries")
+    print("\n".join(metrics.summary_lines()))
+    print(metrics.to_prometheus())
@@ -1,12 +1,50 @@
-import ollama
+import logging
+import time
+
 import pandas as pd
 
+import llm_client
+import llm_json
+import model_cascade
+import rule_extractor
+from instrumentation import get_metrics
+
+logger = logging.getLogger(__name__)
+
 class JDSummarizerAgent:
-    def __init__(self, model_name='mistral'):
+    PROMPT_VERSION = "2"  # Bump whenever the summary prompt changes so stored summaries are invalidated
+    SUMMARY_SCHEMA = llm_json.object_schema({
+        "job_title": {"type": "string"},
+        "responsibilities": {"type": "array", "items": {"type": "string"}},
+        "required_skills": {"type": "string"},
+        "required_experience": {"type": "string"},
+        "educational_qualifications": {"type": "array", "items": {"type": "string"}},
+    })
+
+    def __init__(self, model_name='mistral', llm_client_instance=None, summary_store=None, rule_based=False,
+                 skills_lexicon=None, structured_output=True, cascade=None,
+                 cascade_min_skills=model_cascade.DEFAULT_MIN_SKILLS):
         """
-        Initializes the JDSummarizerAgent with a specified Ollama model.
+        Initializes the JDSummarizerAgent with a specified Ollama model, an optional LLMClient
+        (the shared default client is used when none is given) and an optional JDSummaryStore.
+        With rule_based set, required skills are matched against the skills lexicon and the LLM is never called.
+        structured_output asks Ollama to constrain answers to SUMMARY_SCHEMA (needs Ollama 0.5 or later).
+        cascade lists cheaper tiers ("rules" and/or smaller model names) tried before model_name; a JD only goes
+        on to the next tier when its summary has fewer than cascade_min_skills required skills or isn't valid JSON.
         """
         self.model_name = model_name
+        self.llm_client = llm_client_instance or llm_client.get_default_client()
+        self.summary_store = summary_store
+        self.rule_based = rule_based
+        self.rule_extractor = rule_extractor.RuleBasedExtractor(skills_lexicon) if rule_based else None
+        self.structured_output = structured_output
+        self.parse_stats = llm_json.ParseStats("jd")
+        self.cascade = list(cascade or [])
+        self.cascade_tiers = model_cascade.cascade_tiers(self.cascade, model_name)
+        self.cascade_min_skills = cascade_min_skills
+        self.cascade_stats = model_cascade.CascadeStats("jd")
+        if self.cascade and model_cascade.RULES_TIER in self.cascade and self.rule_extractor is None:
+            self.rule_extractor = rule_extractor.RuleBasedExtractor(skills_lexicon)
 
     def summarize_jd(self, jd_text):
         """
@@ -18,6 +56,109 @@ class JDSummarizerAgent:
         Returns:
             dict: A dictionary containing extracted JD elements (job_title, responsibilities, ...).
         """
+        if self.rule_based:
+            return self.summarize_jd_with_rules(jd_text)
+        store_key, stored_summary = self._lookup_summary(jd_text)
+        if stored_summary is not None:
+            return stored_summary
+        if self.cascade:
+            return self._store_summary(store_key, self._summarize_with_cascade(jd_text))
+        extracted_data_text = self.llm_client.chat(self.model_name, self.build_summary_prompt(jd_text),
+                                                   format=self.response_format())
+        return self._store_summary(store_key, self.parse_summary_response(extracted_data_text))
+
+    async def summarize_jd_async(self, jd_text):
+        """
+        Async variant of summarize_jd, for running many job descriptions through one event loop.
+        """
+        if self.rule_based:
+            return self.summarize_jd_with_rules(jd_text)
+        store_key, stored_summary = self._lookup_summary(jd_text)
+        if stored_summary is not None:
+            return stored_summary
+        if self.cascade:
+            return self._store_summary(store_key, await self._summarize_with_cascade_async(jd_text))
+        extracted_data_text = await self.llm_client.achat(self.model_name, self.build_summary_prompt(jd_text),
+                                                          format=self.response_format())
+        return self._store_summary(store_key, self.parse_summary_response(extracted_data_text))
+
+    def _summarize_with_cascade(self, jd_text):
+        for tier in self.cascade_tiers:
+            start_time = time.perf_counter()
+            if tier == model_cascade.RULES_TIER:
+                jd_data, parsed = self.summarize_jd_with_rules(jd_text), True
+            else:
+                jd_data, parsed = self._parse_summary(self.llm_client.chat(tier, self.build_summary_prompt(jd_text),
+                                                                           format=self.response_format()))
+            if self._accept_tier(tier, jd_data, parsed, time.perf_counter() - start_time):
+                return jd_data
+
+    async def _summarize_with_cascade_async(self, jd_text):
+        for tier in self.cascade_tiers:
+            start_time = time.perf_counter()
+            if tier == model_cascade.RULES_TIER:
+                jd_data, parsed = self.summarize_jd_with_rules(jd_text), True
+            else:
+                jd_data, parsed = self._parse_summary(await self.llm_client.achat(
+                    tier, self.build_summary_prompt(jd_text), format=self.response_format()))
+            if self._accept_tier(tier, jd_data, parsed, time.perf_counter() - start_time):
+                return jd_data
+
+    def _accept_tier(self, tier, jd_data, parsed, seconds):
+        problems = model_cascade.jd_summary_problems(jd_data, parsed, self.cascade_min_skills)
+        accepted = not problems or tier == self.cascade_tiers[-1]
+        self.cascade_stats.record(tier, seconds, accepted, problems)
+        if not accepted:
+            logger.debug("Escalating JD summary from %s: %s", tier, ", ".join(problems))
+        return accepted
+
+    def summary_version(self):
+        """
+        Version string used in summary store keys: PROMPT_VERSION, plus the cascade tiers when there are any,
+        since a summary accepted from a cheaper tier differs from one by model_name.
+        """
+        if not self.cascade:
+            return self.PROMPT_VERSION
+        return f"{self.PROMPT_VERSION}:cascade={'>'.join(self.cascade)}:min_skills={self.cascade_min_skills}"
+
+    def summarize_jd_with_rules(self, jd_text):
+        """
+        Summarizes a job description without the LLM: only required_skills is filled, with the lexicon skills
+        mentioned in the text.
+        """
+        extracted_jd_data = self.empty_jd_data()
+        extracted_jd_data["required_skills"] = self.rule_extractor.extract_skills(jd_text)
+        return extracted_jd_data
+
+    @staticmethod
+    def empty_jd_data():
+        return {
+            "job_title": "",
+            "responsibilities": [],
+            "required_skills": "",
+            "required_experience": "",
+            "educational_qualifications": ""
+        }
+
+    def _lookup_summary(self, jd_text):
+        if self.summary_store is None:
+            return None, None
+        store_key = self.summary_store.make_key(jd_text, self.model_name, self.summary_version())
+        return store_key, self.summary_store.get(store_key)
+
+    def _store_summary(self, store_key, extracted_jd_data):
+        # Don't pin a failed parse; an all-empty summary should be retried next time
+        if store_key is not None and any(extracted_jd_data.values()):
+            self.summary_store.put(store_key, extracted_jd_data)
+        return extracted_jd_data
+
+    def response_format(self):
+        return self.SUMMARY_SCHEMA if self.structured_output else "json"
+
+    def build_summary_prompt(self, jd_text):
+        """
+        Builds the summarization prompt sent to the LLM for one job description.
+        """
         prompt = f"""
              Please analyze the following job description and extract the following key elements.
             Format your response as a **valid JSON object**. Ensure that **all keys and string values in the JSON are enclosed in DOUBLE QUOTES** (").
@@ -30,44 +171,35 @@ class JDSummarizerAgent:
             Job Description:
             {jd_text}
         """
+        return prompt
 
-        response = ollama.chat(
-            model=self.model_name,
-            messages=[
-                {'role': 'user', 'content': prompt}
-            ]
-        )
-        extracted_data_text = response['message']['content']
-
-        print("\n--- Raw LLM Response (JD Summarizer) ---")
-        print(extracted_data_text)
+    def parse_summary_response(self, extracted_data_text):
+        """
+        Parses the raw LLM response into the JD data dictionary, recovering JSON wrapped in fences or prose and
+        falling back to empty fields when none can be found.
+        """
+        return self._parse_summary(extracted_data_text)[0]
 
-        extracted_jd_data = {
-            "job_title": "",
-            "responsibilities": [],
-            "required_skills": "",
-            "required_experience": "",
-            "educational_qualifications": ""
-        }
+    def _parse_summary(self, extracted_data_text):
+        # Returns (jd_data, parsed); parsed is False when no JSON object could be recovered
+        logger.debug("Raw LLM response (JD Summarizer):\n%s", extracted_data_text)
 
+        extracted_jd_data = self.empty_jd_data()
         try:
-            import json
-            llm_response_json = json.loads(extracted_data_text)
-
-            extracted_jd_data["job_title"] = llm_response_json.get("job_title", "")
-            extracted_jd_data["responsibilities"] = llm_response_json.get("responsibilities", [])
-            extracted_jd_data["required_skills"] = llm_response_json.get("required_skills", "")
-            extracted_jd_data["required_experience"] = llm_response_json.get("required_experience", "")
-            extracted_jd_data["educational_qualifications"] = llm_response_json.get("educational_qualifications", "")
-
-        except json.JSONDecodeError as json_error:
-            print(f"Warning (JD Summarizer): JSON Parse Error: {json_error}")
-            print(f"Raw LLM Output (JD Summarizer):\n{extracted_data_text}")
-        except Exception as parse_error:
-            print(f"Warning (JD Summarizer): General Parse Error: {parse_error}")
-            print(f"Raw LLM Output (JD Summarizer):\n{extracted_data_text}")
+            with get_metrics().span("json_parse"):
+                llm_response_json, recovered = llm_json.parse_json_object(extracted_data_text)
+        except ValueError as parse_error:
+            self.parse_stats.record("failed")
+            logger.warning("JD Summarizer: JSON parse error: %s", parse_error)
+            logger.debug("Unparseable LLM output (JD Summarizer):\n%s", extracted_data_text)
+            return extracted_jd_data, False
 
-        return extracted_jd_data
+        self.parse_stats.record("recovered" if recovered else "clean")
+        for field in extracted_jd_data:
+            value = llm_response_json.get(field)
+            if value is not None:
+                extracted_jd_data[field] = value if isinstance(value, (str, list)) else str(value)
+        return extracted_jd_data, True
 
     def load_job_descriptions_from_csv(self, csv_file_path):
         """
@@ -85,18 +217,18 @@ class JDSummarizerAgent:
             return df
 
         except FileNotFoundError:
-            print(f"Error: CSV file not found at {csv_file_path}")
+            logger.error("CSV file not found at %s", csv_file_path)
             return None
         except UnicodeDecodeError:
-            print(f"Error: Could not decode CSV with 'latin-1' encoding. Trying 'cp1252'...")
+            logger.warning("Could not decode CSV with 'latin-1' encoding. Trying 'cp1252'...")
             try:
                 df = pd.read_csv(csv_file_path, encoding='cp1252')
                 return df
             except Exception as e2:
-                print(f"Error reading CSV with 'cp1252' encoding: {e2}")
+                logger.error("Error reading CSV with 'cp1252' encoding: %s", e2)
                 return None
         except Exception as e:
-            print(f"An error occurred while reading the CSV file: {e}")
+            logger.error("An error occurred while reading the CSV file: %s", e)
             return None
 
 
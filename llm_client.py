@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+
+import httpx
+import ollama
+
+from instrumentation import get_metrics
+
+
+class LLMClient:
+    RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(self, host=None, max_concurrency=4, timeout=300.0, max_retries=2, backoff_base=0.5, backoff_max=8.0,
+                 endpoint_pool=None):
+        """
+        Initializes a chat client shared by the agents, with sync and async entry points.
+
+        Args:
+            host (str): Ollama host URL (None uses OLLAMA_HOST or the Ollama default).
+            max_concurrency (int): Maximum number of async requests in flight at once.
+            timeout (float): Seconds before a single request attempt is abandoned.
+            max_retries (int): Retries after the first attempt for connection errors, timeouts and 429/5xx responses.
+            backoff_base (float): Base delay in seconds of the exponential backoff between retries.
+            backoff_max (float): Upper bound of the backoff delay in seconds.
+            endpoint_pool (EndpointPool): Spread the requests over several Ollama servers instead of host. Each
+                                          request attempt goes to the endpoint the pool picks, and the pool's
+                                          per-endpoint limits replace max_concurrency.
+        """
+        self.host = host
+        self.endpoint_pool = endpoint_pool
+        self.max_concurrency = endpoint_pool.total_capacity if endpoint_pool is not None else max(1, max_concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_count = 0
+        self.coalesced_count = 0
+        self._stats_lock = threading.Lock()  # chat() runs on many worker threads at once
+
+        self._sync_clients = {}  # host -> ollama.Client
+        self._sync_lock = threading.Lock()
+        # httpx async clients and asyncio primitives are bound to the loop that created them
+        self._async_loop = None
+        self._async_clients = {}  # host -> ollama.AsyncClient
+        self._async_lifetime = None  # Async generator that closes _async_clients when their loop shuts down
+        self._semaphore = None
+        self._in_flight = {}
+
+    def _get_sync_client(self, endpoint=None):
+        host = endpoint.host if endpoint is not None else self.host
+        with self._sync_lock:
+            client = self._sync_clients.get(host)
+            if client is None:
+                client = self._sync_clients[host] = ollama.Client(host=host, timeout=self.timeout)
+            return client
+
+    def _get_async_client(self, endpoint=None):
+        host = endpoint.host if endpoint is not None else self.host
+        client = self._async_clients.get(host)
+        if client is None:
+            client = self._async_clients[host] = ollama.AsyncClient(host=host, timeout=self.timeout)
+        return client
+
+    async def _prepare_async(self):
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_clients = {}
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._in_flight = {}
+            # Tie the clients' connection pools to the loop: asyncio.run finalizes the async generators started
+            # on a loop before closing it, which closes the clients of that loop
+            self._async_lifetime = self._close_at_loop_shutdown(self._async_clients)
+            await self._async_lifetime.asend(None)
+
+    @staticmethod
+    async def _close_at_loop_shutdown(async_clients):
+        try:
+            yield
+        finally:
+            for client in list(async_clients.values()):
+                await client.close()
+            async_clients.clear()
+
+    async def aclose(self):
+        """
+        Closes the async clients of the running event loop. Loops run by asyncio.run close them on their own;
+        call this before closing a loop managed by hand.
+        """
+        if self._async_lifetime is not None and self._async_loop is asyncio.get_running_loop():
+            await self._async_lifetime.aclose()
+            self._async_loop = self._async_lifetime = None
+
+    def _release_endpoint(self, endpoint, start_time, failed=False):
+        if endpoint is not None:
+            self.endpoint_pool.release(endpoint, time.perf_counter() - start_time, failed=failed)
+
+    def _is_retryable(self, error):
+        if isinstance(error, ollama.ResponseError):
+            return error.status_code in self.RETRYABLE_STATUS_CODES
+        return isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError, httpx.TransportError))
+
+    def _backoff_delay(self, attempt):
+        # Full jitter keeps many workers that failed together from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _request_key(model, prompt, format):
+        payload = json.dumps([model, prompt, format], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _build_messages(prompt):
+        return [{'role': 'user', 'content': prompt}]
+
+    @staticmethod
+    def _record_response(model, response):
+        metrics = get_metrics()
+        metrics.increment("llm_requests", model=model, outcome="ok")
+        # Ollama reports the prompt and completion token counts with every finished response
+        metrics.increment("llm_prompt_tokens", response.get('prompt_eval_count') or 0, model=model)
+        metrics.increment("llm_completion_tokens", response.get('eval_count') or 0, model=model)
+        return response['message']['content']
+
+    def _record_failure(self, model, will_retry):
+        metrics = get_metrics()
+        metrics.increment("llm_requests", model=model, outcome="retry" if will_retry else "error")
+        if will_retry:
+            with self._stats_lock:
+                self.retry_count += 1
+            metrics.increment("llm_retries", model=model)
+
+    def chat(self, model, prompt, format=None):
+        """
+        Sends a single-prompt chat request and returns the assistant message content, retrying transient failures.
+        """
+        attempt = 0
+        while True:
+            endpoint = self.endpoint_pool.acquire() if self.endpoint_pool is not None else None
+            start_time = time.perf_counter()
+            try:
+                with get_metrics().span("llm_call"):
+                    response = self._get_sync_client(endpoint).chat(model=model, messages=self._build_messages(prompt),
+                                                                    format=format)
+            except Exception as e:
+                retryable = self._is_retryable(e)
+                self._release_endpoint(endpoint, start_time, failed=retryable)
+                will_retry = attempt < self.max_retries and retryable
+                self._record_failure(model, will_retry)
+                if not will_retry:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                self._release_endpoint(endpoint, start_time)
+                raise
+            self._release_endpoint(endpoint, start_time)
+            return self._record_response(model, response)
+
+    async def achat(self, model, prompt, format=None):
+        """
+        Async variant of chat(). Concurrent calls with an identical model, prompt and format share one request.
+        """
+        await self._prepare_async()
+        key = self._request_key(model, prompt, format)
+        task = self._in_flight.get(key)
+        if task is not None:
+            with self._stats_lock:
+                self.coalesced_count += 1
+            get_metrics().increment("llm_coalesced", model=model)
+        else:
+            task = asyncio.ensure_future(self._achat_with_retries(model, prompt, format))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one cancelled waiter doesn't cancel the request for the others sharing it
+        return await asyncio.shield(task)
+
+    async def _achat_with_retries(self, model, prompt, format):
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                endpoint = await self.endpoint_pool.acquire_async() if self.endpoint_pool is not None else None
+                start_time = time.perf_counter()
+                try:
+                    # Timed inside the semaphore, so the span is the request itself and not the wait for a slot
+                    with get_metrics().span("llm_call"):
+                        response = await asyncio.wait_for(
+                            self._get_async_client(endpoint).chat(model=model, messages=self._build_messages(prompt),
+                                                                  format=format),
+                            timeout=self.timeout
+                        )
+                except Exception as e:
+                    retryable = self._is_retryable(e)
+                    self._release_endpoint(endpoint, start_time, failed=retryable)
+                    error = e
+                except BaseException:  # Cancelled: free the endpoint slot without blaming the server
+                    self._release_endpoint(endpoint, start_time)
+                    raise
+                else:
+                    self._release_endpoint(endpoint, start_time)
+                    return self._record_response(model, response)
+            will_retry = attempt < self.max_retries and retryable
+            self._record_failure(model, will_retry)
+            if not will_retry:
+                raise error
+            await asyncio.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """
+    Returns the process-wide LLMClient used by agents that weren't given their own.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = LLMClient()
+        return _default_client
+
+
+if __name__ == "__main__":
+    from fake_ollama_server import FakeOllamaServer
+
+    # --- Demo against the fake server: 200 CV prompts, 20 of them duplicates, one event loop ---
+    with FakeOllamaServer(latency=0.05, fail_first_n=2) as fake_server:
+        client = LLMClient(host=fake_server.host, max_concurrency=16)
+        prompts = [f"CV Text: candidate {i % 180}" for i in range(200)]
+
+        async def run_all():
+            return await asyncio.gather(*(client.achat('mistral', prompt) for prompt in prompts))
+
+        start_time = time.perf_counter()
+        responses = asyncio.run(run_all())
+        elapsed = time.perf_counter() - start_time
+
+        print(f"{len(responses)} responses in {elapsed:.2f}s, {fake_server.request_count} HTTP requests, "
+              f"{client.coalesced_count} coalesced, {client.retry_count} retries")
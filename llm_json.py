@@ -0,0 +1,155 @@
+import ast
+import json
+import re
+import threading
+
+from instrumentation import get_metrics
+
+_FENCE_RE = re.compile(r"```(?:json|JSON|python)?\s*\n?(.*?)```", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def _decode_first_object(text):
+    """
+    Decodes the first complete JSON object in text, ignoring anything before or after it.
+    """
+    decoder = json.JSONDecoder()
+    position = text.find("{")
+    while position != -1:
+        try:
+            value, _ = decoder.raw_decode(text, position)
+        except ValueError:
+            position = text.find("{", position + 1)
+            continue
+        if isinstance(value, dict):
+            return value
+        position = text.find("{", position + 1)
+    return None
+
+
+def _balanced_object(text):
+    """
+    Returns the text of the first brace-balanced {...} block (quotes aware), or None.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    depth = 0
+    quote = None
+    escaped = False
+    for position in range(start, len(text)):
+        character = text[position]
+        if quote is not None:
+            if escaped:
+                escaped = False
+            elif character == "\\":
+                escaped = True
+            elif character == quote:
+                quote = None
+        elif character in "\"'":
+            quote = character
+        elif character == "{":
+            depth += 1
+        elif character == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:position + 1]
+    return None
+
+
+def parse_json_object(response_text):
+    """
+    Parses a JSON object out of an LLM response, recovering the usual ways models wrap it: a ```json fence,
+    prose before or after the object, trailing commas, or a Python dict literal with single quotes.
+
+    Returns:
+        tuple: (parsed_dict, recovered), where recovered is True when the response wasn't clean JSON.
+
+    Raises:
+        ValueError: If no JSON object can be recovered.
+    """
+    response_text = (response_text or "").strip()
+    try:
+        value = json.loads(response_text)
+        if isinstance(value, dict):
+            return value, False
+    except ValueError:
+        pass
+
+    candidates = [match.group(1) for match in _FENCE_RE.finditer(response_text)] + [response_text]
+    for candidate in candidates:
+        value = _decode_first_object(candidate)
+        if value is not None:
+            return value, True
+        block = _balanced_object(candidate)
+        if block is None:
+            continue
+        try:
+            value = json.loads(_TRAILING_COMMA_RE.sub(r"\1", block))
+        except ValueError:
+            try:
+                value = ast.literal_eval(block)
+            except (ValueError, SyntaxError, MemoryError, RecursionError):
+                continue
+        if isinstance(value, dict):
+            return value, True
+    raise ValueError(f"No JSON object found in LLM response ({len(response_text)} characters)")
+
+
+class ParseStats:
+    def __init__(self, source="llm"):
+        """
+        Thread-safe counters of how LLM responses parsed: clean JSON, recovered by parse_json_object, or failed.
+        Each outcome is also counted in the shared metrics as llm_parses{source=..., outcome=...}.
+        """
+        self.source = source
+        self.clean = 0
+        self.recovered = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        get_metrics().increment("llm_parses", source=self.source, outcome=outcome)
+
+    @property
+    def total(self):
+        return self.clean + self.recovered + self.failed
+
+    def failure_rate(self):
+        total = self.total
+        return self.failed / total if total else 0.0
+
+    def summary(self):
+        with self._lock:
+            return (f"{self.total} responses: {self.clean} clean, {self.recovered} recovered, "
+                    f"{self.failed} failed ({100.0 * self.failure_rate():.1f}% failure rate)")
+
+
+def object_schema(properties):
+    """
+    Builds a JSON schema for an object with exactly the given properties, all required, for Ollama's
+    structured output (format=schema).
+    """
+    return {"type": "object", "properties": properties, "required": list(properties)}
+
+
+if __name__ == "__main__":
+    SAMPLE_RESPONSES = [
+        '{"name": "Ada"}',
+        'Here is the extracted data:\n```json\n{"name": "Ada", "skills": "python, sql",}\n```\nLet me know!',
+        'Sure! {"name": "Ada", "email": "ada@example.com"} I hope this helps.',
+        "{'name': 'Ada', 'education': ['BSc']}",
+        "I could not find any data.",
+    ]
+    stats = ParseStats()
+    for sample_response in SAMPLE_RESPONSES:
+        try:
+            parsed, recovered = parse_json_object(sample_response)
+            stats.record("recovered" if recovered else "clean")
+            print(f"{'recovered' if recovered else 'clean':>9}: {parsed}")
+        except ValueError as e:
+            stats.record("failed")
+            print(f"   failed: {e}")
+    print(stats.summary())
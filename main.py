@@ -1,13 +1,21 @@
 import jd_summarizer_agent
-import cv_agent
-import shortlisting_agent
-import scheduler_agent
+import cache_store
+import candidate_store
+import report_writer
+import screening_pipeline
+import logging
 import os
+import queue
+import threading
+import time
 import tkinter as tk
-from tkinter import filedialog, Spinbox, Scrollbar, Text, YView, Checkbutton, IntVar, Label, Entry, Button, END
+from tkinter import filedialog, ttk, Spinbox, Scrollbar, Text, YView, Checkbutton, IntVar, Label, Entry, Button, END
 import csv  # Import csv module for CSV export
 
 class JobScreeningApp:
+    QUEUE_POLL_MS = 100  # How often the UI drains worker messages
+    MAX_MESSAGES_PER_POLL = 2000  # Keeps one drain from blocking the UI for long
+
     def __init__(self, master):
         self.master = master
         master.title("AI Job Screening System")
@@ -16,10 +24,28 @@ class JobScreeningApp:
         self.excel_jd_file_path = tk.StringVar(master, value="D:/project/Accenture/job_screening_ai/data/job_description.csv")  # Default path
         self.cv_folder_path = tk.StringVar(master, value="D:/project/Accenture/job_screening_ai/data/CVs1")  # Default path
         self.shortlisting_threshold = tk.IntVar(master, value=70)
+        self.top_k = tk.IntVar(master, value=0)  # Best N candidates per job; 0 keeps everyone above the threshold
+        self.llm_workers = tk.IntVar(master, value=1)  # Parallel Ollama requests during CV pre-processing
+        self.incremental_mode = tk.IntVar(master, value=0)  # Only process CVs/JDs that changed since the last run
         self.interview_format = "Online Video Call"  # Fixed for now
         self.selected_job_titles = []
         self.job_title_vars = {}
-        self.csv_report_data = [] # Initialize csv_report_data
+        self.csv_report_data = [] # Initialize csv_report_data (only filled when keep_results_in_memory is set)
+        self.keep_results_in_memory = False
+        # Every run streams its results here as they are scored; "Generate CSV Report" exports from this file
+        self.results_file_path = os.path.join(cache_store.DEFAULT_CACHE_ROOT, "reports", "last_run_results.csv")
+        self.results_row_count = 0
+        self.cv_cache = cache_store.CVExtractionCache()  # Re-screening only pays the LLM cost for new or changed CVs
+        # One JD summary store for the app's lifetime, so unchanged postings are summarized at most once
+        self.jd_summary_store = cache_store.JDSummaryStore()
+        self.jd_agent = jd_summarizer_agent.JDSummarizerAgent(summary_store=self.jd_summary_store)
+        # Extracted CVs, JD summaries and scores are kept between sessions (query them with candidate_store.py)
+        self.candidate_store = candidate_store.CandidateStore()
+        self.job_data_frame_cache = None  # ((path, mtime, size), DataFrame) of the last JD CSV read
+        self.message_queue = queue.Queue()  # Worker thread -> UI messages
+        self.worker_thread = None
+        self.cancel_event = None
+        self.run_started_at = 0.0
 
         # --- UI Elements ---
         row = 0
@@ -37,6 +63,17 @@ class JobScreeningApp:
         Spinbox(master, from_=0, to=100, textvariable=self.shortlisting_threshold, width=5).grid(row=row, column=1, padx=5, pady=5, sticky="w")
         row += 1
 
+        Label(master, text="Top N Candidates per Job (0 = all):").grid(row=row, column=0, sticky="w")
+        Spinbox(master, from_=0, to=1000, textvariable=self.top_k, width=5).grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        row += 1
+
+        Label(master, text="Parallel LLM Requests:").grid(row=row, column=0, sticky="w")
+        Spinbox(master, from_=1, to=32, textvariable=self.llm_workers, width=5).grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        row += 1
+
+        Checkbutton(master, text="Incremental re-screening (only new or changed CVs and JDs)", variable=self.incremental_mode).grid(row=row, column=1, columnspan=2, sticky="w")
+        row += 1
+
         Label(master, text="Select Job Titles to Process:").grid(row=row, column=0, sticky="nw")
         self.job_title_canvas = tk.Canvas(master, borderwidth=2, relief="groove")  # Canvas for scrollable job titles
         self.job_title_frame = tk.Frame(self.job_title_canvas)  # Frame inside Canvas for checkboxes
@@ -48,12 +85,22 @@ class JobScreeningApp:
         self.job_title_frame.bind("<Configure>", self.on_frame_configure)
         row += 1
 
-        Button(master, text="Start Job Screening", command=self.start_processing).grid(row=row, column=1, columnspan=2, pady=20)
+        self.start_button = Button(master, text="Start Job Screening", command=self.start_processing)
+        self.start_button.grid(row=row, column=1, pady=20)
+        self.cancel_button = Button(master, text="Cancel", command=self.cancel_processing, state=tk.DISABLED)
+        self.cancel_button.grid(row=row, column=2, pady=20)
+        row += 1
+
+        # Progress bar and ETA
+        self.progress_bar = ttk.Progressbar(master, orient="horizontal", mode="determinate")
+        self.progress_bar.grid(row=row, column=1, padx=5, pady=5, sticky="ew")
+        self.status_label = Label(master, text="Idle")
+        self.status_label.grid(row=row, column=2, padx=5, pady=5, sticky="w")
         row += 1
 
         # CSV Export Button (initially disabled)
-        Button(master, text="Generate CSV Report", command=self.generate_csv_report, state=tk.DISABLED, width=20).grid(row=row, column=1, columnspan=2, pady=10)
-        self.csv_button = master.children['!button4']  # Access the button to control state
+        self.csv_button = Button(master, text="Generate CSV Report", command=self.generate_csv_report, state=tk.DISABLED, width=20)
+        self.csv_button.grid(row=row, column=1, columnspan=2, pady=10)
         row += 1
 
         # Results Display Area
@@ -92,8 +139,7 @@ class JobScreeningApp:
             self.results_text.insert(END, "Error: Please select a valid Job Description CSV file first.\n")
             return
 
-        jd_agent = jd_summarizer_agent.JDSummarizerAgent()
-        job_data_frame = jd_agent.load_job_descriptions_from_csv(csv_file_path)
+        job_data_frame = self.load_job_data_frame(csv_file_path)
         if job_data_frame is not None:
             job_titles = job_data_frame['Job Title'].unique()
             for i, job_title in enumerate(job_titles):
@@ -102,7 +148,23 @@ class JobScreeningApp:
                 self.job_title_vars[job_title] = var
             self.selected_job_titles = job_titles.tolist()
 
+    def load_job_data_frame(self, csv_file_path):
+        """
+        Loads the JD CSV, reusing the previously loaded DataFrame while the file is unchanged.
+        """
+        stat = os.stat(csv_file_path)
+        cache_key = (os.path.abspath(csv_file_path), stat.st_mtime, stat.st_size)
+        if self.job_data_frame_cache is not None and self.job_data_frame_cache[0] == cache_key:
+            return self.job_data_frame_cache[1]
+        job_data_frame = self.jd_agent.load_job_descriptions_from_csv(csv_file_path)
+        if job_data_frame is not None:
+            self.job_data_frame_cache = (cache_key, job_data_frame)
+        return job_data_frame
+
     def start_processing(self):
+        if self.worker_thread is not None and self.worker_thread.is_alive():
+            return  # A screening run is already in progress
+
         self.results_text.delete("1.0", END)
         jd_csv_file = self.excel_jd_file_path.get()
         cv_folder = self.cv_folder_path.get()
@@ -120,49 +182,154 @@ class JobScreeningApp:
             self.results_text.insert(END, "Error: No Job Titles selected for processing.\n")
             return
 
+        job_data_frame = self.load_job_data_frame(jd_csv_file)
+        if job_data_frame is None:
+            self.results_text.insert(END, "Error: Could not load the Job Description CSV file.\n")
+            return
+
         self.results_text.insert(END, "--- Starting Job Screening Process ---\n")
         self.results_text.insert(END, f"Job Description CSV: {jd_csv_file}\n")
         self.results_text.insert(END, f"CV Folder: {cv_folder}\n")
         self.results_text.insert(END, f"Shortlisting Threshold: {threshold}%\n")
+        if self.top_k.get():
+            self.results_text.insert(END, f"Top Candidates per Job: {self.top_k.get()}\n")
         self.results_text.insert(END, f"Selected Job Titles: {selected_job_titles}\n")
         self.results_text.see(END)
 
-        jd_agent = jd_summarizer_agent.JDSummarizerAgent()
-        cv_agent_instance = cv_agent.CVAgent()
-        shortlisting_agent_instance = shortlisting_agent.ShortlistingAgent(threshold=threshold)
-        scheduler = scheduler_agent.SchedulerAgent(interview_format=self.interview_format)
-
-        job_data_frame = jd_agent.load_job_descriptions_from_csv(jd_csv_file)
-        job_titles_to_process = selected_job_titles
-
-        all_cv_data = self.preprocess_cvs(cv_folder, cv_agent_instance)
-
-        final_results_for_csv = []  # List to collect results for CSV export
-
-        for job_title_to_process in job_titles_to_process:
-            job_row = job_data_frame[job_data_frame['Job Title'] == job_title_to_process]
-            job_description_text = job_row['Job Description'].iloc[0]
-            jd_data = jd_agent.summarize_jd(job_description_text)
+        # Tk variables are read here on the main thread; the worker thread never touches a widget
+        self.cancel_event = threading.Event()
+        pipeline = screening_pipeline.ScreeningPipeline(
+            threshold=threshold,
+            top_k=self.top_k.get(),
+            llm_workers=self.llm_workers.get(),
+            interview_format=self.interview_format,
+            cv_cache=self.cv_cache,
+            jd_summary_store=self.jd_summary_store,
+            candidate_store=self.candidate_store,
+            log=lambda message: self.message_queue.put(("log", message)),
+            on_progress=lambda completed, total: self.message_queue.put(("progress", (completed, total))),
+            cancel_event=self.cancel_event
+        )
+        self.csv_report_data = []
+        self.results_row_count = 0
+        self.csv_button.config(state=tk.DISABLED)
+        self.start_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_bar.config(value=0, maximum=1)
+        self.run_started_at = time.monotonic()
+
+        self.worker_thread = threading.Thread(
+            target=self.run_screening,
+            args=(pipeline, jd_csv_file, cv_folder, selected_job_titles, bool(self.incremental_mode.get()), job_data_frame),
+            daemon=True
+        )
+        self.worker_thread.start()
+        self.master.after(self.QUEUE_POLL_MS, self.drain_message_queue)
+
+    def run_screening(self, pipeline, jd_csv_file, cv_folder, job_titles, incremental, job_data_frame):
+        """
+        Runs the screening pipeline on the worker thread, reporting everything through the message queue.
+        """
+        try:
+            results_sink = report_writer.CSVResultsSink(self.results_file_path, keep_in_memory=self.keep_results_in_memory)
+        except OSError as e:
+            # E.g. the last report is still open in a spreadsheet; without this message the UI would wait forever
+            self.message_queue.put(("error", f"Could not open the results file {self.results_file_path}: {e}"))
+            return
 
-            self.results_text.insert(END, f"\n--- Summarized Job Description Data (for: {job_title_to_process}) ---\n")
-            self.results_text.insert(END, str(jd_data) + "\n")
+        def on_interview_request(candidate, interview_request_message):
+            pipeline.scheduler.send_interview_request(candidate_name=candidate['candidate_name'],
+                                                      interview_request_message=interview_request_message)
+            self.message_queue.put(("log", f"--- Interview Request for {candidate['candidate_name']} ---\n"
+                                           f"{interview_request_message}\n"
+                                           f"--- End of Interview Request for {candidate['candidate_name']} ---"))
+
+        try:
+            with results_sink:
+                pipeline.run(jd_csv_file, cv_folder, job_titles=job_titles, incremental=incremental,
+                             on_result=results_sink.write, on_interview_request=on_interview_request,
+                             job_data_frame=job_data_frame)
+            self.message_queue.put(("done", results_sink))
+        except screening_pipeline.ScreeningCancelled:
+            self.message_queue.put(("cancelled", results_sink))
+        except Exception as e:
+            self.message_queue.put(("error", f"{type(e).__name__}: {e} (results scored so far are in {self.results_file_path})"))
+
+    def drain_message_queue(self):
+        """
+        Applies the queued worker messages in one batch per timer tick, so a large run costs one Text insert
+        and one redraw per tick instead of one per CV.
+        """
+        log_lines = []
+        latest_progress = None
+        finished = None
+        try:
+            for _ in range(self.MAX_MESSAGES_PER_POLL):
+                kind, payload = self.message_queue.get_nowait()
+                if kind == "log":
+                    log_lines.append(payload)
+                elif kind == "progress":
+                    latest_progress = payload  # Only the most recent progress matters for this redraw
+                else:
+                    finished = (kind, payload)
+                    break
+        except queue.Empty:
+            pass
+
+        if latest_progress is not None:
+            self.update_progress(*latest_progress)
+        if log_lines:
+            self.results_text.insert(END, "\n".join(log_lines) + "\n")
             self.results_text.see(END)
 
-            cv_results = self.match_cvs_to_jd(all_cv_data, jd_data, shortlisting_agent_instance, job_title_to_process)
+        if finished is None:
+            self.master.after(self.QUEUE_POLL_MS, self.drain_message_queue)
+            return
 
-            final_results_for_csv.extend(cv_results)  # Collect results for CSV export
-            self.shortlist_and_schedule(cv_results, job_title_to_process, shortlisting_agent_instance, scheduler)
+        kind, payload = finished
+        self.start_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        if kind == "error":
+            self.results_text.insert(END, f"\nError during job screening: {payload}\n")
+            self.status_label.config(text="Failed")
+        else:
+            self.csv_report_data = payload.rows or []  # Store results for CSV export
+            self.results_row_count = payload.row_count
+            if kind == "cancelled":
+                self.results_text.insert(END, "\n--- Job Screening Cancelled ---\n")
+                self.status_label.config(text="Cancelled")
+            else:
+                self.results_text.insert(END, "\n--- Finished Processing ALL Selected Job Titles ---\n")
+                self.status_label.config(text="Finished")
+            if self.results_row_count:
+                self.csv_button.config(state=tk.NORMAL)  # Enable CSV export button AFTER processing
+        self.results_text.see(END)
 
+    def update_progress(self, completed_steps, total_steps):
+        self.progress_bar.config(maximum=max(total_steps, 1), value=completed_steps)
+        elapsed = time.monotonic() - self.run_started_at
+        if completed_steps and total_steps:
+            remaining_seconds = elapsed / completed_steps * (total_steps - completed_steps)
+            self.status_label.config(text=f"{completed_steps}/{total_steps} steps, ETA {int(remaining_seconds // 60)}m {int(remaining_seconds % 60)}s")
+        else:
+            self.status_label.config(text=f"0/{total_steps} steps")
 
-        self.results_text.insert(END, "\n--- Finished Processing ALL Selected Job Titles ---\n")
-        self.results_text.see(END)
+    def cancel_processing(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.status_label.config(text="Cancelling after the current step...")
 
-        self.csv_report_data = final_results_for_csv # Store results for CSV export
-        self.csv_button.config(state=tk.NORMAL)  # Enable CSV export button AFTER processing
 
+    def iter_report_rows(self):
+        if self.csv_report_data:
+            yield from self.csv_report_data
+            return
+        with open(self.results_file_path, newline='', encoding='utf-8') as results_file:
+            yield from csv.DictReader(results_file)
 
     def generate_csv_report(self):
-        if not self.csv_report_data:
+        if not self.results_row_count:
             self.results_text.insert(END, "Warning: No data available to export to CSV.\nRun Job Screening first.\n")
             return
 
@@ -175,7 +342,7 @@ class JobScreeningApp:
                 with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
                     csv_writer = csv.writer(csvfile)
                     csv_writer.writerow(['CV Filename', 'Candidate Name', 'Match Score (%)', 'Email', 'Phone Number'])  # Header row
-                    for row_data in self.csv_report_data:
+                    for row_data in self.iter_report_rows():
                         csv_writer.writerow([row_data['cv_filename'], row_data['candidate_name'], row_data['match_score'],
                                              row_data['email'], row_data['phone_number']])  # Write data rows
                 self.results_text.insert(END, f"\nCSV report generated successfully and saved to: {file_path}\n")
@@ -185,87 +352,8 @@ class JobScreeningApp:
                 self.results_text.see(END)
 
 
-    def preprocess_cvs(self, cv_folder, cv_agent_instance):
-        all_cv_data = {}
-        cv_file_names = [filename for filename in os.listdir(cv_folder) if filename.lower().endswith(".pdf")]
-
-        if not cv_file_names:
-            self.results_text.insert(END, f"Warning: No PDF CV files found in folder: {cv_folder}\n")
-        else:
-            self.results_text.insert(END, f"\n--- Pre-processing CVs from folder: {cv_folder} (once) ---\n")
-            for cv_filename in cv_file_names:
-                cv_file_path = os.path.join(cv_folder, cv_filename)
-                self.results_text.insert(END, f"  - Pre-processing CV: {cv_filename}\n")
-                self.results_text.see(END)
-
-                cv_text = cv_agent_instance.read_cv_from_file(cv_file_path)
-                if not cv_text:
-                    self.results_text.insert(END, f"    Error: Could not read CV file: {cv_filename}. Skipping pre-processing for this CV.\n")
-                    continue
-
-                cv_data = cv_agent_instance.extract_cv_data(cv_text)
-                all_cv_data[cv_filename] = cv_data
-        return all_cv_data
-
-    def match_cvs_to_jd(self, all_cv_data, jd_data, shortlisting_agent_instance, job_title_to_process):
-        cv_results = []
-        self.results_text.insert(END, f"\n--- Matching Pre-processed CVs for Job Title: {job_title_to_process} ---\n")
-        for cv_filename, cv_data in all_cv_data.items():
-            self.results_text.insert(END, f"  - Matching CV: {cv_filename}\n")
-            self.results_text.see(END)
-
-            # Include email and phone_number in the cv_results
-            cv_results.append({
-                "cv_filename": cv_filename,
-                "candidate_name": cv_data.get('name', 'N/A'),
-                "match_score": shortlisting_agent_instance.calculate_match_score(jd_data, cv_data),
-                "email": cv_data.get('email', 'N/A'),  # Get email from cv_data
-                "phone_number": cv_data.get('phone_number', 'N/A')  # Get phone_number from cv_data
-                , "job_title": job_title_to_process # Keep job_title in cv_results
-            })
-        return cv_results
-
-
-    def shortlist_and_schedule(self, cv_results, job_title_to_process, shortlisting_agent_instance, scheduler):
-        self.results_text.insert(END, f"\n--- Job Screening Results for Job Title: {job_title_to_process} ---\n")
-        shortlisted_candidates = shortlisting_agent_instance.shortlist_candidates(cv_results)
-
-        shortlist_output = ""
-        if shortlisted_candidates:
-            shortlist_output += f"\n--- Shortlisted Candidates (Match Score >= {shortlisting_agent_instance.threshold}%) ---\n"
-            for candidate in shortlisted_candidates:
-                shortlist_output += f"  - CV File: {candidate['cv_filename']}, Candidate: {candidate['candidate_name']}, Match Score: {candidate['match_score']}%\n"
-        else:
-            shortlist_output += "\n--- No Candidates Shortlisted based on Threshold ---\n"
-        self.results_text.insert(END, shortlist_output)
-        self.results_text.see(END)
-
-        if shortlisted_candidates:
-            self.results_text.insert(END, f"\n--- Scheduling Interviews for Shortlisted Candidates for Job Title: {job_title_to_process} ---\n")
-            potential_interview_dates = ["November 5th, 2023", "November 6th, 2023"]
-            potential_interview_times = ["10:00 AM - 12:00 PM", "2:00 PM - 4:00 PM"]
-
-            for candidate in shortlisted_candidates:
-                interview_request_message = scheduler.generate_interview_request(
-                    candidate_name=candidate['candidate_name'],
-                    job_title=job_title_to_process,
-                    potential_dates=potential_interview_dates,
-                    potential_times=potential_interview_times
-                )
-                scheduler.send_interview_request(
-                    candidate_name=candidate['candidate_name'],
-                    interview_request_message=interview_request_message
-                )
-                self.results_text.insert(END, f"\n--- Interview Request for {candidate['candidate_name']} ---\n")
-                self.results_text.insert(END, interview_request_message + "\n")
-                self.results_text.insert(END, f"--- End of Interview Request for {candidate['candidate_name']} ---\n")
-                self.results_text.see(END)
-        else:
-            self.results_text.insert(END, f"\n--- No Candidates to Schedule Interviews For - Job Title: {job_title_to_process} ---\n")
-            self.results_text.see(END)
-
-
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     root = tk.Tk()
     app = JobScreeningApp(root)
     root.mainloop()
\ No newline at end of file
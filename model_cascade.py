@@ -0,0 +1,147 @@
+import threading
+
+from instrumentation import get_metrics
+from skill_index import tokenize_skills
+
+RULES_TIER = "rules"  # Cascade tier that runs the rule-based extractor instead of a model
+DEFAULT_MIN_SKILLS = 3
+
+
+def cascade_tiers(draft_tiers, model_name):
+    """
+    Returns the full list of tiers tried in order: the draft tiers ("rules" or cheaper model names), then
+    model_name, which always has the last word. Duplicates are dropped.
+    """
+    return list(dict.fromkeys(list(draft_tiers or []) + [model_name]))
+
+
+def describe_tiers(tiers):
+    return " > ".join(tiers)
+
+
+def cv_extraction_problems(cv_data, parsed, min_skills=DEFAULT_MIN_SKILLS):
+    """
+    Checks a CV extraction before it is accepted from a cheap tier.
+
+    Args:
+        cv_data (dict): The extracted CV data (after merge_rule_fields).
+        parsed (bool): Whether the response was valid JSON (always True for the rules tier).
+        min_skills (int): Fewest skills an extraction may have; fewer suggests the tier missed the skills section.
+
+    Returns:
+        list: Short reasons the extraction is low-confidence ("invalid_json", "missing_name", "missing_contact",
+              "few_skills"); empty when it can be accepted.
+    """
+    if not parsed:
+        return ["invalid_json"]
+    problems = []
+    if not str(cv_data.get("name") or "").strip():
+        problems.append("missing_name")
+    if not cv_data.get("email") and not cv_data.get("phone_number"):
+        problems.append("missing_contact")
+    if len(tokenize_skills(cv_data.get("skills", ""))) < min_skills:
+        problems.append("few_skills")
+    return problems
+
+
+def jd_summary_problems(jd_data, parsed, min_skills=DEFAULT_MIN_SKILLS):
+    """
+    Checks a JD summary before it is accepted from a cheap tier. Scoring only uses required_skills, so that is
+    what has to be there.
+
+    Returns:
+        list: Reasons the summary is low-confidence ("invalid_json", "few_skills"); empty when it can be accepted.
+    """
+    if not parsed:
+        return ["invalid_json"]
+    if len(tokenize_skills(jd_data.get("required_skills", ""))) < min_skills:
+        return ["few_skills"]
+    return []
+
+
+class CascadeStats:
+    def __init__(self, agent_name):
+        """
+        Thread-safe per-tier counters of a cascade: documents tried, accepted and escalated, the seconds spent,
+        and why documents were escalated. Every record is also counted in the shared metrics.
+        """
+        self.agent_name = agent_name
+        self.tiers = {}  # tier -> {"tried", "accepted", "escalated", "seconds", "reasons": {reason: count}}
+        self._lock = threading.Lock()
+
+    def record(self, tier, seconds, accepted, problems):
+        with self._lock:
+            tier_stats = self.tiers.setdefault(tier, {"tried": 0, "accepted": 0, "escalated": 0, "seconds": 0.0,
+                                                      "reasons": {}})
+            tier_stats["tried"] += 1
+            tier_stats["seconds"] += seconds
+            tier_stats["accepted" if accepted else "escalated"] += 1
+            for problem in ([] if accepted else problems):
+                tier_stats["reasons"][problem] = tier_stats["reasons"].get(problem, 0) + 1
+        metrics = get_metrics()
+        metrics.observe(f"cascade_{self.agent_name}:{tier}", seconds)
+        metrics.increment("cascade_documents", agent=self.agent_name, tier=tier,
+                          outcome="accepted" if accepted else "escalated")
+
+    @property
+    def total(self):
+        with self._lock:
+            return sum(tier_stats["accepted"] for tier_stats in self.tiers.values())
+
+    def summary(self):
+        """
+        Returns one line per tier, e.g. "rules: 83 tried, 61 accepted, 22 escalated (few_skills 20, ...), 0.4 ms avg".
+        """
+        with self._lock:
+            lines = []
+            for tier, tier_stats in self.tiers.items():
+                line = f"{tier}: {tier_stats['tried']} tried, {tier_stats['accepted']} accepted, {tier_stats['escalated']} escalated"
+                if tier_stats["reasons"]:
+                    line += " (" + ", ".join(f"{reason} {count}" for reason, count in
+                                             sorted(tier_stats["reasons"].items(), key=lambda item: -item[1])) + ")"
+                line += f", {tier_stats['seconds'] / tier_stats['tried'] * 1000:.1f} ms avg"
+                lines.append(line)
+            return lines
+
+
+if __name__ == "__main__":
+    import logging
+    import os
+    import random
+    import time
+
+    import cv_agent
+    from fake_ollama_server import FakeOllamaServer, default_responder
+    from llm_client import LLMClient
+
+    SMALL_MODEL = "phi3:mini"
+    LARGE_MODEL = "mistral"
+
+    def tiered_responder(model, messages):
+        # The large model takes 200 ms, the small one 30 ms but answers about one CV in four with prose, not JSON
+        if model == SMALL_MODEL:
+            time.sleep(0.03)
+            if random.random() < 0.25:
+                return "I'm sorry, I could not find the candidate's details in this CV."
+        else:
+            time.sleep(0.2)
+        return default_responder(model, messages)
+
+    # --- Average latency per CV: large model only, small model first, rules then small model ---
+    logging.basicConfig(level=logging.ERROR)  # The small model's prose answers would each log a parse warning
+    random.seed(7)
+    CV_FOLDER_DEMO = "data/CVs1"
+    cv_texts = [cv_agent.CVAgent().read_cv_from_file(os.path.join(CV_FOLDER_DEMO, filename))
+                for filename in sorted(os.listdir(CV_FOLDER_DEMO)) if filename.lower().endswith(".pdf")]
+    with FakeOllamaServer(responder=tiered_responder) as fake_server:
+        client = LLMClient(host=fake_server.host)
+        for draft_tiers in ([], [SMALL_MODEL], [RULES_TIER, SMALL_MODEL]):
+            agent = cv_agent.CVAgent(model_name=LARGE_MODEL, llm_client_instance=client, cascade=draft_tiers)
+            start_time = time.perf_counter()
+            for cv_text in cv_texts:
+                agent.extract_cv_data(cv_text)
+            elapsed = time.perf_counter() - start_time
+            print(f"{describe_tiers(cascade_tiers(draft_tiers, LARGE_MODEL)):>24}: "
+                  f"{elapsed / len(cv_texts) * 1000:6.1f} ms per CV")
+            for line in agent.cascade_stats.summary():
+                print(f"    {line}")
@@ -0,0 +1,75 @@
+import argparse
+import os
+import time
+
+import fitz  # PyMuPDF
+
+import cv_agent
+import cv_pipeline
+
+
+def read_cv_legacy(file_path):
+    """
+    The original CVAgent.read_cv_from_file: opens the document by path and concatenates the pages with +=.
+    """
+    text = ""
+    pdf_document = fitz.open(file_path)
+    for page_number in range(pdf_document.page_count):
+        page = pdf_document.load_page(page_number)
+        text += page.get_text()
+    pdf_document.close()
+    return text
+
+
+def time_reader(label, read_all, file_count, repeats):
+    best_seconds = None
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        texts = read_all()
+        elapsed = time.perf_counter() - started_at
+        best_seconds = elapsed if best_seconds is None else min(best_seconds, elapsed)
+    total_chars = sum(len(text or "") for text in texts)
+    print(f"{label:<34} {best_seconds:8.3f}s {file_count / best_seconds:10.1f} files/sec {total_chars:>12,} chars")
+    return texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare CV PDF text extraction throughput.")
+    parser.add_argument("--cv-folder", default="data/CVs1")
+    parser.add_argument("--multiply", type=int, default=10, help="Read every PDF this many times per pass.")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes per method; the fastest is reported.")
+    parser.add_argument("--max-pages", type=int, default=3)
+    parser.add_argument("--max-chars", type=int, default=None)
+    parser.add_argument("--parse-workers", type=int, default=None, help="Processes for the pooled run (default: CPU count).")
+    args = parser.parse_args(argv)
+
+    cv_file_paths = [os.path.join(args.cv_folder, filename) for filename in sorted(os.listdir(args.cv_folder))
+                     if filename.lower().endswith(".pdf")] * args.multiply
+    print(f"Reading {len(cv_file_paths)} PDFs ({len(cv_file_paths) // args.multiply} files x {args.multiply}), "
+          f"best of {args.repeats} passes\n")
+
+    fast_reader = cv_agent.CVAgent()
+    mmap_reader = cv_agent.CVAgent(use_mmap=True)
+    capped_reader = cv_agent.CVAgent(max_pages=args.max_pages, max_chars=args.max_chars)
+    file_count = len(cv_file_paths)
+
+    legacy_texts = time_reader("legacy (path, +=)", lambda: [read_cv_legacy(path) for path in cv_file_paths],
+                               file_count, args.repeats)
+    fast_texts = time_reader("bytes + join", lambda: [fast_reader.read_cv_from_file(path) for path in cv_file_paths],
+                             file_count, args.repeats)
+    time_reader("mmap + join", lambda: [mmap_reader.read_cv_from_file(path) for path in cv_file_paths],
+                file_count, args.repeats)
+    time_reader(f"bytes + join, max {args.max_pages} pages",
+                lambda: [capped_reader.read_cv_from_file(path) for path in cv_file_paths], file_count, args.repeats)
+    parse_workers = args.parse_workers or os.cpu_count() or 1
+    time_reader(f"process pool ({parse_workers} workers)",
+                lambda: cv_pipeline.read_cv_texts(cv_file_paths, parse_workers=parse_workers, max_pages=args.max_pages,
+                                                  max_chars=args.max_chars),
+                file_count, args.repeats)
+
+    mismatches = sum(1 for legacy_text, fast_text in zip(legacy_texts, fast_texts) if legacy_text != fast_text)
+    print(f"\nUncapped fast path matches the legacy text for {file_count - mismatches}/{file_count} files.")
+
+
+if __name__ == "__main__":
+    main()
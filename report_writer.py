@@ -0,0 +1,151 @@
+import abc
+import csv
+import json
+import os
+
+RESULT_COLUMNS = ['job_title', 'cv_filename', 'candidate_name', 'match_score', 'email', 'phone_number', 'shortlisted',
+                  'duplicate_of']
+
+
+class ResultsSink(abc.ABC):
+    def __init__(self, file_path, chunk_size=500, keep_in_memory=False, columns=RESULT_COLUMNS):
+        """
+        Streams result rows to a file as they are scored, writing them out in chunks so memory stays bounded
+        by chunk_size however large the CV pool is.
+
+        Args:
+            file_path (str): Output file path.
+            chunk_size (int): Number of buffered rows that triggers a write and flush.
+            keep_in_memory (bool): Also keep every row in self.rows (the old in-memory behaviour).
+            columns (list): Columns written, in order. Other keys of a row are ignored.
+        """
+        self.file_path = file_path
+        self.chunk_size = max(1, chunk_size)
+        self.columns = columns
+        self.rows = [] if keep_in_memory else None
+        self.row_count = 0
+        self._buffer = []
+        self._closed = False
+        directory = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    @abc.abstractmethod
+    def _open(self):
+        """
+        Opens the output file; called once from __init__.
+        """
+
+    @abc.abstractmethod
+    def _write_chunk(self, rows):
+        """
+        Appends rows (dictionaries keyed by self.columns) to the output file.
+        """
+
+    @abc.abstractmethod
+    def _close(self):
+        """
+        Finishes and closes the output file; called once, after the last chunk.
+        """
+
+    def write(self, row):
+        row = {column: row.get(column, "") for column in self.columns}
+        self._buffer.append(row)
+        if self.rows is not None:
+            self.rows.append(row)
+        self.row_count += 1
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows. Rows flushed before a crash stay on disk.
+        """
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        if not self._closed:
+            self.flush()
+            self._close()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CSVResultsSink(ResultsSink):
+    def _open(self):
+        self._file = open(self.file_path, 'w', newline='', encoding='utf-8')
+        self._csv_writer = csv.DictWriter(self._file, fieldnames=self.columns)
+        self._csv_writer.writeheader()
+        self._file.flush()
+
+    def _write_chunk(self, rows):
+        self._csv_writer.writerows(rows)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class JSONLResultsSink(ResultsSink):
+    def _open(self):
+        self._file = open(self.file_path, 'w', encoding='utf-8')
+
+    def _write_chunk(self, rows):
+        self._file.write("".join(json.dumps(row) + "\n" for row in rows))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetResultsSink(ResultsSink):
+    def __init__(self, file_path, chunk_size=10000, keep_in_memory=False, columns=RESULT_COLUMNS):
+        """
+        Parquet sink; each flushed chunk becomes one row group. Requires pyarrow.
+        """
+        super().__init__(file_path, chunk_size=chunk_size, keep_in_memory=keep_in_memory, columns=columns)
+
+    def _open(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Writing Parquet reports requires pyarrow (pip install pyarrow).") from None
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([
+            (column, pyarrow.float64() if column == 'match_score'
+             else pyarrow.bool_() if column == 'shortlisted' else pyarrow.string())
+            for column in self.columns
+        ])
+        self._parquet_writer = pyarrow.parquet.ParquetWriter(self.file_path, self._schema)
+
+    def _write_chunk(self, rows):
+        columns = {}
+        for field in self._schema:
+            values = [row[field.name] for row in rows]
+            if field.type == self._pyarrow.string():
+                values = [None if value is None else str(value) for value in values]
+            columns[field.name] = values
+        self._parquet_writer.write_table(self._pyarrow.table(columns, schema=self._schema))
+
+    def _close(self):
+        self._parquet_writer.close()
+
+
+def open_results_sink(file_path, **kwargs):
+    """
+    Opens the results sink matching the file extension: .jsonl/.json, .parquet, or CSV for anything else.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in (".jsonl", ".json"):
+        return JSONLResultsSink(file_path, **kwargs)
+    if extension == ".parquet":
+        return ParquetResultsSink(file_path, **kwargs)
+    return CSVResultsSink(file_path, **kwargs)
@@ -0,0 +1,161 @@
+import re
+
+# Canonical (lower-case) skill names recognized in CV text. Matching is case-insensitive on whole words, and the
+# canonical form is what ends up in the skills field, so it lines up with the tokenized JD skills.
+# Skills that are also everyday words ("go", "r", "rest") are left out; add them through a lexicon file if needed.
+DEFAULT_SKILLS_LEXICON = [
+    # Programming languages
+    "python", "java", "javascript", "typescript", "c", "c++", "c#", "golang", "rust", "ruby", "php", "scala",
+    "kotlin", "swift", "objective-c", "matlab", "perl", "bash", "shell scripting", "powershell", "sql", "html",
+    "css", "dart", "haskell", "lua", "julia", "vba", "assembly",
+    # Frameworks and libraries
+    "django", "flask", "fastapi", "spring", "spring boot", "hibernate", ".net", "asp.net", "node.js", "express",
+    "react", "angular", "vue.js", "next.js", "jquery", "bootstrap", "tensorflow", "pytorch", "keras", "scikit-learn",
+    "pandas", "numpy", "scipy", "matplotlib", "opencv", "nltk", "spacy", "hugging face", "xgboost", "spark",
+    "pyspark", "hadoop", "airflow", "dbt", "selenium", "junit", "pytest", "graphql", "rest api", "restful apis",
+    "microservices", "cuda", "nvidia cuda", "unity", "unreal engine",
+    # Data stores and messaging
+    "mysql", "postgresql", "sqlite", "oracle", "sql server", "mongodb", "redis", "cassandra", "elasticsearch",
+    "dynamodb", "snowflake", "bigquery", "kafka", "rabbitmq",
+    # Cloud, DevOps and tooling
+    "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "terraform", "ansible", "jenkins", "git",
+    "github actions", "gitlab ci", "ci/cd", "azure devops", "linux", "unix", "nginx", "prometheus", "grafana",
+    "jira", "tableau", "power bi", "excel", "looker",
+    # Security
+    "cybersecurity", "penetration testing", "risk assessment", "metasploit", "wireshark", "burp suite",
+    "kali linux", "nmap", "siem", "splunk", "firewalls", "network security", "incident response",
+    "vulnerability assessment", "ethical hacking",
+    # Fields and practices
+    "machine learning", "deep learning", "artificial intelligence", "ai", "nlp", "natural language processing",
+    "computer vision", "data analysis", "data science", "data engineering", "data visualization", "statistics",
+    "big data", "etl", "cloud computing", "devops", "agile", "scrum", "software development", "web development",
+    "mobile development", "android", "ios", "networking", "database management", "system design", "testing",
+    "test automation", "ui/ux", "figma", "blockchain", "embedded systems", "iot", "project management",
+    "product management", "digital marketing", "seo", "accounting", "financial analysis",
+    # Soft skills
+    "communication", "leadership", "teamwork", "problem solving", "problem-solving", "critical thinking",
+    "time management", "collaboration", "attention to detail", "adaptability", "creativity", "negotiation",
+    "presentation", "customer service", "mentoring",
+]
+
+_EMAIL_RE = re.compile(r"(?<![\w.+-])[\w.+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+_LABELED_PHONE_RE = re.compile(r"^\W*(?:phone|mobile|mob|tel|telephone|cell|contact(?: number)?)\b\s*(?:no\.?|number)?\s*[:\-]?\s*(\+?[\d(][\d\s().\-/]{5,}\d)",
+                               re.IGNORECASE | re.MULTILINE)
+# Unlabeled numbers must look like phone numbers: a + prefix, an area code in brackets or at least 10 digits
+_PHONE_RE = re.compile(r"(?<![\w+])(?:\+\d[\d\s().\-]{6,}\d|\(\d{2,5}\)[\s.\-]?\d[\d\s.\-]{4,}\d|\d[\d\s.\-]{8,}\d)(?![\w])")
+_YEAR_RANGE_RE = re.compile(r"^(19|20)\d{2}\s*[\-.]\s*(19|20)\d{2}$")
+_LABELED_NAME_RE = re.compile(r"^\W*(?:full\s+)?name\s*[:\-]\s*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+_NAME_LINE_RE = re.compile(r"^[A-Z][a-zA-Z'\-]+(?: [A-Z][a-zA-Z'.\-]*){1,3}$")
+# Words keep the characters that appear inside skill names (c++, c#, .net, node.js, ci/cd, scikit-learn)
+_WORD_RE = re.compile(r"\.?[a-z0-9][a-z0-9+#./\-]*")
+_WORD_PART_SPLIT_RE = re.compile(r"[/\-]")
+
+
+def _tokenize(text):
+    return [word.rstrip(".-/") for word in _WORD_RE.findall(text.lower())]
+
+
+class RuleBasedExtractor:
+    def __init__(self, skills_lexicon=None):
+        """
+        Deterministic extractor for the fields that don't need an LLM: email and phone number by regex, the
+        candidate's name from a "Name:" line or a name-shaped first line, and skills by matching a lexicon
+        against the words of the text.
+
+        Args:
+            skills_lexicon (iterable): Known skill names (defaults to DEFAULT_SKILLS_LEXICON).
+        """
+        self.skills_lexicon = sorted({skill.strip().lower() for skill in (skills_lexicon or DEFAULT_SKILLS_LEXICON)
+                                      if skill.strip()})
+        # Skills are looked up as word n-grams of the tokenized text, so the cost per CV doesn't grow with the lexicon
+        self._skill_ngrams = {tuple(_tokenize(skill)): skill for skill in self.skills_lexicon}
+        self._skill_ngrams.pop((), None)
+        self._max_skill_words = max((len(ngram) for ngram in self._skill_ngrams), default=0)
+
+    @staticmethod
+    def load_lexicon(file_path):
+        """
+        Reads a skills lexicon file with one skill per line (blank lines and # comments are ignored).
+        """
+        with open(file_path, "r", encoding="utf-8") as lexicon_file:
+            return [line.strip() for line in lexicon_file if line.strip() and not line.lstrip().startswith("#")]
+
+    def extract_email(self, cv_text):
+        match = _EMAIL_RE.search(cv_text)
+        return match.group(0) if match else ""
+
+    def extract_phone_number(self, cv_text):
+        match = _LABELED_PHONE_RE.search(cv_text)
+        if match:
+            return match.group(1).strip()
+        for match in _PHONE_RE.finditer(cv_text):
+            phone_number = match.group(0).strip()
+            if not _YEAR_RANGE_RE.match(phone_number):
+                return phone_number
+        return ""
+
+    def extract_name(self, cv_text):
+        match = _LABELED_NAME_RE.search(cv_text)
+        if match:
+            return match.group(1)
+        for line in cv_text.splitlines():
+            line = line.strip()
+            if line:
+                return line if _NAME_LINE_RE.match(line) else ""
+        return ""
+
+    def extract_contacts(self, cv_text):
+        """
+        Returns {"name", "email", "phone_number"}; fields that aren't found are empty strings.
+        """
+        cv_text = cv_text or ""
+        return {
+            "name": self.extract_name(cv_text),
+            "email": self.extract_email(cv_text),
+            "phone_number": self.extract_phone_number(cv_text),
+        }
+
+    def extract_skills(self, cv_text):
+        """
+        Returns the lexicon skills found in the text as one comma-separated string, in order of first mention.
+        The longest match wins at each position, so "spring boot" is found rather than "spring".
+        """
+        words = _tokenize(cv_text or "")
+        skills = {}
+        position = 0
+        while position < len(words):
+            for ngram_length in range(min(self._max_skill_words, len(words) - position), 0, -1):
+                skill = self._skill_ngrams.get(tuple(words[position:position + ngram_length]))
+                if skill is not None:
+                    skills.setdefault(skill, None)
+                    position += ngram_length
+                    break
+            else:
+                # "python-based" or "ci/cd/devops" can still contain a skill
+                for word_part in _WORD_PART_SPLIT_RE.split(words[position]):
+                    if (word_part,) in self._skill_ngrams:
+                        skills.setdefault(self._skill_ngrams[(word_part,)], None)
+                position += 1
+        return ", ".join(skills)
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    import cv_pipeline
+
+    CV_FOLDER_DEMO = "data/CVs1"
+    cv_file_paths = [os.path.join(CV_FOLDER_DEMO, filename) for filename in sorted(os.listdir(CV_FOLDER_DEMO))
+                     if filename.lower().endswith(".pdf")]
+    cv_texts = cv_pipeline.read_cv_texts(cv_file_paths)
+
+    extractor = RuleBasedExtractor()
+    started_at = time.perf_counter()
+    extractions = [dict(extractor.extract_contacts(cv_text), skills=extractor.extract_skills(cv_text)) for cv_text in cv_texts]
+    elapsed = time.perf_counter() - started_at
+
+    for cv_file_path, extracted in list(zip(cv_file_paths, extractions))[:3]:
+        print(f"{os.path.basename(cv_file_path)}: {extracted}")
+    complete = sum(1 for extracted in extractions if extracted["name"] and extracted["email"] and extracted["phone_number"])
+    print(f"\n{len(cv_texts)} CVs in {elapsed * 1000:.1f} ms ({len(cv_texts) / elapsed:,.0f} CVs/sec), "
+          f"{complete} with name, email and phone number")
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+
+from cache_store import DEFAULT_CACHE_ROOT
+
+DEFAULT_CHECKPOINT_ROOT = os.path.join(DEFAULT_CACHE_ROOT, "runs")
+
+
+class RunCheckpoint:
+    def __init__(self, run_id, config, checkpoint_root=DEFAULT_CHECKPOINT_ROOT):
+        """
+        Opens (or creates) the checkpoint journal of a screening run. Every completed CV extraction, JD summary
+        and scored job is appended and fsync'ed, so restarting with the same run ID skips the finished work.
+
+        Args:
+            run_id (str): Identifier of the run; reuse it to resume.
+            config (dict): Settings of the run (folders, model, ...). Resuming with different settings is refused.
+            checkpoint_root (str): Directory holding one journal file per run.
+
+        Raises:
+            ValueError: If the run ID exists with a different config.
+        """
+        if not run_id or os.sep in run_id or (os.altsep and os.altsep in run_id):
+            raise ValueError(f"Invalid run ID: {run_id!r}")
+        self.run_id = run_id
+        self.config = config
+        self.journal_path = os.path.join(checkpoint_root, run_id + ".jsonl")
+        self.cv_data = {}  # cv_filename -> extracted CV data
+        self.jd_data = {}  # job title -> summarized JD data
+        self.scored_jobs = {}  # job title -> number of CV/job pairs scored
+        self._lock = threading.Lock()
+
+        os.makedirs(checkpoint_root, exist_ok=True)
+        self.resumed = os.path.exists(self.journal_path)
+        if self.resumed:
+            self._load()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        if not self.resumed:
+            self._append({"type": "run", "config": config})
+
+    def _load(self):
+        complete_size = 0  # Bytes up to the end of the last newline-terminated line
+        with open(self.journal_path, "rb") as journal:
+            for line in journal:
+                if not line.endswith(b"\n"):
+                    break  # A torn last line from a crash mid-write; the work it described is simply redone
+                complete_size += len(line)
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    continue
+                record_type = record.get("type")
+                if record_type == "run" and record.get("config") != self.config:
+                    raise ValueError(f"Run {self.run_id} was started with different settings: {record.get('config')}")
+                elif record_type == "cv":
+                    self.cv_data[record["cv_filename"]] = record["cv_data"]
+                elif record_type == "jd":
+                    self.jd_data[record["job_title"]] = record["jd_data"]
+                elif record_type == "job_scored":
+                    self.scored_jobs[record["job_title"]] = record["pair_count"]
+        if complete_size < os.path.getsize(self.journal_path):
+            # Drop the torn line, or the next record appended would be glued onto it and lost on the next resume
+            os.truncate(self.journal_path, complete_size)
+
+    def _append(self, record):
+        with self._lock:
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+    def record_cv(self, cv_filename, cv_data):
+        self.cv_data[cv_filename] = cv_data
+        self._append({"type": "cv", "cv_filename": cv_filename, "cv_data": cv_data})
+
+    def record_jd(self, job_title, jd_data):
+        self.jd_data[job_title] = jd_data
+        self._append({"type": "jd", "job_title": job_title, "jd_data": jd_data})
+
+    def record_job_scored(self, job_title, pair_count):
+        self.scored_jobs[job_title] = pair_count
+        self._append({"type": "job_scored", "job_title": job_title, "pair_count": pair_count})
+
+    def close(self):
+        self._journal.close()
+
+    def summary(self):
+        return (f"run {self.run_id}: {len(self.cv_data)} CVs extracted, {len(self.jd_data)} JDs summarized, "
+                f"{len(self.scored_jobs)} jobs scored")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List or delete screening run checkpoints.")
+    parser.add_argument("command", choices=["list", "delete"])
+    parser.add_argument("run_ids", nargs="*")
+    parser.add_argument("--checkpoint-dir", default=DEFAULT_CHECKPOINT_ROOT)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        if os.path.isdir(args.checkpoint_dir):
+            for filename in sorted(os.listdir(args.checkpoint_dir)):
+                if filename.endswith(".jsonl"):
+                    print(filename[:-len(".jsonl")])
+    else:
+        for run_id in args.run_ids:
+            journal_path = os.path.join(args.checkpoint_dir, run_id + ".jsonl")
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+                print(f"Deleted run {run_id}")
+            else:
+                print(f"No checkpoint for run {run_id}")
@@ -1,3 +1,8 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 class SchedulerAgent:
     COMPANY_NAME = "[Company Name]"  # Class attribute for company name
 
@@ -50,19 +55,19 @@ class SchedulerAgent:
 
     def send_interview_request(self, candidate_name, interview_request_message):
         """
-        "Sends" the interview request (for hackathon, just prints to console).
+        "Sends" the interview request (for hackathon, just logs it at INFO level).
 
         Args:
             candidate_name (str): Name of the candidate.
             interview_request_message (str): The generated interview request message.
         """
-        print(f"\n--- Interview Request for {candidate_name} ---")
-        print(interview_request_message)
-        print(f"--- End of Interview Request for {candidate_name} ---\n")
+        logger.info("\n--- Interview Request for %s ---\n%s\n--- End of Interview Request for %s ---\n",
+                    candidate_name, interview_request_message, candidate_name)
 
 
 if __name__ == "__main__":
     # --- Example Usage ---
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     scheduler = SchedulerAgent(interview_format="Online Video Call") # Create SchedulerAgent instance
 
     sample_candidate = {
@@ -0,0 +1,186 @@
+import numpy as np
+from scipy import sparse
+
+from skill_index import SkillIndex
+
+
+class ScoreMatrix:
+    def __init__(self, job_titles, cv_ids, scores):
+        """
+        Holds a jobs x CVs matrix of match percentages.
+
+        Args:
+            job_titles (list): Row labels.
+            cv_ids (list): Column labels (CV filenames).
+            scores (numpy.ndarray): float64 array of shape (len(job_titles), len(cv_ids)).
+        """
+        self.job_titles = list(job_titles)
+        self.cv_ids = list(cv_ids)
+        self.scores = scores
+        self._row_by_title = {job_title: row for row, job_title in enumerate(self.job_titles)}
+
+    def row(self, job_title):
+        """
+        Returns the scores of every CV for one job as a NumPy array, in cv_ids order.
+        """
+        return self.scores[self._row_by_title[job_title]]
+
+    def scores_for(self, job_title):
+        """
+        Returns the scores of every CV for one job as a {cv_id: match_score} dictionary.
+        """
+        return dict(zip(self.cv_ids, self.row(job_title).tolist()))
+
+    def restrict_to(self, eligible_cv_ids):
+        """
+        Sets the scores of every CV not in eligible_cv_ids (e.g. CVs lacking a must-have skill) to 0 for all jobs.
+        """
+        ineligible_columns = [column for column, cv_id in enumerate(self.cv_ids) if cv_id not in eligible_cv_ids]
+        self.scores[:, ineligible_columns] = 0.0
+
+    def top_k(self, job_title, k, threshold=None):
+        """
+        Selects the k best CVs for one job with a partial sort of its row, without sorting the whole row.
+        Ties keep cv_ids order, matching ShortlistingAgent.select_top_k.
+
+        Returns:
+            list: Up to k (cv_id, match_score) tuples, ranked by descending match score.
+        """
+        row = self.row(job_title)
+        candidates = np.flatnonzero(row >= threshold) if threshold is not None else np.arange(len(row))
+        if k < len(candidates):
+            candidate_scores = row[candidates]
+            kth_score = np.partition(candidate_scores, len(candidates) - k)[len(candidates) - k]
+            above = candidates[candidate_scores > kth_score]
+            ties = candidates[candidate_scores == kth_score][:k - len(above)]
+            candidates = np.concatenate([above, ties])
+        ranked = candidates[np.lexsort((candidates, -row[candidates]))]
+        return [(self.cv_ids[column], float(row[column])) for column in ranked]
+
+
+def build_cv_matrix(cv_skill_index):
+    """
+    Encodes every CV in the index as a sparse binary row vector over the skill vocabulary.
+
+    Returns:
+        tuple: (cv_ids, matrix) with matrix a CSR matrix of shape (number of CVs, vocabulary size).
+    """
+    cv_ids = list(cv_skill_index.cv_skill_ids)
+    indptr = np.zeros(len(cv_ids) + 1, dtype=np.int64)
+    indices = []
+    for row, cv_id in enumerate(cv_ids):
+        cv_skill_ids = cv_skill_index.cv_skill_ids[cv_id]
+        indices.extend(cv_skill_ids)
+        indptr[row + 1] = indptr[row] + len(cv_skill_ids)
+    indices = np.asarray(indices, dtype=np.int64)
+    data = np.ones(len(indices), dtype=np.int32)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(cv_ids), len(cv_skill_index.skill_ids)))
+    return cv_ids, matrix
+
+
+def _rounded_score_table(max_total):
+    # Scores only depend on (matched, total), both small integers, so rounding every distinct pair with Python's
+    # round() keeps the results bit-identical to ShortlistingAgent.calculate_match_score
+    table = np.zeros((max_total + 1, max_total + 1), dtype=np.float64)
+    for total in range(1, max_total + 1):
+        for matched in range(total + 1):
+            table[total, matched] = round((matched / total) * 100.0, 2)
+    return table
+
+
+def _semantic_matched_counts(job_titles, jd_data_by_title, cv_skill_index, cv_matrix, skill_matcher):
+    # Each distinct required skill becomes a row of its neighbouring vocabulary skills; a CV meets the requirement
+    # when it has any of them, and met requirements add their multiplicity to their job's matched count
+    requirement_rows, requirement_columns = [], []
+    weight_rows, weight_columns, weights = [], [], []
+    totals = np.zeros(len(job_titles), dtype=np.int64)
+    for row, job_title in enumerate(job_titles):
+        requirements, totals[row] = skill_matcher.encode_jd(jd_data_by_title[job_title], cv_skill_index)
+        for neighbor_skill_ids, count in requirements:
+            requirement = len(weights)
+            requirement_rows.extend([requirement] * len(neighbor_skill_ids))
+            requirement_columns.extend(neighbor_skill_ids.tolist())
+            weight_rows.append(requirement)
+            weight_columns.append(row)
+            weights.append(count)
+    requirement_matrix = sparse.csr_matrix(
+        (np.ones(len(requirement_rows), dtype=np.int32), (requirement_rows, requirement_columns)),
+        shape=(len(weights), cv_matrix.shape[1]))
+    weight_matrix = sparse.csr_matrix((np.asarray(weights, dtype=np.int32), (weight_rows, weight_columns)),
+                                      shape=(len(weights), len(job_titles)))
+    met = (cv_matrix @ requirement_matrix.T).tocsr()
+    met.data[:] = 1
+    return (met @ weight_matrix).T.toarray(), totals
+
+
+def compute_score_matrix(jd_data_by_title, cv_skill_index, skill_matcher=None):
+    """
+    Computes the match percentage of every CV for every job in one sparse matrix product.
+
+    Args:
+        jd_data_by_title (dict): Maps job title to summarized JD data (with "required_skills").
+        cv_skill_index (SkillIndex): Index of the pre-processed CVs.
+        skill_matcher (SemanticSkillMatcher): Optional matcher; when given, a required skill counts as found
+                                              when the CV has a similar skill, not only the identical one.
+
+    Returns:
+        ScoreMatrix: Scores identical to ShortlistingAgent.calculate_match_score (with the same skill_matcher)
+                     for each pair.
+    """
+    job_titles = list(jd_data_by_title)
+    cv_ids, cv_matrix = build_cv_matrix(cv_skill_index)
+
+    if skill_matcher is not None:
+        matched, totals = _semantic_matched_counts(job_titles, jd_data_by_title, cv_skill_index, cv_matrix, skill_matcher)
+    else:
+        # Required skills keep their multiplicity, because a skill listed twice in a JD also counts twice per-pair
+        rows, columns, counts = [], [], []
+        totals = np.zeros(len(job_titles), dtype=np.int64)
+        for row, job_title in enumerate(job_titles):
+            required_skill_counts, total_required = cv_skill_index.encode_jd(jd_data_by_title[job_title])
+            totals[row] = total_required
+            for skill_id, count in required_skill_counts.items():
+                rows.append(row)
+                columns.append(skill_id)
+                counts.append(count)
+        jd_matrix = sparse.csr_matrix((np.asarray(counts, dtype=np.int32), (rows, columns)),
+                                      shape=(len(job_titles), cv_matrix.shape[1]))
+        matched = (jd_matrix @ cv_matrix.T).toarray()
+
+    table = _rounded_score_table(int(totals.max()) if len(totals) else 0)
+    scores = table[totals[:, None], matched]
+    return ScoreMatrix(job_titles, cv_ids, scores)
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from shortlisting_agent import ShortlistingAgent
+
+    # --- Synthetic pool: 50 jobs x 100k CVs over a 2,000-skill vocabulary ---
+    random.seed(42)
+    vocabulary = [f"skill {i}" for i in range(2000)]
+    all_cv_data = {f"cv_{i}.pdf": {"skills": ", ".join(random.sample(vocabulary, random.randint(3, 25)))}
+                   for i in range(100_000)}
+    jd_data_by_title = {f"Job {j}": {"required_skills": ", ".join(random.choices(vocabulary[:300], k=random.randint(3, 12)))}
+                        for j in range(50)}
+
+    start_time = time.perf_counter()
+    cv_skill_index = SkillIndex.from_cv_data(all_cv_data)
+    index_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    score_matrix = compute_score_matrix(jd_data_by_title, cv_skill_index)
+    matrix_time = time.perf_counter() - start_time
+    print(f"Indexed {len(cv_skill_index)} CVs in {index_time:.2f}s; "
+          f"scored {len(jd_data_by_title)} jobs x {len(cv_skill_index)} CVs in {matrix_time:.2f}s")
+
+    # --- Spot-check against the per-pair path ---
+    agent = ShortlistingAgent(threshold=70)
+    sample_cv_ids = random.sample(list(all_cv_data), 2000)
+    mismatches = 0
+    for job_title, jd_data in jd_data_by_title.items():
+        job_scores = score_matrix.scores_for(job_title)
+        mismatches += sum(1 for cv_id in sample_cv_ids
+                          if job_scores[cv_id] != agent.calculate_match_score(jd_data, all_cv_data[cv_id]))
+    print(f"Mismatches against calculate_match_score on a {len(sample_cv_ids)}-CV sample: {mismatches}")
@@ -0,0 +1,252 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+
+import cache_store
+import candidate_store
+import cv_compactor
+import cv_dedup
+import endpoint_pool
+import llm_client
+import model_cascade
+import report_writer
+import run_checkpoint
+import skill_embeddings
+from cv_agent import CVAgent
+from instrumentation import get_metrics
+from rule_extractor import RuleBasedExtractor
+from screening_pipeline import ScreeningPipeline
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run AI job screening without the GUI.")
+    parser.add_argument("--jd-csv", default="data/job_description.csv", help="Job Description CSV file.")
+    parser.add_argument("--cv-folder", default="data/CVs1", help="Folder containing the CV PDFs.")
+    parser.add_argument("--threshold", type=float, default=70, help="Shortlisting threshold in percent.")
+    parser.add_argument("--job-title", dest="job_titles", action="append",
+                        help="Job title to process (repeatable). Defaults to every title in the CSV.")
+    parser.add_argument("--top-k", type=int, default=None, help="Shortlist at most this many candidates per job.")
+    parser.add_argument("--llm-workers", type=int, default=1, help="Concurrent LLM requests during CV pre-processing.")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Processes used for PDF parsing (default: CPU count).")
+    parser.add_argument("--max-pages", type=int, default=None, help="Only read the first N pages of each CV.")
+    parser.add_argument("--max-chars", type=int, default=None, help="Truncate each CV's text to N characters.")
+    parser.add_argument("--token-budget", type=int, default=cv_compactor.DEFAULT_TOKEN_BUDGET,
+                        help="Maximum estimated tokens of CV text per extraction prompt.")
+    parser.add_argument("--no-compaction", action="store_true", help="Send the raw CV text to the LLM.")
+    parser.add_argument("--extraction-mode", choices=CVAgent.EXTRACTION_MODES, default="llm",
+                        help="'llm' extracts every field with the LLM (email/phone checked by regex); 'rules', "
+                             "'contact-only' and 'skills-only' skip the LLM and fill only those fields.")
+    parser.add_argument("--skills-lexicon", default=None,
+                        help="File with one known skill per line for rule-based skill extraction.")
+    parser.add_argument("--no-structured-output", action="store_true",
+                        help="Request plain JSON mode instead of schema-constrained output (for Ollama older than 0.5).")
+    parser.add_argument("--cv-batch-size", type=int, default=1,
+                        help="Pack up to N short CVs into one extraction request (1 = one request per CV).")
+    parser.add_argument("--semantic-skills", action="store_true",
+                        help="Match JD skills to similar CV skills ('web dev' for 'web development'), not only identical ones.")
+    parser.add_argument("--skill-similarity", type=float, default=skill_embeddings.DEFAULT_SIMILARITY_THRESHOLD,
+                        help="Minimum cosine similarity of two skills for --semantic-skills.")
+    parser.add_argument("--skill-vectors", default=None,
+                        help="Optional .npz file of precomputed word vectors ('words' and 'vectors' arrays) for --semantic-skills.")
+    parser.add_argument("--must-have", dest="must_have_skills", action="append",
+                        help="Skill every shortlisted candidate must have (repeatable); CVs without it score 0.")
+    parser.add_argument("--dedup-cvs", action="store_true",
+                        help="Detect exact and near-duplicate CV texts (re-submissions) and extract each group once.")
+    parser.add_argument("--dedup-threshold", type=float, default=cv_dedup.DEFAULT_SIMILARITY_THRESHOLD,
+                        help="Minimum estimated text similarity (0-1) of two CVs for --dedup-cvs.")
+    parser.add_argument("--model", default="mistral", help="Ollama model used by the agents.")
+    parser.add_argument("--cascade", action="append", default=None, metavar="TIER",
+                        help="Cheaper tier tried before --model (repeatable, in order): 'rules' or a smaller model "
+                             "name, e.g. --cascade rules --cascade phi3:mini. Only documents whose result lacks a "
+                             "name, contact or enough skills (or isn't valid JSON) go on to the next tier.")
+    parser.add_argument("--cascade-min-skills", type=int, default=model_cascade.DEFAULT_MIN_SKILLS,
+                        help="Fewest skills a cheaper --cascade tier's result may have to be accepted.")
+    parser.add_argument("--ollama-endpoint", dest="ollama_endpoints", action="append",
+                        help="Ollama server to spread LLM requests over (repeatable), as "
+                             "HOST[,weight=W][,max_concurrency=N], e.g. http://gpu1:11434,weight=2. "
+                             "Defaults to the single OLLAMA_HOST server.")
+    parser.add_argument("--endpoint-policy", choices=endpoint_pool.POLICIES, default="least-outstanding",
+                        help="How requests are spread over the --ollama-endpoint servers.")
+    parser.add_argument("--endpoint-concurrency", type=int, default=endpoint_pool.DEFAULT_ENDPOINT_CONCURRENCY,
+                        help="Requests in flight per endpoint when its spec sets no max_concurrency.")
+    parser.add_argument("--health-check-interval", type=float, default=None,
+                        help="Check every endpoint's /api/tags this often (seconds), ejecting unreachable ones.")
+    parser.add_argument("--interview-format", default="Online Video Call")
+    parser.add_argument("--incremental", action="store_true", help="Only process CVs and JDs changed since the last run.")
+    parser.add_argument("--candidate-db", default=None,
+                        help="SQLite file that keeps the extracted CVs, JD summaries and scores for later queries "
+                             "(see candidate_store.py).")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the CV extraction cache or JD summary store.")
+    parser.add_argument("--output", default="job_screening_report.csv", help="Results file (.csv, .jsonl or .parquet).")
+    parser.add_argument("--flush-every", type=int, default=500, help="Write and flush the results file every N rows.")
+    parser.add_argument("--interview-requests", default=None, help="Optional JSONL file for the generated interview requests.")
+    parser.add_argument("--run-id", default=None,
+                        help="Checkpoint the run under this ID; rerunning with the same ID resumes where it stopped.")
+    parser.add_argument("--checkpoint-dir", default=run_checkpoint.DEFAULT_CHECKPOINT_ROOT,
+                        help="Directory holding run checkpoints.")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary.")
+    parser.add_argument("--log-level", default="WARNING", choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                        help="Level of the agents' log messages on stderr (DEBUG includes the raw LLM responses).")
+    parser.add_argument("--metrics-json", default=None,
+                        help="Write per-stage timings (p50/p99) and counters of the run to this JSON file.")
+    parser.add_argument("--metrics-prom", default=None,
+                        help="Write the run's metrics in the Prometheus text format to this file "
+                             "(e.g. for the node_exporter textfile collector).")
+    return parser.parse_args(argv)
+
+
+def write_metrics(args, log):
+    metrics = get_metrics()
+    log("--- Stage timings ---")
+    for line in metrics.summary_lines():
+        log(f"  {line}")
+    try:
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom)
+    except OSError as e:
+        print(f"Error: Could not write metrics: {e}", file=sys.stderr)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log = (lambda message: None) if args.quiet else (lambda message: print(message, file=sys.stderr))
+    logging.basicConfig(level=args.log_level, format="%(levelname)s %(name)s: %(message)s", stream=sys.stderr)
+    get_metrics().reset()
+
+    skills_lexicon = None
+    if args.skills_lexicon:
+        try:
+            skills_lexicon = RuleBasedExtractor.load_lexicon(args.skills_lexicon)
+        except OSError as e:
+            print(f"Error: Could not read skills lexicon: {e}", file=sys.stderr)
+            return 2
+    if args.skill_vectors and not os.path.isfile(args.skill_vectors):
+        print(f"Error: Skill vectors file not found: {args.skill_vectors}", file=sys.stderr)
+        return 2
+
+    checkpoint = None
+    if args.run_id:
+        config = {"jd_csv": os.path.abspath(args.jd_csv), "cv_folder": os.path.abspath(args.cv_folder),
+                  "job_titles": args.job_titles, "model": args.model, "threshold": args.threshold,
+                  "top_k": args.top_k, "interview_format": args.interview_format,
+                  "max_pages": args.max_pages, "max_chars": args.max_chars,
+                  "token_budget": None if args.no_compaction else args.token_budget,
+                  "extraction_mode": args.extraction_mode, "skills_lexicon": skills_lexicon,
+                  "skill_matching": [args.skill_similarity, args.skill_vectors] if args.semantic_skills else "exact",
+                  "must_have_skills": args.must_have_skills,
+                  "cascade": [args.cascade, args.cascade_min_skills] if args.cascade else None,
+                  "dedup_threshold": args.dedup_threshold if args.dedup_cvs else None}
+        try:
+            checkpoint = run_checkpoint.RunCheckpoint(args.run_id, config, checkpoint_root=args.checkpoint_dir)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        if checkpoint.resumed:
+            log(f"Resuming {checkpoint.summary()}")
+
+    client = None
+    if args.ollama_endpoints:
+        try:
+            pool = endpoint_pool.EndpointPool.from_specs(args.ollama_endpoints, args.endpoint_concurrency,
+                                                         policy=args.endpoint_policy,
+                                                         health_check_interval=args.health_check_interval)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            if checkpoint is not None:
+                checkpoint.close()
+            return 2
+        client = llm_client.LLMClient(endpoint_pool=pool)
+        log(f"Spreading LLM requests over {len(pool.endpoints)} Ollama endpoints ({args.endpoint_policy})")
+
+    store = None
+    if args.candidate_db:
+        try:
+            store = candidate_store.CandidateStore(args.candidate_db)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error: Could not open candidate store: {e}", file=sys.stderr)
+            if checkpoint is not None:
+                checkpoint.close()
+            return 2
+
+    pipeline = ScreeningPipeline(
+        model_name=args.model,
+        threshold=args.threshold,
+        top_k=args.top_k,
+        llm_workers=args.llm_workers,
+        parse_workers=args.parse_workers,
+        max_pages=args.max_pages,
+        max_chars=args.max_chars,
+        compact_cvs=not args.no_compaction,
+        cv_token_budget=args.token_budget,
+        extraction_mode=args.extraction_mode,
+        skills_lexicon=skills_lexicon,
+        structured_output=not args.no_structured_output,
+        cv_batch_size=args.cv_batch_size,
+        semantic_skills=args.semantic_skills,
+        skill_similarity=args.skill_similarity,
+        skill_vectors_path=args.skill_vectors,
+        must_have_skills=args.must_have_skills,
+        interview_format=args.interview_format,
+        cv_cache=None if args.no_cache else cache_store.CVExtractionCache(),
+        jd_summary_store=None if args.no_cache else cache_store.JDSummaryStore(),
+        log=log,
+        checkpoint=checkpoint,
+        candidate_store=store,
+        llm_client_instance=client,
+        cascade=args.cascade,
+        cascade_min_skills=args.cascade_min_skills,
+        dedup_cvs=args.dedup_cvs,
+        dedup_threshold=args.dedup_threshold
+    )
+
+    try:
+        result_writer = report_writer.open_results_sink(args.output, chunk_size=args.flush_every)
+    except ImportError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if checkpoint is not None:
+            checkpoint.close()
+        if store is not None:
+            store.close()
+        return 2
+    interview_file = open(args.interview_requests, 'w', encoding='utf-8') if args.interview_requests else None
+
+    def on_interview_request(candidate, message):
+        if interview_file is not None:
+            interview_file.write(json.dumps({"job_title": candidate['job_title'], "cv_filename": candidate['cv_filename'],
+                                             "candidate_name": candidate['candidate_name'], "email": candidate['email'],
+                                             "message": message}) + "\n")
+
+    try:
+        shortlists = pipeline.run(args.jd_csv, args.cv_folder, job_titles=args.job_titles, incremental=args.incremental,
+                                  on_result=result_writer.write, on_interview_request=on_interview_request)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        result_writer.close()
+        if interview_file is not None:
+            interview_file.close()
+        if checkpoint is not None:
+            checkpoint.close()
+        if store is not None:
+            store.close()
+        if client is not None:
+            client.endpoint_pool.stop_health_checks()
+            for endpoint_stats in client.endpoint_pool.stats():
+                log(f"  Endpoint {endpoint_stats['host']}: {endpoint_stats['requests']} requests, "
+                    f"{endpoint_stats['failures']} failures, {endpoint_stats['ejections']} ejections, "
+                    f"{endpoint_stats['mean_latency_ms']} ms mean latency")
+        write_metrics(args, log)
+
+    for job_title, shortlisted_candidates in shortlists.items():
+        print(f"{job_title}: {len(shortlisted_candidates)} shortlisted")
+    print(f"Wrote {result_writer.row_count} result rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
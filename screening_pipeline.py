@@ -0,0 +1,511 @@
+import os
+import threading
+
+import cv_agent
+import cv_compactor
+import cv_dedup
+import cv_pipeline
+import incremental_screening
+import jd_summarizer_agent
+import model_cascade
+import scheduler_agent
+import score_matrix
+import shortlisting_agent
+import skill_embeddings
+from candidate_store import ResultRecorder
+from instrumentation import get_metrics
+from skill_index import SkillIndex
+
+POTENTIAL_INTERVIEW_DATES = ["November 5th, 2023", "November 6th, 2023"]
+POTENTIAL_INTERVIEW_TIMES = ["10:00 AM - 12:00 PM", "2:00 PM - 4:00 PM"]
+
+
+class ScreeningCancelled(Exception):
+    """
+    Raised by ScreeningPipeline.run when its cancel_event is set.
+    """
+
+
+def list_cv_files(cv_folder):
+    return sorted(filename for filename in os.listdir(cv_folder) if filename.lower().endswith(".pdf"))
+
+
+# The only CV fields scoring and reporting need; the rest of an extraction is dropped after pre-processing
+REPORT_CV_FIELDS = ("name", "skills", "email", "phone_number")
+
+
+def slim_cv_record(cv_data):
+    return {field: cv_data[field] for field in REPORT_CV_FIELDS if field in cv_data}
+
+
+def build_result_row(cv_filename, cv_data, match_score, job_title, duplicate_of=""):
+    return {
+        "cv_filename": cv_filename,
+        "candidate_name": cv_data.get('name', 'N/A'),
+        "match_score": match_score,
+        "email": cv_data.get('email', 'N/A'),
+        "phone_number": cv_data.get('phone_number', 'N/A'),
+        "job_title": job_title,
+        "duplicate_of": duplicate_of
+    }
+
+
+class ScreeningPipeline:
+    def __init__(self, model_name='mistral', threshold=70, top_k=None, llm_workers=1, parse_workers=None,
+                 interview_format="Online Video Call", cv_cache=None, jd_summary_store=None, log=print,
+                 on_progress=None, cancel_event=None, keep_full_cv_records=False, checkpoint=None,
+                 max_pages=None, max_chars=None, compact_cvs=True, cv_token_budget=cv_compactor.DEFAULT_TOKEN_BUDGET,
+                 extraction_mode="llm", skills_lexicon=None, structured_output=True, cv_batch_size=1,
+                 semantic_skills=False, skill_similarity=skill_embeddings.DEFAULT_SIMILARITY_THRESHOLD,
+                 skill_vectors_path=None, must_have_skills=None, candidate_store=None, llm_client_instance=None,
+                 cascade=None, cascade_min_skills=model_cascade.DEFAULT_MIN_SKILLS, dedup_cvs=False,
+                 dedup_threshold=cv_dedup.DEFAULT_SIMILARITY_THRESHOLD):
+        """
+        Initializes the end-to-end screening pipeline (JD summarizer, CV agent, shortlisting and scheduler)
+        without any UI, so it can be driven from the GUI, the command line or cron.
+
+        Args:
+            model_name (str): Ollama model used by the CV and JD agents.
+            threshold (float): Shortlisting threshold in percent.
+            top_k (int): Optional cap on the shortlisted candidates per job.
+            llm_workers (int): Concurrent LLM requests during CV pre-processing (1 = sequential).
+            parse_workers (int): Processes used for PDF parsing when llm_workers > 1.
+            interview_format (str): Interview format used in the interview requests.
+            cv_cache (CVExtractionCache): Optional cache of CV extractions.
+            jd_summary_store (JDSummaryStore): Optional store of JD summaries.
+            log (callable): Receives one progress message (str) at a time.
+            on_progress (callable): on_progress(completed_steps, total_steps), where a step is one CV pre-processed,
+                                    one JD summarized or one job shortlisted.
+            cancel_event (threading.Event): Set it from another thread to stop the run at the next step.
+            keep_full_cv_records (bool): Keep education and work experience of every CV in memory during the run
+                                         (by default only the fields needed for scoring and reporting are kept).
+            checkpoint (RunCheckpoint): Optional run checkpoint. Work it already records is skipped, and new
+                                        extractions, summaries and scored jobs are recorded to it.
+            max_pages (int): Only read the first max_pages pages of each CV.
+            max_chars (int): Truncate each CV's text to max_chars characters before extraction.
+            compact_cvs (bool): Compact each CV's text before it goes into the extraction prompt.
+            cv_token_budget (int): Maximum estimated tokens of compacted CV text per prompt.
+            extraction_mode (str): CV extraction mode, see CVAgent.EXTRACTION_MODES. Modes other than "llm" fill
+                                   contact fields and/or skills with rules only, and JD skills are matched
+                                   against the same lexicon, so the LLM is never called.
+            skills_lexicon (list): Known skills for rule-based skill extraction.
+            structured_output (bool): Ask Ollama for schema-constrained JSON (needs Ollama 0.5 or later).
+            cv_batch_size (int): Pack up to this many short CVs into one extraction request.
+            semantic_skills (bool): Count a required skill as found when the CV has a similar skill
+                                    ("web dev" for "web development"), not only the identical one.
+            skill_similarity (float): Minimum cosine similarity of two skills for semantic matching.
+            skill_vectors_path (str): Optional .npz file of precomputed word vectors for semantic matching.
+            must_have_skills (list): Skills every shortlisted candidate must have; CVs lacking any of them
+                                     score 0 for every job.
+            candidate_store (CandidateStore): Optional persistent store that receives the extracted CVs, the JD
+                                              summaries and every result row.
+            llm_client_instance (LLMClient): Client shared by the CV and JD agents, e.g. one spreading requests
+                                             over an EndpointPool (the shared default client when None).
+            cascade (list): Cheaper tiers ("rules" and/or smaller model names) the CV and JD agents try before
+                            model_name, escalating only documents whose result fails validation.
+            cascade_min_skills (int): Fewest skills a cheaper tier's result may have to be accepted.
+            dedup_cvs (bool): Detect exact and near-duplicate CV texts before LLM extraction and extract each
+                              cluster once (see cv_dedup.NearDuplicateIndex).
+            dedup_threshold (float): Minimum estimated similarity of two CV texts to count as near-duplicates.
+        """
+        self.cv_agent = cv_agent.CVAgent(model_name=model_name, cache=cv_cache, llm_client_instance=llm_client_instance,
+                                         max_pages=max_pages, max_chars=max_chars,
+                                         compact_text=compact_cvs, token_budget=cv_token_budget,
+                                         extraction_mode=extraction_mode, skills_lexicon=skills_lexicon,
+                                         structured_output=structured_output, batch_size=cv_batch_size,
+                                         cascade=cascade, cascade_min_skills=cascade_min_skills)
+        self.jd_agent = jd_summarizer_agent.JDSummarizerAgent(model_name=model_name, llm_client_instance=llm_client_instance,
+                                                              summary_store=jd_summary_store,
+                                                              rule_based=extraction_mode != "llm",
+                                                              skills_lexicon=skills_lexicon,
+                                                              structured_output=structured_output,
+                                                              cascade=cascade, cascade_min_skills=cascade_min_skills)
+        self.skill_matcher = None
+        if semantic_skills:
+            self.skill_matcher = skill_embeddings.SemanticSkillMatcher(
+                skill_embeddings.SkillEmbedder(vectors_path=skill_vectors_path), similarity_threshold=skill_similarity)
+        self.shortlisting_agent = shortlisting_agent.ShortlistingAgent(threshold=threshold, top_k=top_k,
+                                                                       skill_matcher=self.skill_matcher,
+                                                                       must_have_skills=must_have_skills)
+        self.scheduler = scheduler_agent.SchedulerAgent(interview_format=interview_format)
+        self.llm_workers = llm_workers
+        self.parse_workers = parse_workers
+        self.log = log
+        self.on_progress = on_progress
+        self.cancel_event = cancel_event or threading.Event()
+        self.keep_full_cv_records = keep_full_cv_records
+        self.checkpoint = checkpoint
+        self.candidate_store = candidate_store
+        self._unstored_cv_records = {}  # Full extractions waiting for _store_candidates, before slimming
+        self.dedup_cvs = dedup_cvs
+        self.dedup_threshold = dedup_threshold
+        self.linked_cvs = {}  # duplicate CV filename -> filename whose extraction it reused, for this run
+        self._completed_steps = 0
+        self._total_steps = 0
+
+    def _check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise ScreeningCancelled("Screening cancelled")
+
+    def _add_steps(self, step_count):
+        self._total_steps += step_count
+        if self.on_progress is not None:
+            self.on_progress(self._completed_steps, self._total_steps)
+
+    def _complete_step(self):
+        self._completed_steps += 1
+        if self.on_progress is not None:
+            self.on_progress(self._completed_steps, self._total_steps)
+
+    def load_jobs(self, jd_csv_file, job_titles=None):
+        """
+        Loads the JD CSV and resolves the job titles to process (all titles in the CSV when none are given).
+
+        Returns:
+            tuple: (job_data_frame, job_titles)
+
+        Raises:
+            ValueError: If the CSV can't be loaded or a requested job title isn't in it.
+        """
+        job_data_frame = self.jd_agent.load_job_descriptions_from_csv(jd_csv_file)
+        if job_data_frame is None:
+            raise ValueError(f"Could not load job descriptions from {jd_csv_file}")
+        available_titles = job_data_frame['Job Title'].unique().tolist()
+        if not job_titles:
+            return job_data_frame, available_titles
+        unknown_titles = [job_title for job_title in job_titles if job_title not in available_titles]
+        if unknown_titles:
+            raise ValueError(f"Job titles not found in {jd_csv_file}: {unknown_titles}")
+        return job_data_frame, list(job_titles)
+
+    @staticmethod
+    def job_description_text(job_data_frame, job_title):
+        job_row = job_data_frame[job_data_frame['Job Title'] == job_title]
+        return job_row['Job Description'].iloc[0]
+
+    def preprocess_cvs(self, cv_folder, cv_file_names=None):
+        """
+        Extracts data from the CVs in the folder (or only the given filenames).
+
+        Returns:
+            dict: {cv_filename: cv_data} for every CV that could be read, in filename order.
+        """
+        if cv_file_names is None:
+            cv_file_names = list_cv_files(cv_folder)
+        if not cv_file_names:
+            self.log(f"Warning: No PDF CV files found in folder: {cv_folder}")
+            return {}
+
+        all_cv_data = {}
+        ordered_file_names = cv_file_names
+        if self.checkpoint is not None:
+            all_cv_data = {cv_filename: self.checkpoint.cv_data[cv_filename] for cv_filename in cv_file_names
+                           if cv_filename in self.checkpoint.cv_data}
+            if all_cv_data:
+                self.log(f"  Resuming run {self.checkpoint.run_id}: {len(all_cv_data)} CVs already extracted")
+            cv_file_names = [cv_filename for cv_filename in cv_file_names if cv_filename not in all_cv_data]
+
+        self._add_steps(len(cv_file_names))
+        cache = self.cv_agent.cache
+        hits_before, misses_before = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        # Rule-based extraction costs less than fingerprinting, so only LLM extraction is deduplicated
+        dedup_index = (cv_dedup.NearDuplicateIndex(self.dedup_threshold)
+                       if self.dedup_cvs and self.cv_agent.extraction_mode == "llm" else None)
+        if cv_file_names and (self.llm_workers > 1 or self.cv_agent.batch_size > 1 or dedup_index is not None):
+            self.log(f"--- Pre-processing {len(cv_file_names)} CVs from folder: {cv_folder} ({self.llm_workers} parallel LLM requests, "
+                     f"up to {self.cv_agent.batch_size} CVs per request) ---")
+
+            def on_cv_done(cv_file_path, cv_data, error):
+                self._complete_step()
+                cv_filename = os.path.basename(cv_file_path)
+                if error is None:
+                    self.log(f"  - Pre-processed CV: {cv_filename}")
+                    all_cv_data[cv_filename] = self._keep_cv_record(cv_filename, cv_data)
+                else:
+                    self.log(f"    Error: {error}: {cv_filename}. Skipping pre-processing for this CV.")
+
+            pipeline = cv_pipeline.CVExtractionPipeline(self.cv_agent, parse_workers=self.parse_workers, llm_workers=self.llm_workers,
+                                                        dedup_index=dedup_index)
+            cv_file_paths = [os.path.join(cv_folder, cv_filename) for cv_filename in cv_file_names]
+            pipeline.run(cv_file_paths, on_result=on_cv_done, cancel_event=self.cancel_event)
+            self.linked_cvs.update({os.path.basename(file_path): os.path.basename(representative_path)
+                                    for file_path, representative_path in pipeline.linked_paths.items()})
+            if dedup_index is not None:
+                self.log(f"  Duplicate CVs: {dedup_index.exact_duplicates} exact and {dedup_index.near_duplicates} near "
+                         f"duplicates in {len(dedup_index.clusters())} clusters; {len(pipeline.linked_paths)} CVs reused "
+                         f"another CV's extraction instead of an LLM call")
+            self._check_cancelled()
+        elif cv_file_names:
+            self.log(f"--- Pre-processing {len(cv_file_names)} CVs from folder: {cv_folder} ---")
+            for cv_filename in cv_file_names:
+                self._check_cancelled()
+                self.log(f"  - Pre-processing CV: {cv_filename}")
+                with get_metrics().span("cv_preprocess"):
+                    cv_data = self.cv_agent.process_cv_file(os.path.join(cv_folder, cv_filename))
+                self._complete_step()
+                if cv_data is None:
+                    self.log(f"    Error: Could not read CV file: {cv_filename}. Skipping pre-processing for this CV.")
+                    continue
+                all_cv_data[cv_filename] = self._keep_cv_record(cv_filename, cv_data)
+
+        if cache is not None:
+            self.log(f"  CV cache: {cache.hits - hits_before} hits, {cache.misses - misses_before} misses")
+        if self.cv_agent.compactor is not None and self.cv_agent.compactor.documents:
+            compaction_stats = self.cv_agent.compactor.stats()
+            self.log(f"  Prompt compaction: {compaction_stats['tokens_before']} -> {compaction_stats['tokens_after']} "
+                     f"estimated CV tokens ({compaction_stats['percent_saved']}% saved, "
+                     f"{compaction_stats['budget_truncations']} CVs cut to the token budget)")
+        if self.cv_agent.parse_stats.total:
+            self.log(f"  CV response parsing: {self.cv_agent.parse_stats.summary()}")
+        for line in self.cv_agent.cascade_stats.summary():
+            self.log(f"  CV cascade tier {line}")
+        if self.cv_agent.batch_requests:
+            self.log(f"  Batched extraction: {self.cv_agent.batched_documents} CVs in {self.cv_agent.batch_requests} requests, "
+                     f"{self.cv_agent.batch_fallbacks} re-sent individually")
+        # Keep filename order so reports are stable however the CVs finished
+        return {cv_filename: all_cv_data[cv_filename] for cv_filename in ordered_file_names if cv_filename in all_cv_data}
+
+    def _keep_cv_record(self, cv_filename, cv_data):
+        if self.candidate_store is not None:
+            self._unstored_cv_records[cv_filename] = cv_data  # The store keeps education and experience too
+        cv_record = cv_data if self.keep_full_cv_records else slim_cv_record(cv_data)
+        if self.checkpoint is not None:
+            self.checkpoint.record_cv(cv_filename, cv_record)
+        return cv_record
+
+    def _duplicate_applicants(self, cv_data_by_filename):
+        duplicate_of = cv_dedup.find_duplicate_applicants(cv_data_by_filename, self.linked_cvs)
+        if duplicate_of:
+            self.log(f"  Duplicate applicants: {len(duplicate_of)} CVs share an email address or near-identical text "
+                     f"with an earlier CV (see the duplicate_of column)")
+        return duplicate_of
+
+    def _log_jd_stats(self):
+        if self.jd_agent.parse_stats.total:
+            self.log(f"  JD response parsing: {self.jd_agent.parse_stats.summary()}")
+        for line in self.jd_agent.cascade_stats.summary():
+            self.log(f"  JD cascade tier {line}")
+
+    def _store_candidates(self, cv_folder, cv_data_by_filename):
+        full_cv_records, self._unstored_cv_records = self._unstored_cv_records, {}
+        if self.candidate_store is None or not cv_data_by_filename:
+            return
+        # CVs resumed from a checkpoint only have their slim record; keep the full one if an earlier run stored it
+        records_to_store = {cv_filename: full_cv_records.get(cv_filename, cv_data)
+                            for cv_filename, cv_data in cv_data_by_filename.items()
+                            if cv_filename in full_cv_records
+                            or self.candidate_store.get_candidate(cv_folder, cv_filename) is None}
+        stored_count = self.candidate_store.upsert_candidates(cv_folder, records_to_store) if records_to_store else 0
+        duplicates = self.candidate_store.duplicate_emails(cv_folder=cv_folder)
+        self.log(f"  Candidate store: saved {stored_count} CVs, duplicate emails: {len(duplicates)}")
+        for email, cv_keys in duplicates.items():
+            self.log(f"    Duplicate email {email}: {', '.join(cv_filename for _, cv_filename in cv_keys)}")
+
+    def summarize_jd(self, job_title, job_description_text):
+        self._check_cancelled()
+        if self.checkpoint is not None and job_title in self.checkpoint.jd_data:
+            jd_data = self.checkpoint.jd_data[job_title]
+            if self.candidate_store is not None:
+                # The run may have been started without the store, which records scores for this job
+                self.candidate_store.upsert_jd(job_title, jd_data)
+            self._complete_step()
+            self.log(f"--- Resumed Job Description Summary (for: {job_title}) ---")
+            return jd_data
+        with get_metrics().span("jd_summarize"):
+            jd_data = self.jd_agent.summarize_jd(job_description_text)
+        if self.checkpoint is not None:
+            self.checkpoint.record_jd(job_title, jd_data)
+        if self.candidate_store is not None:
+            self.candidate_store.upsert_jd(job_title, jd_data)
+        self._complete_step()
+        self.log(f"--- Summarized Job Description Data (for: {job_title}) ---")
+        self.log(str(jd_data))
+        return jd_data
+
+    def shortlist_and_schedule(self, job_title, iter_results, on_result=None, on_interview_request=None,
+                               already_invited=()):
+        """
+        Shortlists one job's results, emits every result row (with a "shortlisted" flag) and generates the
+        interview requests of the shortlisted candidates.
+
+        Args:
+            job_title (str): The job being processed.
+            iter_results (callable): Returns a fresh iterator over the job's result rows. It is called twice
+                                     (shortlisting, then emitting rows), so rows are never held in a list.
+            on_result (callable): Receives each result row.
+            on_interview_request (callable): Receives (candidate, message) for each shortlisted candidate.
+            already_invited (set): Filenames of shortlisted CVs that already got an interview request for the job.
+
+        Returns:
+            list: The shortlisted candidates.
+        """
+        self._check_cancelled()
+        pair_count = 0
+
+        def counted_results():
+            nonlocal pair_count
+            for result in iter_results():
+                pair_count += 1
+                yield result
+
+        with get_metrics().span("shortlisting"):
+            shortlisted_candidates = self.shortlisting_agent.shortlist_candidates(counted_results())
+        shortlisted_filenames = {candidate['cv_filename'] for candidate in shortlisted_candidates}
+        if on_result is not None:
+            for result in iter_results():
+                result['shortlisted'] = result['cv_filename'] in shortlisted_filenames
+                on_result(result)
+
+        # A job finished before a restart still gets its rows re-emitted for the report, but its interview
+        # requests went out in the earlier attempt and must not be sent twice
+        already_scheduled = self.checkpoint is not None and job_title in self.checkpoint.scored_jobs
+
+        if shortlisted_candidates:
+            self.log(f"--- Shortlisted Candidates for {job_title} ({self.shortlisting_agent.describe_criteria()}) ---")
+            for candidate in shortlisted_candidates:
+                self.log(f"  - CV File: {candidate['cv_filename']}, Candidate: {candidate['candidate_name']}, Match Score: {candidate['match_score']}%")
+        else:
+            self.log(f"--- No Candidates Shortlisted for {job_title} based on Threshold ---")
+
+        if already_scheduled:
+            self.log(f"  Interview requests for {job_title} were already generated in run {self.checkpoint.run_id}")
+        candidates_to_invite = [] if already_scheduled else [candidate for candidate in shortlisted_candidates
+                                                             if candidate['cv_filename'] not in already_invited]
+        if len(candidates_to_invite) < len(shortlisted_candidates) and not already_scheduled:
+            self.log(f"  {len(shortlisted_candidates) - len(candidates_to_invite)} shortlisted candidates for {job_title} "
+                     f"were already sent an interview request")
+        for candidate in candidates_to_invite:
+            with get_metrics().span("scheduling"):
+                interview_request_message = self.scheduler.generate_interview_request(
+                    candidate_name=candidate['candidate_name'],
+                    job_title=job_title,
+                    potential_dates=POTENTIAL_INTERVIEW_DATES,
+                    potential_times=POTENTIAL_INTERVIEW_TIMES
+                )
+            get_metrics().increment("interview_requests")
+            if on_interview_request is not None:
+                on_interview_request(candidate, interview_request_message)
+        if self.checkpoint is not None and not already_scheduled:
+            self.checkpoint.record_job_scored(job_title, pair_count)
+        self._complete_step()
+        return shortlisted_candidates
+
+    def run(self, jd_csv_file, cv_folder, job_titles=None, incremental=False, on_result=None, on_interview_request=None,
+            job_data_frame=None):
+        """
+        Runs the full screening: pre-process CVs, summarize the selected JDs, score, shortlist and schedule.
+
+        Args:
+            jd_csv_file (str): Path to the JD CSV.
+            cv_folder (str): Folder containing the CV PDFs.
+            job_titles (list): Job titles to process (None = every title in the CSV).
+            incremental (bool): Only process CVs and JDs that changed since the previous run of this folder/CSV.
+            on_result (callable): on_result(result_row) for every CV/job result, with a "shortlisted" flag.
+            on_interview_request (callable): on_interview_request(candidate, message) for every shortlisted candidate.
+            job_data_frame (pandas.DataFrame): The already loaded JD CSV, to avoid reading it again.
+
+        Returns:
+            dict: {job_title: shortlisted candidates}
+
+        Raises:
+            ScreeningCancelled: If cancel_event was set during the run.
+        """
+        if job_data_frame is None:
+            job_data_frame, job_titles = self.load_jobs(jd_csv_file, job_titles)
+        elif not job_titles:
+            job_titles = job_data_frame['Job Title'].unique().tolist()
+        self._completed_steps = self._total_steps = 0
+        self.linked_cvs = {}
+        self._unstored_cv_records = {}
+        self._add_steps(2 * len(job_titles))
+        result_recorder = None
+        if self.candidate_store is not None:
+            on_result = result_recorder = ResultRecorder(self.candidate_store, cv_folder, on_result)
+        try:
+            if incremental:
+                return self._run_incremental(jd_csv_file, cv_folder, job_data_frame, job_titles, on_result,
+                                             on_interview_request)
+            return self._run_full(cv_folder, job_data_frame, job_titles, on_result, on_interview_request)
+        finally:
+            if result_recorder is not None:
+                result_recorder.flush()
+
+    def _run_full(self, cv_folder, job_data_frame, job_titles, on_result, on_interview_request):
+        all_cv_data = self.preprocess_cvs(cv_folder)
+        self._store_candidates(cv_folder, all_cv_data)
+        cv_skill_index = SkillIndex.from_cv_data(all_cv_data)  # Tokenize CV skills once for all jobs
+        duplicate_of = self._duplicate_applicants(all_cv_data)
+
+        jd_data_by_title = {job_title: self.summarize_jd(job_title, self.job_description_text(job_data_frame, job_title))
+                            for job_title in job_titles}
+        self._log_jd_stats()
+        # Score every selected job against every CV in one sparse matrix product
+        with get_metrics().span("scoring"):
+            job_cv_scores = score_matrix.compute_score_matrix(jd_data_by_title, cv_skill_index,
+                                                              skill_matcher=self.skill_matcher)
+            if self.shortlisting_agent.must_have_skills:
+                job_cv_scores.restrict_to(cv_skill_index.cv_ids_with_skills(self.shortlisting_agent.must_have_skills))
+
+        shortlists = {}
+        for job_title in job_titles:
+            def iter_results(job_title=job_title):
+                for cv_filename, match_score in zip(job_cv_scores.cv_ids, job_cv_scores.row(job_title).tolist()):
+                    yield build_result_row(cv_filename, all_cv_data[cv_filename], match_score, job_title,
+                                           duplicate_of.get(cv_filename, ""))
+
+            shortlists[job_title] = self.shortlist_and_schedule(job_title, iter_results, on_result, on_interview_request)
+        return shortlists
+
+    def _run_incremental(self, jd_csv_file, cv_folder, job_data_frame, job_titles, on_result, on_interview_request):
+        state = incremental_screening.IncrementalScreeningState(cv_folder, jd_csv_file, config={
+            "cv_model": self.cv_agent.model_name,
+            "cv_prompt_version": self.cv_agent.cache_version(),
+            "jd_model": self.jd_agent.model_name,
+            "jd_summary_version": self.jd_agent.summary_version(),
+            "jd_rule_based": self.jd_agent.rule_based,
+            "skill_matching": self.skill_matcher.describe() if self.skill_matcher is not None else "exact",
+            "must_have_skills": self.shortlisting_agent.must_have_skills
+        })
+
+        cv_changes, current_manifest = state.diff_cv_folder(cv_folder, list_cv_files(cv_folder))
+        self.log(f"--- Incremental Mode: {len(cv_changes['added'])} new, {len(cv_changes['modified'])} modified, "
+                 f"{len(cv_changes['removed'])} removed, {len(cv_changes['unchanged'])} unchanged CVs ---")
+        changed_cv_filenames = cv_changes["added"] + cv_changes["modified"]
+        new_cv_data = self.preprocess_cvs(cv_folder, changed_cv_filenames) if changed_cv_filenames else {}
+        # A modified CV that no longer extracts is dropped like a removed one: its old data describes a file that
+        # is gone, and leaving it out of the manifest makes the next run retry it
+        failed_cv_filenames = [filename for filename in cv_changes["modified"] if filename not in new_cv_data]
+        if failed_cv_filenames:
+            self.log(f"  Dropping {len(failed_cv_filenames)} modified CVs that could not be re-extracted: "
+                     f"{', '.join(failed_cv_filenames)}")
+        dropped_cv_filenames = cv_changes["removed"] + failed_cv_filenames
+        if self.candidate_store is not None and dropped_cv_filenames:
+            self.candidate_store.remove_candidates(cv_folder, dropped_cv_filenames)
+        self._store_candidates(cv_folder, new_cv_data)
+        state.update_cvs(new_cv_data, dropped_cv_filenames, current_manifest)
+        duplicate_of = self._duplicate_applicants(state.cv_data)
+
+        if not state.jd_csv_changed(jd_csv_file):
+            self.log("Job Description CSV unchanged since the last run.")
+
+        shortlists = {}
+        for job_title in job_titles:
+            job_description_text = self.job_description_text(job_data_frame, job_title)
+            if state.jd_changed(job_title, job_description_text):
+                state.update_jd(job_title, job_description_text, self.summarize_jd(job_title, job_description_text))
+            else:
+                self._complete_step()
+                self.log(f"--- Reusing Job Description Summary (for: {job_title}) ---")
+
+            with get_metrics().span("scoring"):
+                rescored_filenames = state.rescore(job_title, list(new_cv_data), self.shortlisting_agent)
+            self.log(f"  Re-scored {len(rescored_filenames)} CVs for {job_title}")
+            shortlists[job_title] = self.shortlist_and_schedule(
+                job_title, lambda job_title=job_title: (dict(row, duplicate_of=duplicate_of.get(row["cv_filename"], ""))
+                                                        for row in state.results_for(job_title)),
+                on_result, on_interview_request, already_invited=state.already_invited(job_title, rescored_filenames))
+            state.record_scheduled(job_title, [candidate['cv_filename'] for candidate in shortlists[job_title]])
+
+        self._log_jd_stats()
+        state.save()
+        return shortlists
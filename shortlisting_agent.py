@@ -1,66 +1,125 @@
+import heapq
+
+import score_matrix
+
+from skill_index import SkillIndex, tokenize_skills
+
 class ShortlistingAgent:
-    def __init__(self, threshold):
+    def __init__(self, threshold, top_k=None, skill_matcher=None, must_have_skills=None):
         """
-        Initializes the ShortlistingAgent with a given threshold.
+        Initializes the ShortlistingAgent with a given threshold and, optionally, a cap on the number of
+        candidates shortlisted per job (top_k=None or 0 keeps every candidate above the threshold), a
+        SemanticSkillMatcher that lets similar skills count as a match (exact skill equality when None) and
+        must-have skills: a CV lacking any of them (exact match) scores 0 for every job.
         """
         self.threshold = threshold
+        self.top_k = top_k or None
+        self.skill_matcher = skill_matcher
+        self.must_have_skills = tokenize_skills(must_have_skills)
 
     def calculate_match_score(self, job_description_data, cv_data):
         """
-        Calculates a match score between JD and CV. (Same function as before)
+        Calculates a match score between JD and CV: the percentage of required JD skills found in the CV's skills.
         """
-        jd_required_skills_str = job_description_data.get("required_skills", "").lower()
-        cv_skills_value = cv_data.get("skills", "")
-
-        if isinstance(cv_skills_value, list):
-            cv_skills_str = ", ".join(cv_skills_value).lower()
-        else:
-            cv_skills_str = str(cv_skills_value).lower()
-
-        if not jd_required_skills_str or not cv_skills_str:
+        jd_required_skills = tokenize_skills(job_description_data.get("required_skills", ""))
+        if not jd_required_skills:
             return 0.0
 
-        jd_required_skills_candidates = [skill.strip() for skill in jd_required_skills_str.replace(';', ',').replace('\n', ',').split(',')]
-        cv_skills_candidates = [skill.strip() for skill in cv_skills_str.replace(';', ',').replace('\n', ',').split(',')]
-
-        jd_required_skills = [skill for skill in jd_required_skills_candidates if skill]
-        cv_skills = [skill for skill in cv_skills_candidates if skill]
-
-        matched_skills_count = 0
-        for required_skill in jd_required_skills:
-            if required_skill in cv_skills:
-                matched_skills_count += 1
-
-        if not jd_required_skills:
+        cv_skills = set(tokenize_skills(cv_data.get("skills", "")))
+        if not cv_skills.issuperset(self.must_have_skills):
             return 0.0
+        if self.skill_matcher is not None:
+            matched_skills_count = sum(1 for required_skill in jd_required_skills
+                                       if self.skill_matcher.skill_found(required_skill, cv_skills))
+        else:
+            matched_skills_count = sum(1 for required_skill in jd_required_skills if required_skill in cv_skills)
 
         match_score = (matched_skills_count / len(jd_required_skills)) * 100.0
         return round(match_score, 2)
 
+    def score_cvs(self, job_description_data, cv_skill_index):
+        """
+        Scores one JD against every CV in a SkillIndex at once. Gives the same scores as calculate_match_score,
+        but each CV's skills are tokenized only once, however many jobs are screened, and only the candidates
+        found through the index's posting lists are scored, so the cost follows the postings, not the pool size.
+
+        Args:
+            job_description_data (dict): Summarized JD data with a "required_skills" entry.
+            cv_skill_index (SkillIndex): Index of the pre-processed CVs.
+
+        Returns:
+            dict: Maps the ID of each CV with a non-zero match score to that score. CVs missing from it score 0.
+        """
+        if self.skill_matcher is not None:
+            job_scores = score_matrix.compute_score_matrix({"": job_description_data}, cv_skill_index,
+                                                           skill_matcher=self.skill_matcher)
+            if self.must_have_skills:
+                job_scores.restrict_to(cv_skill_index.cv_ids_with_skills(self.must_have_skills))
+            return {cv_id: match_score for cv_id, match_score in job_scores.scores_for("").items() if match_score}
+        scores = {}
+        required_skill_counts, total_required = cv_skill_index.encode_jd(job_description_data)
+        if not total_required:
+            return scores
+
+        required_items = required_skill_counts.items()
+        for cv_id in cv_skill_index.find_candidates(job_description_data, must_have_skills=self.must_have_skills):
+            cv_skill_ids = cv_skill_index.cv_skill_ids[cv_id]
+            matched_skills_count = sum(count for skill_id, count in required_items if skill_id in cv_skill_ids)
+            if matched_skills_count:
+                scores[cv_id] = round((matched_skills_count / total_required) * 100.0, 2)
+        return scores
 
     def shortlist_candidates(self, cv_results):
         """
         Shortlists candidates based on match scores and the agent's threshold.
 
         Args:
-            cv_results (list): A list of dictionaries, where each dictionary contains
-                                   'cv_filename', 'candidate_name', and 'match_score'.
+            cv_results (iterable): Dictionaries containing 'cv_filename', 'candidate_name', and 'match_score'.
+                                   Any iterable works, including a generator yielding results as they are scored.
 
         Returns:
-            list: A list of dictionaries representing shortlisted candidates.
+            list: A list of dictionaries representing shortlisted candidates. With top_k set, only the best
+                  top_k candidates are returned, ranked by descending match score.
         """
+        if self.top_k:
+            return self.select_top_k(cv_results, self.top_k, self.threshold)
+
         shortlisted_candidates = []
         for result in cv_results:
             if result['match_score'] >= self.threshold:
                 shortlisted_candidates.append(result)
         return shortlisted_candidates
 
+    @staticmethod
+    def select_top_k(cv_results, k, threshold=None):
+        """
+        Selects the k best results above an optional threshold from a stream of results, keeping only a
+        k-sized heap in memory instead of sorting the full list. Ties keep their input order.
+
+        Returns:
+            list: Up to k result dictionaries, ranked by descending match score.
+        """
+        if threshold is not None:
+            cv_results = (result for result in cv_results if result['match_score'] >= threshold)
+        return heapq.nlargest(k, cv_results, key=lambda result: result['match_score'])
+
+    def describe_criteria(self):
+        """
+        Returns a short description of the shortlisting criteria, e.g. "Match Score >= 70%, top 10".
+        """
+        criteria = f"Match Score >= {self.threshold}%"
+        if self.top_k:
+            criteria += f", top {self.top_k}"
+        if self.must_have_skills:
+            criteria += f", must have {', '.join(self.must_have_skills)}"
+        return criteria
+
     def display_shortlist_results(self, shortlisted_candidates):
         """
         Prints the results of the shortlisting process.
         """
         if shortlisted_candidates:
-            print(f"\n--- Shortlisted Candidates (Match Score >= {self.threshold}%) ---")
+            print(f"\n--- Shortlisted Candidates ({self.describe_criteria()}) ---")
             for candidate in shortlisted_candidates:
                 print(f"  - CV File: {candidate['cv_filename']}, Candidate: {candidate['candidate_name']}, Match Score: {candidate['match_score']}%")
         else:
@@ -86,6 +145,10 @@ if __name__ == "__main__":
     print(f"Candidate Name: {sample_cv_data['name']}")
     print(f"Match Score: {match_score}%")
 
+    # --- Test score_cvs (batch scoring against a pre-tokenized SkillIndex) ---
+    cv_skill_index = SkillIndex.from_cv_data({"sample_cv.pdf": sample_cv_data})
+    print(f"Batch Match Scores: {ShortlistingAgent(threshold=70).score_cvs(sample_jd_data, cv_skill_index)}")
+
     # --- Example of using shortlist_candidates and display_shortlist_results ---
     sample_cv_results = [
         {"cv_filename": "cv1.pdf", "candidate_name": "Candidate A", "match_score": 85.0},
@@ -94,4 +157,8 @@ if __name__ == "__main__":
     ]
     shortlisting_agent = ShortlistingAgent(threshold=75) # Create an instance of ShortlistingAgent
     shortlisted = shortlisting_agent.shortlist_candidates(sample_cv_results) # Use the instance to call methods
-    shortlisting_agent.display_shortlist_results(shortlisted) # Use the instance to call methods
\ No newline at end of file
+    shortlisting_agent.display_shortlist_results(shortlisted) # Use the instance to call methods
+
+    # --- Top-K mode: best 1 candidate above the threshold, ranked ---
+    top_k_agent = ShortlistingAgent(threshold=75, top_k=1)
+    top_k_agent.display_shortlist_results(top_k_agent.shortlist_candidates(iter(sample_cv_results)))
\ No newline at end of file
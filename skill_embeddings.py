@@ -0,0 +1,236 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from skill_index import tokenize_skills
+
+DEFAULT_DIMENSIONS = 512
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+
+# Common abbreviations expanded before embedding, so "web dev" and "web development" become the same skill
+SKILL_ABBREVIATIONS = {
+    "dev": "development", "devs": "development", "mgmt": "management", "admin": "administration",
+    "ml": "machine learning", "dl": "deep learning", "ai": "artificial intelligence", "nlp": "natural language processing",
+    "cv": "computer vision", "js": "javascript", "ts": "typescript", "k8s": "kubernetes", "db": "database",
+    "dbs": "databases", "postgres": "postgresql", "py": "python", "oop": "object oriented programming",
+    "ui": "user interface", "ux": "user experience", "qa": "quality assurance", "bi": "business intelligence",
+    "ci": "continuous integration", "cd": "continuous delivery", "aws": "amazon web services",
+    "gcp": "google cloud platform", "sw": "software", "eng": "engineering",
+}
+_SEPARATOR_RE = re.compile(r"[\s_/\-\u2013,&()]+")
+# Version numbers and framework suffixes that don't change which skill is meant: "python 3", "react.js", "vue 2.x"
+_VERSION_RE = re.compile(r"^(v?\d+(\.\d+)*(\.x)?|\d+(st|nd|rd|th))$")
+_SUFFIX_RE = re.compile(r"\.(js|net|io)$")
+
+
+def normalize_skill(skill):
+    """
+    Normalizes a skill token for embedding: lower-case words with separators collapsed, version numbers dropped,
+    ".js"-style suffixes stripped and common abbreviations expanded.
+    """
+    words = []
+    for word in _SEPARATOR_RE.split(str(skill).lower()):
+        word = word.strip(".:;'\"")
+        if not word or _VERSION_RE.match(word):
+            continue
+        if word not in (".net",):
+            word = _SUFFIX_RE.sub("", word) or word
+        words.extend(SKILL_ABBREVIATIONS.get(word, word).split())
+    return " ".join(words)
+
+
+class SkillEmbedder:
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS, vectors_path=None):
+        """
+        Embeds skill names as unit vectors on the CPU, with no model download or network access.
+
+        By default a skill is embedded by hashing its character n-grams (3 to 5 characters per word) and whole
+        words into a fixed number of dimensions, so spelling variants ("postgres"/"postgresql", "python3") land
+        close together. With vectors_path, precomputed word vectors (an .npz file with a "words" array and a
+        matching "vectors" matrix, e.g. exported from a sentence-embedding or fastText model) are used instead:
+        a skill's vector is the mean of its words' vectors.
+
+        Args:
+            dimensions (int): Size of the hashed vectors (ignored when vectors_path is given).
+            vectors_path (str): Optional .npz file of precomputed word vectors.
+        """
+        self.word_vectors = None
+        if vectors_path:
+            with np.load(vectors_path, allow_pickle=False) as vector_file:
+                words = [str(word) for word in vector_file["words"]]
+                vectors = np.asarray(vector_file["vectors"], dtype=np.float32)
+            self.word_vectors = dict(zip(words, vectors))
+            dimensions = vectors.shape[1]
+        self.dimensions = dimensions
+        self._cache = {}  # skill -> unit vector
+        self._lock = threading.Lock()
+
+    def _hashed_vector(self, normalized_skill):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in normalized_skill.split():
+            features = [("w:" + word, 2.0)]
+            padded_word = f"<{word}>"
+            for ngram_length in (3, 4, 5):
+                features.extend((padded_word[start:start + ngram_length], 1.0)
+                                for start in range(max(1, len(padded_word) - ngram_length + 1)))
+            for feature, weight in features:
+                feature_hash = zlib.crc32(feature.encode("utf-8"))
+                # The sign bit keeps hash collisions from adding up into false similarity
+                vector[feature_hash % self.dimensions] += weight if feature_hash & 0x80000000 else -weight
+        return vector
+
+    def _precomputed_vector(self, normalized_skill):
+        word_vectors = [self.word_vectors[word] for word in normalized_skill.split() if word in self.word_vectors]
+        if not word_vectors:
+            return np.zeros(self.dimensions, dtype=np.float32)
+        return np.mean(word_vectors, axis=0).astype(np.float32)
+
+    def embed(self, skill):
+        """
+        Returns the unit vector of a skill (a zero vector when nothing about it is known). Results are cached.
+        """
+        vector = self._cache.get(skill)
+        if vector is not None:
+            return vector
+        normalized_skill = normalize_skill(skill)
+        if self.word_vectors is not None:
+            vector = self._precomputed_vector(normalized_skill)
+        else:
+            vector = self._hashed_vector(normalized_skill)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        with self._lock:
+            self._cache[skill] = vector
+        return vector
+
+    def embed_many(self, skills):
+        """
+        Returns a (len(skills), dimensions) matrix of unit vectors.
+        """
+        if not skills:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.vstack([self.embed(skill) for skill in skills])
+
+    def similarity(self, skill_a, skill_b):
+        return float(self.embed(skill_a) @ self.embed(skill_b))
+
+
+class SemanticSkillMatcher:
+    def __init__(self, embedder=None, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+        """
+        Matches JD skills to CV skills by embedding similarity instead of exact string equality: a required skill
+        is found in a CV when the CV has a skill at least similarity_threshold (cosine) away from it. Identical
+        skills always match, so semantic scores are never below exact-match scores.
+
+        The matcher keeps an in-memory vector index of every skill in a SkillIndex's vocabulary and extends it as
+        new skills are added.
+        """
+        self.embedder = embedder or SkillEmbedder()
+        self.similarity_threshold = similarity_threshold
+        self._indexed_skill_index = None
+        self._skill_vectors = np.zeros((0, self.embedder.dimensions), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def describe(self):
+        return f"semantic>={self.similarity_threshold}"
+
+    def _vocabulary_vectors(self, cv_skill_index):
+        # Skill IDs are handed out sequentially and never reused, so only IDs past the end need embedding
+        with self._lock:
+            if self._indexed_skill_index is not cv_skill_index:
+                self._indexed_skill_index = cv_skill_index
+                self._skill_vectors = np.zeros((0, self.embedder.dimensions), dtype=np.float32)
+            indexed_count = len(self._skill_vectors)
+            if indexed_count < len(cv_skill_index.skill_ids):
+                new_skills = [None] * (len(cv_skill_index.skill_ids) - indexed_count)
+                for skill, skill_id in cv_skill_index.skill_ids.items():
+                    if skill_id >= indexed_count:
+                        new_skills[skill_id - indexed_count] = skill
+                self._skill_vectors = np.vstack([self._skill_vectors, self.embedder.embed_many(new_skills)])
+            return self._skill_vectors
+
+    def neighbor_skill_ids(self, required_skill, cv_skill_index):
+        """
+        Returns the IDs of the indexed skills similar enough to required_skill (including an exact match).
+        """
+        skill_vectors = self._vocabulary_vectors(cv_skill_index)
+        neighbor_ids = np.flatnonzero(skill_vectors @ self.embedder.embed(required_skill) >= self.similarity_threshold)
+        exact_id = cv_skill_index.get_skill_id(required_skill)
+        if exact_id is not None and exact_id not in neighbor_ids:
+            neighbor_ids = np.append(neighbor_ids, exact_id)
+        return neighbor_ids
+
+    def encode_jd(self, jd_data, cv_skill_index):
+        """
+        Encodes the JD's required skills as neighbour sets over the index vocabulary.
+
+        Returns:
+            tuple: (requirements, total_required) where requirements is a list of (neighbor_skill_ids, count) for
+                   each distinct required skill and total_required counts every required skill token.
+        """
+        required_skills = tokenize_skills(jd_data.get("required_skills", ""))
+        required_skill_counts = {}
+        for skill in required_skills:
+            required_skill_counts[skill] = required_skill_counts.get(skill, 0) + 1
+        requirements = [(self.neighbor_skill_ids(skill, cv_skill_index), count)
+                        for skill, count in required_skill_counts.items()]
+        return requirements, len(required_skills)
+
+    def skill_found(self, required_skill, cv_skills):
+        """
+        Returns True when any of cv_skills (a collection of skill tokens) matches required_skill.
+        """
+        if required_skill in cv_skills:
+            return True
+        required_vector = self.embedder.embed(required_skill)
+        return any(float(required_vector @ self.embedder.embed(cv_skill)) >= self.similarity_threshold
+                   for cv_skill in cv_skills)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    import score_matrix
+    from skill_index import SkillIndex
+
+    embedder = SkillEmbedder()
+    SAMPLE_PAIRS = [("python", "python 3"), ("web development", "web dev"), ("postgresql", "postgres"),
+                    ("machine learning", "machine-learning"), ("react", "react.js"), ("kubernetes", "k8s"),
+                    ("problem solving", "problem-solving skills"), ("javascript", "java"), ("sql", "mysql"),
+                    ("python", "c++"), ("data analysis", "data analytics"), ("communication", "communication skills")]
+    for skill_a, skill_b in SAMPLE_PAIRS:
+        print(f"  {skill_a!r:>22} ~ {skill_b!r:<26} {embedder.similarity(skill_a, skill_b):.2f}")
+
+    # --- One JD against a synthetic pool of 100k CVs with spelling variants of a 600-skill vocabulary ---
+    random.seed(7)
+    base_skills = [f"{prefix} {suffix}" for prefix in ("data", "web", "cloud", "mobile", "network", "game", "test",
+                                                       "security", "database", "backend", "frontend", "embedded")
+                   for suffix in ("development", "engineering", "analysis", "design", "architecture", "automation",
+                                  "administration", "management", "testing", "operations", "modeling", "optimization",
+                                  "monitoring", "migration", "integration", "research", "consulting", "support",
+                                  "strategy", "governance", "planning", "scripting", "tooling", "reporting",
+                                  "visualization", "pipelines", "platforms", "services", "systems", "infrastructure",
+                                  "performance", "reliability", "compliance", "deployment", "maintenance", "training",
+                                  "documentation", "review", "auditing", "hardening", "scaling", "tuning", "recovery",
+                                  "modernization", "standards", "best practices", "leadership", "mentoring",
+                                  "procurement", "budgeting")]
+    variants = lambda skill: [skill, skill.replace("development", "dev"), skill + " 2", skill.replace(" ", "-")]
+    all_cv_data = {f"cv_{i}.pdf": {"skills": ", ".join(random.choice(variants(skill))
+                                                      for skill in random.sample(base_skills, random.randint(3, 15)))}
+                   for i in range(100_000)}
+    jd_data = {"required_skills": ", ".join(random.sample(base_skills, 8))}
+    cv_skill_index = SkillIndex.from_cv_data(all_cv_data)
+    print(f"\n{len(cv_skill_index)} CVs, {len(cv_skill_index.skill_ids)} distinct skill spellings")
+
+    matcher = SemanticSkillMatcher(embedder)
+    for label, skill_matcher in (("exact", None), ("semantic (cold vector index)", matcher),
+                                 ("semantic (warm vector index)", matcher)):
+        start_time = time.perf_counter()
+        scores = score_matrix.compute_score_matrix({"Job": jd_data}, cv_skill_index, skill_matcher=skill_matcher)
+        elapsed = time.perf_counter() - start_time
+        row = scores.row("Job")
+        print(f"  {label:<30} {elapsed * 1000:8.1f} ms, mean score {row.mean():5.2f}, {int((row >= 50).sum())} CVs >= 50%")
@@ -0,0 +1,212 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize_skills(skills_value):
+    """
+    Normalizes a skills value into a list of skill tokens, the way ShortlistingAgent has always compared them:
+    lower-cased, split on commas, semicolons and newlines, stripped, with empty tokens dropped.
+
+    Args:
+        skills_value (str or list): Skills as a delimited string or a list of skill strings.
+
+    Returns:
+        list: The skill tokens in order (duplicates are kept).
+    """
+    if isinstance(skills_value, list):
+        skills_str = ", ".join(str(skill) for skill in skills_value).lower()
+    else:
+        skills_str = str(skills_value).lower() if skills_value is not None else ""
+    candidates = skills_str.replace(';', ',').replace('\n', ',').split(',')
+    return [skill for skill in (candidate.strip() for candidate in candidates) if skill]
+
+
+class SkillIndex:
+    INDEX_VERSION = 1
+
+    def __init__(self):
+        """
+        Initializes an empty index of normalized CV skill sets, with each distinct skill mapped to an integer ID,
+        and the inverted index from each skill ID to the CVs that have it, so the candidates for a JD are found
+        from its skills' posting lists without visiting every CV.
+        """
+        self.skill_ids = {}  # normalized skill -> integer skill ID
+        self.cv_skill_ids = {}  # CV ID (filename) -> frozenset of skill IDs
+        self.postings = {}  # skill ID -> set of CV IDs that have the skill
+
+    @classmethod
+    def from_cv_data(cls, all_cv_data):
+        """
+        Builds an index from a {cv_id: cv_data} dictionary such as the one returned by preprocess_cvs.
+        """
+        index = cls()
+        for cv_id, cv_data in all_cv_data.items():
+            index.add_cv(cv_id, cv_data)
+        return index
+
+    def __len__(self):
+        return len(self.cv_skill_ids)
+
+    def get_skill_id(self, skill, create=False):
+        skill_id = self.skill_ids.get(skill)
+        if skill_id is None and create:
+            skill_id = len(self.skill_ids)
+            self.skill_ids[skill] = skill_id
+        return skill_id
+
+    def add_cv(self, cv_id, cv_data):
+        """
+        Tokenizes the CV's skills once and stores them as a set of skill IDs, replacing any previous entry.
+        """
+        self._add_cv_skill_ids(cv_id, frozenset(self.get_skill_id(skill, create=True)
+                                                for skill in tokenize_skills(cv_data.get("skills", ""))))
+
+    def _add_cv_skill_ids(self, cv_id, cv_skill_ids):
+        self.remove_cv(cv_id)
+        self.cv_skill_ids[cv_id] = cv_skill_ids
+        for skill_id in cv_skill_ids:
+            self.postings.setdefault(skill_id, set()).add(cv_id)
+
+    def remove_cv(self, cv_id):
+        for skill_id in self.cv_skill_ids.pop(cv_id, ()):
+            posting = self.postings[skill_id]
+            posting.discard(cv_id)
+            if not posting:
+                del self.postings[skill_id]
+
+    def cv_ids_with_skills(self, skills):
+        """
+        Returns the set of CV IDs that have every one of the given skills (boolean AND of their posting lists,
+        intersected smallest first). A skill no CV has leaves the set empty.
+        """
+        skill_postings = []
+        for skill in dict.fromkeys(tokenize_skills(skills)):
+            posting = self.postings.get(self.get_skill_id(skill))
+            if not posting:
+                return set()
+            skill_postings.append(posting)
+        if not skill_postings:
+            return set(self.cv_skill_ids)
+        skill_postings.sort(key=len)
+        return skill_postings[0].intersection(*skill_postings[1:])
+
+    def find_candidates(self, jd_data, must_have_skills=None):
+        """
+        Finds the CVs worth scoring for a JD: those sharing at least one required skill (boolean OR of the
+        posting lists) and, with must_have_skills, having all of those. Every other CV scores 0 for the JD.
+        The cost depends on the posting lists touched, not on the number of CVs in the index.
+
+        Args:
+            jd_data (dict): Summarized JD data with a "required_skills" entry.
+            must_have_skills (str or list): Optional skills a candidate must have.
+
+        Returns:
+            set: The candidate CV IDs.
+        """
+        required_skill_counts, _ = self.encode_jd(jd_data)
+        candidates = set()
+        for skill_id in required_skill_counts:
+            candidates.update(self.postings.get(skill_id, ()))
+        if must_have_skills and tokenize_skills(must_have_skills):
+            candidates.intersection_update(self.cv_ids_with_skills(must_have_skills))
+        return candidates
+
+    def save(self, index_path):
+        """
+        Writes the index to a JSON file (atomically, through a temporary file), keeping the skill IDs so a
+        loaded index can be updated incrementally.
+        """
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        skills_by_id = [None] * len(self.skill_ids)
+        for skill, skill_id in self.skill_ids.items():
+            skills_by_id[skill_id] = skill
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump({"version": self.INDEX_VERSION, "skills": skills_by_id,
+                       "cvs": {cv_id: sorted(cv_skill_ids) for cv_id, cv_skill_ids in self.cv_skill_ids.items()}},
+                      index_file)
+        os.replace(tmp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path):
+        """
+        Reads an index written by save(). Returns None when the file is missing, unreadable or from another
+        index version, so the caller can rebuild it.
+        """
+        try:
+            with open(index_path, "r", encoding="utf-8") as index_file:
+                saved_index = json.load(index_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable skill index %s: %s", index_path, e)
+            return None
+        if saved_index.get("version") != cls.INDEX_VERSION:
+            return None
+        index = cls()
+        index.skill_ids = {skill: skill_id for skill_id, skill in enumerate(saved_index["skills"])}
+        for cv_id, cv_skill_ids in saved_index["cvs"].items():
+            index._add_cv_skill_ids(cv_id, frozenset(cv_skill_ids))
+        return index
+
+    def encode_jd(self, jd_data):
+        """
+        Encodes the JD's required skills against the index vocabulary.
+
+        Returns:
+            tuple: (required_skill_counts, total_required) where required_skill_counts maps the skill IDs known to
+                   the index to how often they are required, and total_required counts every required skill token,
+                   including ones no CV has (those can never match but still lower the score).
+        """
+        required_skills = tokenize_skills(jd_data.get("required_skills", ""))
+        required_skill_counts = {}
+        for skill in required_skills:
+            skill_id = self.get_skill_id(skill)
+            if skill_id is not None:
+                required_skill_counts[skill_id] = required_skill_counts.get(skill_id, 0) + 1
+        return required_skill_counts, len(required_skills)
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+
+    # --- Candidate lookup for one JD in growing synthetic pools over a 2,000-skill vocabulary ---
+    random.seed(42)
+    vocabulary = [f"skill {i}" for i in range(2000)]
+    jd_data = {"required_skills": ", ".join(random.sample(vocabulary, 6))}
+    must_have_skills = jd_data["required_skills"].split(", ")[:2]
+    cv_skill_index = SkillIndex()
+    for pool_size in (10_000, 100_000):
+        for cv_number in range(len(cv_skill_index), pool_size):
+            cv_skill_index.add_cv(f"cv_{cv_number}.pdf", {"skills": ", ".join(random.sample(vocabulary, random.randint(3, 25)))})
+
+        start_time = time.perf_counter()
+        candidates = cv_skill_index.find_candidates(jd_data)
+        lookup_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        must_have_candidates = cv_skill_index.find_candidates(jd_data, must_have_skills=must_have_skills)
+        must_have_time = time.perf_counter() - start_time
+        required_skill_ids = set(cv_skill_index.encode_jd(jd_data)[0])
+        start_time = time.perf_counter()
+        scanned = {cv_id for cv_id, cv_skill_ids in cv_skill_index.cv_skill_ids.items()
+                   if not required_skill_ids.isdisjoint(cv_skill_ids)}
+        scan_time = time.perf_counter() - start_time
+        print(f"{pool_size:>7} CVs: {len(candidates)} candidates in {lookup_time * 1000:.2f} ms "
+              f"(full scan {scan_time * 1000:.1f} ms, same result: {scanned == candidates}), "
+              f"{len(must_have_candidates)} with both must-haves in {must_have_time * 1000:.2f} ms")
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        index_path = os.path.join(index_dir, "skills.json")
+        start_time = time.perf_counter()
+        cv_skill_index.save(index_path)
+        save_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        loaded_index = SkillIndex.load(index_path)
+        load_time = time.perf_counter() - start_time
+        print(f"Saved in {save_time:.2f}s, loaded in {load_time:.2f}s, "
+              f"same candidates after loading: {loaded_index.find_candidates(jd_data) == candidates}")